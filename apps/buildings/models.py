@@ -1,4 +1,5 @@
 from django.db import models
+from apps.core.dirty_fields import DirtyFieldsMixin
 from apps.players.models import Player
 from apps.exploration.models import Region
 
@@ -36,7 +37,7 @@ class BuildingType(models.Model):
         return self.name
 
 
-class PlayerBuilding(models.Model):
+class PlayerBuilding(DirtyFieldsMixin, models.Model):
     """Construcciones de los jugadores"""
     
     STATUS_CHOICES = [
@@ -6,6 +6,7 @@ from apps.buildings.models import BuildingType, PlayerBuilding
 from apps.players.models import Player
 from apps.exploration.models import Region
 from django.utils import timezone
+from datetime import timedelta
 
 class BuildingService:
     @staticmethod
@@ -16,7 +17,8 @@ class BuildingService:
             building_type=building_type,
             region=region,
             status='building',
-            construction_started=timezone.now()
+            construction_started=timezone.now(),
+            completion_time=timezone.now() + timedelta(hours=building_type.build_time_hours)
         )
         return building
 
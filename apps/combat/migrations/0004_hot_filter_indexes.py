@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0003_battle_loot_earned_battle_npc_attack_power_and_more'),
+        ('players', '0001_initial'),
+        ('ships', '0005_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='battle',
+            index=models.Index(fields=['attacker', 'status', '-completed_at'], name='combat_battle_attacker_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='battle',
+            index=models.Index(fields=['defender', 'status', '-completed_at'], name='combat_battle_defender_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:31
+
+import apps.combat.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0004_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='npc_crew',
+            field=models.IntegerField(default=20),
+        ),
+        migrations.AddField(
+            model_name='battle',
+            name='seed',
+            field=models.BigIntegerField(default=apps.combat.models.new_battle_seed),
+        ),
+    ]
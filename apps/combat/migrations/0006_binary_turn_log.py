@@ -0,0 +1,69 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:34
+
+import json
+import struct
+
+from django.db import migrations, models
+
+# Copia congelada del formato de BattleLog: turno, bando, acción, daños, evento, salud de ambos bandos
+RECORD = struct.Struct('<HBBHHbHH')
+ACTION_CODES = ('cannon', 'ram', 'board', 'repair', 'retreat')
+EVENT_CODES = ('critical_hit', 'miss', 'fire', 'storm', 'reinforcements', 'sabotage')
+UINT16_MAX = 0xFFFF
+
+
+def pack_turn_logs(apps, schema_editor):
+    Battle = apps.get_model('combat', 'Battle')
+    CombatEvent = apps.get_model('combat', 'CombatEvent')
+    CombatTurn = apps.get_model('combat', 'CombatTurn')
+
+    # Turnos de CombatTurn: sin salud registrada ni eventos
+    records = {}
+    turns = CombatTurn.objects.order_by('battle_id', 'turn_number', 'pk').values_list(
+        'battle_id', 'battle__attacker_id', 'acting_player_id', 'turn_number', 'action_type',
+        'damage_dealt', 'damage_received',
+    )
+    for battle_id, attacker_id, acting_player_id, turn, action, dealt, received in turns.iterator():
+        records.setdefault(battle_id, []).append(RECORD.pack(
+            min(turn, UINT16_MAX),
+            0 if acting_player_id == attacker_id else 1,
+            ACTION_CODES.index(action) if action in ACTION_CODES else 0,
+            max(0, min(dealt, UINT16_MAX)),
+            max(0, min(received, UINT16_MAX)),
+            -1, 0, 0,
+        ))
+
+    # Logs JSON del CombatEngine guardados en battle_log, con el evento como índice en CombatEvent por pk
+    event_codes = [
+        EVENT_CODES.index(event_type)
+        for event_type in CombatEvent.objects.order_by('pk').values_list('event_type', flat=True)
+    ]
+    engine_logs = Battle.objects.filter(battle_log__startswith='[').values_list('pk', 'battle_log')
+    for battle_id, battle_log in engine_logs.iterator():
+        records[battle_id] = [
+            RECORD.pack(*entry[:5], event_codes[entry[5]] if entry[5] >= 0 else -1, *entry[6:])
+            for entry in json.loads(battle_log)
+        ]
+        Battle.objects.filter(pk=battle_id).update(battle_log='')
+
+    for battle_id, packed in records.items():
+        Battle.objects.filter(pk=battle_id).update(turn_log=b''.join(packed))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0005_battle_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='turn_log',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(pack_turn_logs, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='CombatTurn',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0006_binary_turn_log'),
+        ('players', '0002_gold_transaction'),
+        ('ships', '0005_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='battle',
+            name='combat_battle_attacker_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='battle',
+            name='combat_battle_defender_idx',
+        ),
+        migrations.AddIndex(
+            model_name='battle',
+            index=models.Index(fields=['attacker', 'status', '-completed_at', '-id'], name='combat_battle_attacker_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='battle',
+            index=models.Index(fields=['defender', 'status', '-completed_at', '-id'], name='combat_battle_defender_idx'),
+        ),
+    ]
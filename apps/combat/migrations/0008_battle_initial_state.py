@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0007_keyset_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='initial_state',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
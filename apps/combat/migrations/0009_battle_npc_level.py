@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combat', '0008_battle_initial_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='battle',
+            name='npc_level',
+            field=models.IntegerField(default=1),
+        ),
+    ]
@@ -1,12 +1,18 @@
 from django.db import models
-from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.core.dirty_fields import DirtyFieldsMixin
 from apps.players.models import Player
 from apps.ships.models import Ship
-import random
+from apps.players.services.gold_ledger import GoldLedger
+import secrets
 
 
-class Battle(models.Model):
+def new_battle_seed():
+    """Semilla aleatoria para el generador de turnos de una batalla"""
+    return secrets.randbits(31)
+
+
+class Battle(DirtyFieldsMixin, models.Model):
     """Batalla naval entre jugadores o contra NPCs"""
     
     BATTLE_TYPES = [
@@ -38,6 +44,8 @@ class Battle(models.Model):
     npc_attack_power = models.IntegerField(default=20)
     npc_defense = models.IntegerField(default=15)
     npc_type = models.CharField(max_length=50, default='pirate')
+    npc_crew = models.IntegerField(default=20)
+    npc_level = models.IntegerField(default=1)
     
     # Características de la batalla
     battle_type = models.CharField(max_length=20, choices=BATTLE_TYPES)
@@ -55,8 +63,13 @@ class Battle(models.Model):
     experience_reward = models.IntegerField(default=0)
     loot_earned = models.TextField(blank=True)  # JSON con el botín obtenido
     
-    # Log de la batalla
-    battle_log = models.TextField(blank=True)
+    # Log de la batalla: registros binarios de ancho fijo (ver BattleLog), reproducibles a partir de la semilla
+    seed = models.BigIntegerField(default=new_battle_seed)
+    turn_log = models.BinaryField(default=b'', editable=False)
+    # Bandos y eventos de combate tal como estaban al empezar: el log se reproduce
+    # sobre ellos y no sobre el estado actual del barco o la tripulación
+    initial_state = models.JSONField(default=dict, blank=True, editable=False)
+    battle_log = models.TextField(blank=True)  # Resumen en texto libre
     
     @property
     def npc_health_percentage(self):
@@ -68,6 +81,11 @@ class Battle(models.Model):
     class Meta:
         verbose_name = "Batalla"
         verbose_name_plural = "Batallas"
+        # Con id al final: cubren el orden completo de la paginación por clave del historial
+        indexes = [
+            models.Index(fields=['attacker', 'status', '-completed_at', '-id'], name='combat_battle_attacker_idx'),
+            models.Index(fields=['defender', 'status', '-completed_at', '-id'], name='combat_battle_defender_idx'),
+        ]
         ordering = ['-started_at']
     
     def __str__(self):
@@ -94,54 +112,12 @@ class Battle(models.Model):
         return True
     
     def resolve_battle(self):
-        """Resolver el resultado de la batalla"""
+        """Resolver el resultado de la batalla con el motor de combate"""
         if self.status != 'in_progress':
             return
         
-        # Calcular poder de combate de cada lado
-        attacker_power = self.calculate_combat_power(self.attacker, self.attacker_ship)
-        
-        if self.defender and self.defender_ship:
-            defender_power = self.calculate_combat_power(self.defender, self.defender_ship)
-        else:
-            # NPC con poder aleatorio
-            defender_power = random.randint(50, 200)
-        
-        # Determinar ganador
-        total_power = attacker_power + defender_power
-        attacker_chance = attacker_power / total_power
-        
-        if random.random() < attacker_chance:
-            # Atacante gana
-            self.winner = self.attacker
-            self.process_victory(self.attacker, self.defender)
-        else:
-            # Defensor gana
-            self.winner = self.defender
-            self.process_victory(self.defender, self.attacker)
-        
-        self.status = 'completed'
-        self.completed_at = timezone.now()
-        
-        # Liberar barcos
-        self.attacker_ship.status = 'docked'
-        self.attacker_ship.save()
-        
-        if self.defender_ship:
-            self.defender_ship.status = 'docked'
-            self.defender_ship.save()
-        
-        self.save()
-    
-    def calculate_combat_power(self, player, ship):
-        """Calcular poder de combate total"""
-        base_power = ship.firepower + ship.defense
-        skill_bonus = player.combat_skill * 10
-        crew_bonus = ship.crew_count * 2
-        health_penalty = (100 - ship.hull_health) * 0.5
-        
-        total_power = base_power + skill_bonus + crew_bonus - health_penalty
-        return max(10, total_power)
+        from apps.combat.services.battle_service import BattleService
+        BattleService.resolve_battle(self)
     
     def process_victory(self, winner, loser):
         """Procesar victoria y recompensas"""
@@ -155,55 +131,19 @@ class Battle(models.Model):
         self.experience_reward = base_exp + level_diff_bonus
         winner.add_experience(self.experience_reward)
         
-        # Oro (stakes + bonus)
-        gold_reward = self.gold_stakes
-        if loser and loser.gold > 0:
-            stolen_gold = min(loser.gold, self.gold_stakes // 2)
-            loser.gold -= stolen_gold
-            gold_reward += stolen_gold
-            loser.save()
-        
-        winner.gold += gold_reward
+        # Oro: stakes más el botín tomado del perdedor (hasta la mitad de los stakes)
+        reference = f'battle:{self.pk}'
+        GoldLedger.credit(winner, self.gold_stakes, 'battle_reward', reference)
+        if loser:
+            GoldLedger.transfer(loser, winner, self.gold_stakes // 2, 'battle_plunder', reference, partial=True)
         
         # Actualizar estadísticas
         winner.total_battles_won += 1
         if loser:
             loser.total_battles_lost += 1
-            loser.save()
+            loser.save(update_fields=['total_battles_lost'])
         
-        winner.save()
-
-
-class CombatTurn(models.Model):
-    """Turnos individuales de combate"""
-    
-    ACTION_TYPES = [
-        ('cannon', 'Disparo de Cañón'),
-        ('ram', 'Embestida'),
-        ('board', 'Abordaje'),
-        ('repair', 'Reparación'),
-        ('retreat', 'Retirada'),
-    ]
-    
-    battle = models.ForeignKey(Battle, on_delete=models.CASCADE, related_name='turns')
-    turn_number = models.IntegerField()
-    acting_player = models.ForeignKey(Player, on_delete=models.CASCADE)
-    action_type = models.CharField(max_length=20, choices=ACTION_TYPES)
-    
-    # Resultados del turno
-    damage_dealt = models.IntegerField(default=0)
-    damage_received = models.IntegerField(default=0)
-    description = models.TextField()
-    
-    timestamp = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        verbose_name = "Turno de Combate"
-        verbose_name_plural = "Turnos de Combate"
-        ordering = ['battle', 'turn_number']
-    
-    def __str__(self):
-        return f"Turno {self.turn_number} - {self.acting_player.captain_name}: {self.get_action_type_display()}"
+        winner.save(update_fields=['level', 'experience', 'total_battles_won'])
 
 
 class PirateFleet(models.Model):
@@ -0,0 +1,78 @@
+"""
+BattleLog: Log de turnos de una batalla en formato binario compacto.
+Cada acción es un registro de ancho fijo (turno, bando, acción, daño causado,
+daño recibido, evento, salud de ambos bandos) empaquetado con struct y añadido al
+final del campo Battle.turn_log; las descripciones no se guardan, se generan con
+plantillas al mostrar el log.
+"""
+import struct
+
+from apps.combat.models import CombatEvent
+from apps.combat.services.combat_engine import ACTIONS
+
+# turno, bando, acción, daño causado, daño recibido, evento (-1 sin evento), salud atacante, salud defensor
+RECORD = struct.Struct('<HBBHHbHH')
+
+# Códigos de acción del log; 'retreat' solo aparece en turnos migrados de CombatTurn
+ACTION_CODES = ACTIONS + ('retreat',)
+
+# Códigos de evento: posición del tipo en CombatEvent.EVENT_TYPES
+EVENT_CODES = tuple(event_type for event_type, _ in CombatEvent.EVENT_TYPES)
+EVENT_LABELS = dict(CombatEvent.EVENT_TYPES)
+
+ACTION_DESCRIPTIONS = {
+    'cannon': '{actor} disparó sus cañones',
+    'ram': '{actor} embistió a {target}',
+    'board': '{actor} intentó abordar a {target}',
+    'repair': '{actor} reparó su casco',
+    'retreat': '{actor} se retiró del combate',
+}
+
+
+class BattleLog:
+    @staticmethod
+    def pack(entries):
+        """Empaqueta entradas del CombatEngine en registros binarios."""
+        return b''.join(RECORD.pack(*entry) for entry in entries)
+
+    @staticmethod
+    def unpack(data):
+        """Entradas guardadas como tuplas, en orden."""
+        return list(RECORD.iter_unpack(bytes(data or b'')))
+
+    @staticmethod
+    def count(battle):
+        """Número de registros guardados, sin desempaquetarlos."""
+        return len(battle.turn_log or b'') // RECORD.size
+
+    @staticmethod
+    def append(battle, entries):
+        """Añade registros al final del log de la batalla (sin guardarla)."""
+        battle.turn_log = bytes(battle.turn_log or b'') + BattleLog.pack(entries)
+
+    @staticmethod
+    def render(battle):
+        """Log estructurado con las descripciones generadas a partir de las plantillas."""
+        names = (battle.attacker_ship.name, battle.defender_ship.name if battle.defender_ship_id else battle.npc_name)
+        players = (battle.attacker, battle.defender)
+        log = []
+        for turn, side, action, dealt, received, event, attacker_health, defender_health in BattleLog.unpack(battle.turn_log):
+            action_type = ACTION_CODES[action]
+            description = ACTION_DESCRIPTIONS[action_type].format(actor=names[side], target=names[1 - side])
+            if action_type in ('cannon', 'board') and not dealt:
+                description += ' sin éxito'
+            event_type = EVENT_CODES[event] if event >= 0 else None
+            if event_type:
+                description += f' ({EVENT_LABELS[event_type]})'
+            log.append({
+                'turn_number': turn,
+                'player': players[side],
+                'action_type': action_type,
+                'event_type': event_type,
+                'description': description,
+                'damage_dealt': dealt,
+                'damage_received': received,
+                'attacker_health': attacker_health,
+                'defender_health': defender_health,
+            })
+        return log
@@ -0,0 +1,177 @@
+"""
+BattlePredictor: Predicción Monte Carlo del resultado de una caza de piratas.
+Simula miles de combates a la vez con arrays NumPy (uno por simulación) siguiendo
+las mismas reglas y la misma política automática que CombatEngine, y resume la
+probabilidad de victoria, el botín esperado y el daño esperado al casco.
+Las predicciones se guardan en caché por (estadísticas del barco, flota,
+habilidad de combate) y la semilla se deriva de esa misma clave, así que una
+combinación siempre produce la misma predicción.
+"""
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+from django.core.cache import cache
+
+from apps.combat.services.combat_engine import MAX_TURNS, Combatant
+
+SIMULATIONS = 2000
+
+PREDICTION_TIMEOUT = 3600
+
+
+@dataclass(frozen=True)
+class BattlePrediction:
+    """Resumen de las simulaciones de un enfrentamiento."""
+
+    win_probability: float
+    expected_gold: int
+    expected_hull_damage: float
+    expected_turns: float
+    simulations: int
+
+    @property
+    def win_percentage(self):
+        return round(self.win_probability * 100)
+
+
+class BattlePredictor:
+    CACHE_KEY = 'combat:prediction:{stats}:{fleet_id}:{combat_skill}'
+
+    @staticmethod
+    def predict_fleets(ship, player, fleets, crew_skills=None, simulations=SIMULATIONS):
+        """Predicción para cada flota ({fleet_id: BattlePrediction}), desde caché si está disponible."""
+        from apps.combat.services.battle_service import BattleService
+
+        fleets = list(fleets)
+        if crew_skills is None:
+            crew_skills = BattleService.crew_skills(ship)
+        stats = ','.join(str(value) for value in BattlePredictor.ship_vector(ship, crew_skills))
+        keys = {
+            fleet.pk: BattlePredictor.CACHE_KEY.format(stats=stats, fleet_id=fleet.pk, combat_skill=player.combat_skill)
+            for fleet in fleets
+        }
+        cached = cache.get_many(list(keys.values()))
+        predictions = {fleet_id: cached[key] for fleet_id, key in keys.items() if key in cached}
+
+        missing = [fleet for fleet in fleets if fleet.pk not in predictions]
+        if missing:
+            attacker = Combatant.from_ship(ship, player, crew_skills)
+            modifiers = BattleService.combat_modifiers()
+            computed = {}
+            for fleet in missing:
+                key = keys[fleet.pk]
+                prediction = BattlePredictor.predict(
+                    attacker, fleet, ship.hull_health, modifiers, simulations, seed=zlib.crc32(key.encode()),
+                )
+                predictions[fleet.pk] = computed[key] = prediction
+            cache.set_many(computed, PREDICTION_TIMEOUT)
+        return predictions
+
+    @staticmethod
+    def ship_vector(ship, crew_skills):
+        """Estadísticas del barco que influyen en el combate."""
+        return (
+            ship.firepower, ship.defense, ship.hull_health, ship.crew_count,
+            crew_skills.get('gunner', 0), crew_skills.get('quartermaster', 0), crew_skills.get('carpenter', 0),
+        )
+
+    @staticmethod
+    def predict(attacker, fleet, hull_health, modifiers=(), simulations=SIMULATIONS, seed=None):
+        """Simula `simulations` combates del bando `attacker` contra la flota y resume el resultado."""
+        winners, attacker_health, turns = BattlePredictor.simulate(
+            attacker, Combatant.from_pirate_fleet(fleet), modifiers, simulations, seed,
+        )
+        wins = winners == 0
+        # Misma conversión a la escala 0-100 del casco que BattleService al terminar
+        final_hull = -(-100 * attacker_health // attacker.max_health)
+        win_probability = float(wins.mean())
+        return BattlePrediction(
+            win_probability=win_probability,
+            expected_gold=round(win_probability * fleet.gold_reward),
+            expected_hull_damage=float((hull_health - final_hull).mean()),
+            expected_turns=float(turns.mean()),
+            simulations=simulations,
+        )
+
+    @staticmethod
+    def simulate(attacker, defender, modifiers=(), simulations=SIMULATIONS, seed=None, max_turns=MAX_TURNS):
+        """
+        Juega `simulations` combates en paralelo. Devuelve los arrays de bando
+        ganador (0 atacante, 1 defensor), salud final del atacante y turnos jugados.
+        """
+        rng = np.random.default_rng(seed)
+        sides = (attacker, defender)
+        health = np.array([[attacker.health], [defender.health]], dtype=np.int64).repeat(simulations, axis=1)
+        repairs = np.array([[attacker.repairs_left], [defender.repairs_left]], dtype=np.int64).repeat(simulations, axis=1)
+        winners = np.full(simulations, -1, dtype=np.int8)
+        turns = np.zeros(simulations, dtype=np.int64)
+
+        # Eventos: el índice -1 (sin evento) apunta al modificador neutro añadido al final
+        probabilities = np.array([modifier.probability for modifier in modifiers], dtype=np.int64)
+        durations = np.array([modifier.duration_turns for modifier in modifiers] + [0], dtype=np.int64)
+        damage_modifiers = np.array([modifier.damage_modifier for modifier in modifiers] + [1.0])
+        accuracy_modifiers = np.array([modifier.accuracy_modifier for modifier in modifiers] + [1.0])
+        active = np.full(simulations, -1, dtype=np.int64)
+        remaining = np.zeros(simulations, dtype=np.int64)
+
+        for turn in range(1, max_turns + 1):
+            running = winners < 0
+            if not running.any():
+                break
+            if len(modifiers):
+                remaining = np.where(active >= 0, remaining - 1, 0)
+                active = np.where(remaining > 0, active, -1)
+                hits = rng.integers(1, 101, size=(simulations, len(modifiers))) <= probabilities
+                starts = (active < 0) & hits.any(axis=1)
+                first = hits.argmax(axis=1)
+                active = np.where(starts, first, active)
+                remaining = np.where(starts, durations[first], remaining)
+            damage_modifier = damage_modifiers[active]
+            accuracy_modifier = accuracy_modifiers[active]
+
+            BattlePredictor._act(rng, sides, health, repairs, 0, running, damage_modifier, accuracy_modifier)
+            BattlePredictor._act(
+                rng, sides, health, repairs, 1, running & (health[1] > 0), damage_modifier, accuracy_modifier,
+            )
+            winners[running & (health[1] <= 0)] = 0
+            winners[running & (health[1] > 0) & (health[0] <= 0)] = 1
+            turns[running] = turn
+
+        # Sin hundimiento: gana quien conserve más salud relativa (el defensor en empate)
+        undecided = winners < 0
+        ahead = health[0] / attacker.max_health > health[1] / defender.max_health
+        winners[undecided] = np.where(ahead[undecided], 0, 1)
+        return winners, health[0], turns
+
+    @staticmethod
+    def _act(rng, sides, health, repairs, side, mask, damage_modifier, accuracy_modifier):
+        """Acción de un bando en las simulaciones de `mask`, con la política de choose_action."""
+        actor, target = sides[side], sides[1 - side]
+        own, other = health[side], health[1 - side]
+        size = len(own)
+
+        repair = (own / actor.max_health < 0.35) & (repairs[side] > 0)
+        board = ~repair & (other / target.max_health < 0.25) & (actor.boarding > target.boarding)
+        ram = ~repair & ~board & (target.defense // 2 >= actor.firepower) & (own / actor.max_health > 0.5)
+        cannon = ~(repair | board | ram)
+
+        hit = rng.random(size) < actor.accuracy * accuracy_modifier
+        cannon_damage = np.maximum(
+            1, ((actor.firepower + rng.integers(-10, 11, size) - target.defense // 2) * damage_modifier).astype(np.int64)
+        )
+        ram_damage = np.maximum(1, ((actor.firepower // 2 + rng.integers(5, 16, size)) * damage_modifier).astype(np.int64))
+        ram_recoil = rng.integers(5, 11, size) + target.defense // 4
+        boarded = rng.random(size) < actor.boarding / max(1, actor.boarding + target.boarding)
+        board_damage = np.maximum(1, (target.max_health * 0.25 * damage_modifier).astype(np.int64))
+        board_recoil = rng.integers(5, 16, size)
+        healed = rng.integers(actor.repair_power // 2, actor.repair_power + 1, size)
+
+        dealt = np.select([cannon & hit, ram, board & boarded], [cannon_damage, ram_damage, board_damage], 0)
+        received = np.select([ram, board & ~boarded], [ram_recoil, board_recoil], 0)
+        repaired = repair & mask
+
+        health[1 - side] = np.where(mask, np.maximum(0, other - dealt), other)
+        own = np.where(repaired, np.minimum(actor.max_health, own + healed), own)
+        health[side] = np.where(mask, np.maximum(0, own - received), own)
+        repairs[side] -= repaired
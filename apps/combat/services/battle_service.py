@@ -1,62 +1,220 @@
 """
 BattleService: Lógica de negocio para batallas navales.
-Reutilizable y desacoplada de las vistas.
+Reutilizable y desacoplada de las vistas. Los turnos se resuelven en memoria con
+CombatEngine; de la batalla solo se guardan los bandos al empezar, el log binario
+de turnos (BattleLog) y, al terminar, el estado final de los barcos y el ganador.
 """
-from apps.combat.models import Battle, CombatTurn, PirateFleet
+from dataclasses import asdict
+
+from apps.combat.models import Battle, CombatEvent, PirateFleet
+from apps.combat.services.battle_log import BattleLog
+from apps.combat.services.combat_engine import ACTIONS, ATTACKER, Combatant, CombatEngine, CombatModifier
 from apps.players.models import Player
 from apps.ships.models import Ship
+from django.db import transaction
+from django.db.models import Sum
 from django.utils import timezone
-import random
+
 
 class BattleService:
     @staticmethod
     def start_battle(attacker: Player, defender: Player = None, attacker_ship: Ship = None, defender_ship: Ship = None, battle_type: str = 'pve', npc_data=None):
-        """Crea e inicia una batalla."""
-        battle = Battle.objects.create(
-            attacker=attacker,
-            defender=defender,
-            attacker_ship=attacker_ship,
-            defender_ship=defender_ship,
-            battle_type=battle_type,
-            status='in_progress',
-            npc_name=npc_data.get('name', '') if npc_data else '',
-            npc_health=npc_data.get('health', 100) if npc_data else 100,
-            npc_max_health=npc_data.get('max_health', 100) if npc_data else 100,
-            npc_attack_power=npc_data.get('attack_power', 20) if npc_data else 20,
-            npc_defense=npc_data.get('defense', 15) if npc_data else 15,
-            npc_type=npc_data.get('type', 'pirate') if npc_data else 'pirate',
-        )
-        battle.start_battle()
+        """
+        Crea e inicia una batalla. Los barcos pasan a 'combat' solo si siguen
+        atracados (ValueError si alguno no lo está) y los bandos quedan fijados en
+        Battle.initial_state.
+        """
+        with transaction.atomic():
+            for ship in (attacker_ship, defender_ship):
+                if ship is None:
+                    continue
+                # UPDATE condicional: dos peticiones simultáneas no pueden llevar el mismo barco a dos batallas
+                if not Ship.objects.filter(pk=ship.pk, status='docked').update(status='combat'):
+                    raise ValueError(f'El barco {ship.name} no está atracado')
+                ship.status = 'combat'
+                ship.mark_clean(['status'])
+
+            battle = Battle(
+                attacker=attacker,
+                defender=defender,
+                attacker_ship=attacker_ship,
+                defender_ship=defender_ship,
+                battle_type=battle_type,
+                status='in_progress',
+                npc_name=npc_data.get('name', '') if npc_data else '',
+                npc_health=npc_data.get('health', 100) if npc_data else 100,
+                npc_max_health=npc_data.get('max_health', 100) if npc_data else 100,
+                npc_attack_power=npc_data.get('attack_power', 20) if npc_data else 20,
+                npc_defense=npc_data.get('defense', 15) if npc_data else 15,
+                npc_type=npc_data.get('type', 'pirate') if npc_data else 'pirate',
+                npc_crew=npc_data.get('crew', 20) if npc_data else 20,
+                npc_level=npc_data.get('level', 1) if npc_data else 1,
+                gold_stakes=npc_data.get('gold_reward', 0) if npc_data else 0,
+            )
+            attacker_state, defender_state = BattleService.initial_combatants(battle)
+            battle.initial_state = {
+                'attacker': asdict(attacker_state),
+                'defender': asdict(defender_state),
+                'modifiers': [asdict(modifier) for modifier in BattleService.combat_modifiers()],
+            }
+            battle.save()
         return battle
 
+    @staticmethod
+    def pirate_fleet_npc_data(fleet: PirateFleet):
+        """npc_data de una batalla contra la flota, con las mismas estadísticas que Combatant.from_pirate_fleet."""
+        return {
+            'name': fleet.name,
+            'health': fleet.defense * 10,
+            'max_health': fleet.defense * 10,
+            'attack_power': fleet.firepower,
+            'defense': fleet.defense,
+            'type': fleet.fleet_type,
+            'crew': fleet.crew_size,
+            'level': fleet.level,
+            'gold_reward': fleet.gold_reward,
+        }
+
+    @staticmethod
+    def initial_combatants(battle: Battle):
+        """Bandos de la batalla a partir del estado actual de barcos, tripulación y NPC."""
+        attacker = Combatant.from_ship(
+            battle.attacker_ship, battle.attacker, BattleService.crew_skills(battle.attacker_ship)
+        )
+        if battle.defender_id and battle.defender_ship_id:
+            defender = Combatant.from_ship(
+                battle.defender_ship, battle.defender, BattleService.crew_skills(battle.defender_ship)
+            )
+        else:
+            defender = Combatant.from_npc(
+                battle.npc_name, battle.npc_attack_power, battle.npc_defense, battle.npc_max_health, battle.npc_crew,
+                battle.npc_level,
+            )
+        return attacker, defender
+
+    @staticmethod
+    def build_engine(battle: Battle):
+        """
+        Construye el motor con los bandos guardados al empezar la batalla y
+        reproduce los turnos ya jugados.
+        """
+        state = battle.initial_state
+        if state:
+            attacker = Combatant(**state['attacker'])
+            defender = Combatant(**state['defender'])
+            modifiers = [CombatModifier(**modifier) for modifier in state['modifiers']]
+        else:
+            # Batallas empezadas antes de guardar initial_state
+            attacker, defender = BattleService.initial_combatants(battle)
+            modifiers = BattleService.combat_modifiers()
+        engine = CombatEngine(attacker, defender, battle.seed, modifiers)
+        engine.replay(BattleService.load_log(battle))
+        return engine
+
+    @staticmethod
+    def crew_skills(ship: Ship):
+        """Suma de niveles de la tripulación del barco por tipo de tripulante."""
+        return dict(
+            ship.crew_members.values('crew_type').annotate(total=Sum('skill_level')).values_list('crew_type', 'total')
+        )
+
+    @staticmethod
+    def combat_modifiers():
+        return [CombatModifier.from_event(event) for event in CombatEvent.objects.order_by('pk')]
+
     @staticmethod
     def resolve_battle(battle: Battle):
-        """Resuelve la batalla y asigna recompensas."""
-        battle.resolve_battle()
+        """Resuelve la batalla de una vez, sin consultas por turno, y asigna recompensas."""
+        with transaction.atomic():
+            BattleService._lock(battle)
+            engine = BattleService.build_engine(battle)
+            start = len(engine.log)
+            engine.run()
+            BattleService._persist(battle, engine, engine.log[start:])
         return battle
 
     @staticmethod
     def process_turn(battle: Battle, acting_player: Player, action_type: str):
-        """Procesa un turno de combate y actualiza el estado."""
-        # Aquí iría la lógica de daño, defensa, etc. (puede delegarse a otro servicio)
-        turn_number = CombatTurn.objects.filter(battle=battle).count() + 1
-        turn = CombatTurn.objects.create(
-            battle=battle,
-            turn_number=turn_number,
-            acting_player=acting_player,
-            action_type=action_type,
-            damage_dealt=random.randint(10, 50),
-            damage_received=random.randint(5, 30),
-            description=f"{acting_player.captain_name} realizó {action_type}"
-        )
-        return turn
+        """
+        Juega un turno con la acción del jugador y la respuesta del rival.
+        Devuelve las entradas del log del turno (ValueError si la batalla ya terminó).
+        """
+        if action_type not in ACTIONS:
+            raise ValueError(f'Acción de combate desconocida: {action_type}')
+        with transaction.atomic():
+            BattleService._lock(battle)
+            engine = BattleService.build_engine(battle)
+            entries = engine.play_turn(action_type)
+            BattleService._persist(battle, engine, entries)
+        return entries
 
     @staticmethod
     def get_battle_log(battle: Battle):
         """Devuelve el log de la batalla en formato estructurado."""
-        return list(battle.turns.order_by('turn_number').values('turn_number', 'acting_player__captain_name', 'action_type', 'description', 'damage_dealt', 'damage_received'))
+        return BattleLog.render(battle)
+
+    @staticmethod
+    def load_log(battle: Battle):
+        """Turnos guardados de la batalla como tuplas del CombatEngine."""
+        return BattleLog.unpack(battle.turn_log)
 
     @staticmethod
     def get_active_pirate_fleets(player: Player):
         """Obtiene flotas piratas activas para el nivel del jugador."""
         return PirateFleet.objects.filter(is_active=True, level__lte=player.level + 2)
+
+    @staticmethod
+    def _lock(battle: Battle):
+        """
+        Relee la batalla con su fila bloqueada hasta el final de la transacción:
+        los turnos de una misma batalla se juegan de uno en uno y cada uno parte
+        del log que dejó el anterior.
+        """
+        battle.refresh_from_db(from_queryset=Battle.objects.select_for_update())
+        if battle.status != 'in_progress':
+            raise ValueError('La batalla ya ha terminado')
+
+    @staticmethod
+    def _persist(battle: Battle, engine: CombatEngine, entries):
+        """
+        Añade las entradas nuevas al log y, si el combate terminó, guarda el estado
+        final y las recompensas. Las entradas se pasan aparte: en un log migrado la
+        reproducción no regenera todos los registros guardados.
+        """
+        BattleLog.append(battle, entries)
+        if not battle.defender_ship_id:
+            battle.npc_health = engine.defender.health
+        if not engine.finished:
+            battle.save(update_fields=['turn_log', 'npc_health'])
+            return
+
+        with transaction.atomic():
+            # Solo quien pasa la batalla a 'completed' reparte las recompensas
+            if not Battle.objects.filter(pk=battle.pk, status='in_progress').update(status='completed'):
+                raise ValueError('La batalla ya ha terminado')
+            battle.status = 'completed'
+            battle.mark_clean(['status'])
+
+            ships = [(battle.attacker_ship, engine.attacker)]
+            if battle.defender_ship_id:
+                ships.append((battle.defender_ship, engine.defender))
+            for ship, state in ships:
+                # La salud del motor vuelve a la escala 0-100 del casco
+                ship.hull_health = -(-100 * state.health // state.max_health)
+                ship.status = 'docked'
+                ship.save()
+
+            if engine.winner == ATTACKER:
+                battle.winner = battle.attacker
+                battle.process_victory(battle.attacker, battle.defender)
+            elif battle.defender_id:
+                battle.winner = battle.defender
+                battle.process_victory(battle.defender, battle.attacker)
+            else:
+                # Gana el NPC: sin recompensas, el atacante suma una derrota
+                battle.winner = None
+                battle.attacker.total_battles_lost += 1
+                battle.attacker.save(update_fields=['total_battles_lost'])
+
+            battle.completed_at = timezone.now()
+            battle.save()
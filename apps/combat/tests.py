@@ -0,0 +1,335 @@
+import copy
+from dataclasses import asdict
+from importlib import import_module
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from apps.combat.models import Battle, CombatEvent, PirateFleet
+from apps.combat.services.battle_log import RECORD, BattleLog
+from apps.combat.services.battle_predictor import BattlePredictor
+from apps.combat.services.battle_service import BattleService
+from apps.combat.services.combat_engine import ATTACKER, CombatEngine, Combatant
+from apps.players.models import GoldTransaction, Player
+from apps.ships.models import Ship, ShipType
+
+NPC_DATA = {
+    'name': 'Corsarios', 'health': 400, 'max_health': 400, 'attack_power': 30,
+    'defense': 40, 'crew': 20, 'gold_reward': 100,
+}
+WEAK_NPC_DATA = {**NPC_DATA, 'health': 1, 'max_health': 1}
+
+binary_turn_log = import_module('apps.combat.migrations.0006_binary_turn_log')
+
+
+class BattleServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('combat', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Combate')
+        ship_type = ShipType.objects.create(
+            name='Fragata de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=40,
+            base_defense=30, base_crew_capacity=20, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Fragata', speed=5, cargo_capacity=100,
+            firepower=40, defense=30, crew_capacity=20, crew_count=20,
+        )
+
+    def _start(self, npc_data=NPC_DATA):
+        ship = Ship.objects.get(pk=self.ship.pk)
+        return BattleService.start_battle(attacker=self.player, attacker_ship=ship, npc_data=npc_data)
+
+    def test_start_battle_moves_the_ship_to_combat(self):
+        battle = self._start()
+
+        self.assertEqual(battle.status, 'in_progress')
+        self.assertEqual(Ship.objects.get(pk=self.ship.pk).status, 'combat')
+        self.assertEqual(battle.initial_state['attacker']['health'], 100 + 30 * 5)
+
+    def test_ship_already_in_combat_cannot_start_another_battle(self):
+        self._start()
+
+        with self.assertRaises(ValueError):
+            self._start()
+        self.assertEqual(Battle.objects.count(), 1)
+
+    def test_replay_ignores_changes_to_the_ship_during_the_battle(self):
+        battle = self._start()
+        BattleService.process_turn(battle, self.player, 'cannon')
+        BattleService.process_turn(battle, self.player, 'cannon')
+        expected = BattleService.build_engine(Battle.objects.get(pk=battle.pk)).log
+
+        Ship.objects.filter(pk=self.ship.pk).update(hull_health=10, firepower=1)
+        self.player.combat_skill = 20
+        self.player.save()
+
+        replayed = BattleService.build_engine(Battle.objects.get(pk=battle.pk)).log
+        self.assertEqual(replayed, expected)
+
+    def test_pirate_battle_uses_the_same_npc_as_the_predictor(self):
+        fleet = PirateFleet.objects.create(
+            name='Flota veterana', fleet_type='warship', firepower=50, defense=40, speed=5,
+            crew_size=30, level=15, gold_reward=300, experience_reward=100,
+        )
+        ship = Ship.objects.get(pk=self.ship.pk)
+
+        battle = BattleService.start_battle(
+            attacker=self.player, attacker_ship=ship, npc_data=BattleService.pirate_fleet_npc_data(fleet),
+        )
+
+        self.assertEqual(battle.initial_state['defender'], asdict(Combatant.from_pirate_fleet(fleet)))
+        self.assertEqual(BattleService.build_engine(battle).defender, Combatant.from_pirate_fleet(fleet))
+
+    def test_turns_from_a_stale_copy_extend_the_saved_log(self):
+        battle = self._start()
+        stale = Battle.objects.get(pk=battle.pk)
+
+        BattleService.process_turn(battle, self.player, 'cannon')
+        BattleService.process_turn(stale, self.player, 'cannon')
+
+        log = BattleService.load_log(Battle.objects.get(pk=battle.pk))
+        self.assertEqual(sum(1 for entry in log if entry[1] == ATTACKER), 2)
+
+    def test_finished_battle_is_rewarded_once(self):
+        battle = self._start(WEAK_NPC_DATA)
+        stale = Battle.objects.get(pk=battle.pk)
+
+        # La semilla es aleatoria: el primer disparo puede fallar
+        while battle.status == 'in_progress':
+            BattleService.process_turn(battle, self.player, 'cannon')
+        self.assertEqual(battle.winner, self.player)
+        with self.assertRaises(ValueError):
+            BattleService.process_turn(stale, self.player, 'cannon')
+
+        self.assertEqual(Player.objects.get(pk=self.player.pk).total_battles_won, 1)
+        self.assertEqual(GoldTransaction.objects.filter(reason='battle_reward').count(), 1)
+
+    def test_migrated_log_with_a_retreat_replays(self):
+        # Turnos de CombatTurn tal como los empaqueta la migración 0006 (sin salud ni eventos)
+        codes = binary_turn_log.ACTION_CODES
+        legacy = b''.join(
+            binary_turn_log.RECORD.pack(turn, side, codes.index(action), dealt, 0, -1, 0, 0)
+            for turn, side, action, dealt in ((1, 0, 'cannon', 20), (1, 1, 'cannon', 10), (2, 0, 'retreat', 0))
+        )
+        battle = self._start()
+        Battle.objects.filter(pk=battle.pk).update(turn_log=legacy)
+        battle = Battle.objects.get(pk=battle.pk)
+
+        self.assertEqual(BattleService.build_engine(battle).turn, 1)
+        entries = BattleService.process_turn(battle, self.player, 'cannon')
+
+        saved = bytes(Battle.objects.get(pk=battle.pk).turn_log)
+        self.assertTrue(saved.startswith(legacy))
+        self.assertEqual(BattleService.load_log(battle)[3:], [tuple(entry) for entry in entries])
+        self.assertEqual(BattleService.get_battle_log(battle)[2]['action_type'], 'retreat')
+
+
+class BattlePredictorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('predictor', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Adivina')
+        ship_type = ShipType.objects.create(
+            name='Bergantín de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=40,
+            base_defense=10, base_crew_capacity=20, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Bergantín', speed=5, cargo_capacity=100,
+            firepower=40, defense=10, crew_capacity=20, crew_count=20,
+        )
+        # Flota pareja con el barco: una victoria de cada dos, aproximadamente
+        cls.fleets = [
+            PirateFleet.objects.create(
+                name=f'Flota de pruebas {firepower}', fleet_type='raider', firepower=firepower, defense=14, speed=5,
+                crew_size=20, level=5, gold_reward=200, experience_reward=50,
+            )
+            for firepower in (45, 30)
+        ]
+        CombatEvent.objects.create(
+            name='Tormenta', event_type='storm', description='', probability=15,
+            damage_modifier=1.5, accuracy_modifier=0.8, duration_turns=2,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_predictions_are_deterministic(self):
+        first = BattlePredictor.predict_fleets(self.ship, self.player, self.fleets, simulations=500)
+        cache.clear()
+        second = BattlePredictor.predict_fleets(self.ship, self.player, self.fleets, simulations=500)
+
+        self.assertEqual(first, second)
+        self.assertEqual(set(first), {fleet.pk for fleet in self.fleets})
+        self.assertNotEqual(first[self.fleets[0].pk], first[self.fleets[1].pk])
+
+    def test_simulations_with_the_same_seed_repeat(self):
+        attacker = Combatant.from_ship(self.ship, self.player)
+        defender = Combatant.from_pirate_fleet(self.fleets[0])
+        modifiers = BattleService.combat_modifiers()
+
+        first = BattlePredictor.simulate(attacker, defender, modifiers, 500, seed=7)
+        second = BattlePredictor.simulate(attacker, defender, modifiers, 500, seed=7)
+
+        for a, b in zip(first, second):
+            self.assertEqual(a.tolist(), b.tolist())
+
+    def test_win_rate_matches_the_combat_engine(self):
+        simulations = 2000
+        fleet = self.fleets[0]
+        attacker = Combatant.from_ship(self.ship, self.player)
+        defender = Combatant.from_pirate_fleet(fleet)
+        modifiers = BattleService.combat_modifiers()
+
+        prediction = BattlePredictor.predict(attacker, fleet, self.ship.hull_health, modifiers, simulations, seed=1)
+        engines = [
+            CombatEngine(copy.copy(attacker), copy.copy(defender), seed, modifiers) for seed in range(simulations)
+        ]
+        wins = sum(engine.run() == ATTACKER for engine in engines)
+
+        # Dos estimaciones independientes de ~0.5 con 2000 muestras: error típico de la diferencia ≈ 0.016
+        self.assertGreater(prediction.win_probability, 0.3)
+        self.assertLess(prediction.win_probability, 0.7)
+        self.assertAlmostEqual(prediction.win_probability, wins / simulations, delta=0.06)
+        self.assertAlmostEqual(
+            prediction.expected_turns, sum(engine.turn for engine in engines) / simulations, delta=0.3,
+        )
+
+
+class BattleLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('chronicler', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Cronista')
+        ship_type = ShipType.objects.create(
+            name='Bergantín de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=40,
+            base_defense=30, base_crew_capacity=20, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Bergantín', speed=5, cargo_capacity=100,
+            firepower=40, defense=30, crew_capacity=20, crew_count=20,
+        )
+
+    def _battle(self):
+        return Battle.objects.create(
+            attacker=self.player, attacker_ship=self.ship, battle_type='pve', status='in_progress',
+            npc_name='Corsarios',
+        )
+
+    def test_pack_unpack_round_trip(self):
+        entries = [(1, 0, 0, 25, 0, -1, 250, 375), (1, 1, 1, 12, 8, 2, 238, 367)]
+
+        data = BattleLog.pack(entries)
+
+        self.assertEqual(len(data), 2 * RECORD.size)
+        self.assertEqual(BattleLog.unpack(data), entries)
+        self.assertEqual(BattleLog.unpack(b''), [])
+
+    def test_append_adds_records_at_the_end(self):
+        battle = self._battle()
+        BattleLog.append(battle, [(1, 0, 0, 25, 0, -1, 250, 375)])
+        BattleLog.append(battle, [(1, 1, 3, 0, 0, -1, 250, 375)])
+        battle.save()
+
+        battle = Battle.objects.get(pk=battle.pk)
+        self.assertEqual(BattleLog.count(battle), 2)
+        self.assertEqual([entry[2] for entry in BattleLog.unpack(battle.turn_log)], [0, 3])
+
+    def test_render_describes_each_action(self):
+        battle = self._battle()
+        BattleLog.append(battle, [
+            (1, 0, 0, 0, 0, -1, 250, 400),
+            (1, 1, 1, 12, 8, 2, 238, 392),
+            (2, 0, 4, 0, 0, -1, 238, 392),
+        ])
+
+        log = BattleLog.render(battle)
+
+        self.assertEqual([turn['description'] for turn in log], [
+            'Bergantín disparó sus cañones sin éxito',
+            'Corsarios embistió a Bergantín (Incendio)',
+            'Bergantín se retiró del combate',
+        ])
+        self.assertEqual([turn['player'] for turn in log], [self.player, None, self.player])
+        self.assertEqual(log[1]['event_type'], 'fire')
+        self.assertEqual((log[1]['attacker_health'], log[1]['defender_health']), (238, 392))
+
+    def test_battle_detail_shows_the_log(self):
+        battle = self._battle()
+        BattleLog.append(battle, [(1, 0, 0, 25, 0, -1, 250, 375)])
+        battle.save()
+        self.client.force_login(self.player.user)
+
+        response = self.client.get(f'/combat/battle/{battle.pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Bergantín disparó sus cañones')
+        self.assertContains(response, 'name="action_type" value="cannon"')
+
+
+class BinaryTurnLogMigrationTests(TransactionTestCase):
+    before = [('combat', '0005_battle_seed')]
+    after = [('combat', '0006_binary_turn_log')]
+
+    def setUp(self):
+        user = User.objects.create_user('veteran', password='x')
+        self.player = Player.objects.create(user=user, captain_name='Veterana')
+        self.rival = Player.objects.create(user=User.objects.create_user('rival', password='x'), captain_name='Rival')
+        ship_type = ShipType.objects.create(
+            name='Corbeta de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=40,
+            base_defense=30, base_crew_capacity=20, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        self.ship = Ship.objects.create(
+            owner=self.player, ship_type=ship_type, name='Corbeta', speed=5, cargo_capacity=100,
+            firepower=40, defense=30, crew_capacity=20, crew_count=20,
+        )
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.old_apps = executor.loader.project_state(self.before).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_turns_and_engine_logs_are_packed(self):
+        OldBattle = self.old_apps.get_model('combat', 'Battle')
+        CombatTurn = self.old_apps.get_model('combat', 'CombatTurn')
+        OldCombatEvent = self.old_apps.get_model('combat', 'CombatEvent')
+        OldCombatEvent.objects.create(name='Incendio', event_type='fire', description='', probability=10)
+
+        legacy = OldBattle.objects.create(
+            attacker_id=self.player.pk, defender_id=self.rival.pk, attacker_ship_id=self.ship.pk,
+            battle_type='pvp', status='in_progress',
+        )
+        for turn, acting_player_id, action, dealt, received in (
+            (1, self.player.pk, 'cannon', 20, 0), (1, self.rival.pk, 'ram', 10, 5), (2, self.player.pk, 'retreat', 0, 0),
+        ):
+            CombatTurn.objects.create(
+                battle=legacy, acting_player_id=acting_player_id, turn_number=turn, action_type=action,
+                damage_dealt=dealt, damage_received=received, description='',
+            )
+        engine = OldBattle.objects.create(
+            attacker_id=self.player.pk, attacker_ship_id=self.ship.pk, battle_type='pve', status='completed',
+            battle_log='[[1, 0, 2, 30, 0, 0, 250, 370], [1, 1, 0, 0, 0, -1, 250, 370]]',
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        NewBattle = executor.loader.project_state(self.after).apps.get_model('combat', 'Battle')
+        rows = dict(NewBattle.objects.values_list('pk', 'turn_log'))
+
+        self.assertEqual(BattleLog.unpack(rows[legacy.pk]), [
+            (1, 0, 0, 20, 0, -1, 0, 0),
+            (1, 1, 1, 10, 5, -1, 0, 0),
+            (2, 0, 4, 0, 0, -1, 0, 0),
+        ])
+        fire = [event_type for event_type, _ in CombatEvent.EVENT_TYPES].index('fire')
+        self.assertEqual(BattleLog.unpack(rows[engine.pk]), [
+            (1, 0, 2, 30, 0, fire, 250, 370),
+            (1, 1, 0, 0, 0, -1, 250, 370),
+        ])
+        self.assertEqual(NewBattle.objects.get(pk=engine.pk).battle_log, '')
+        self.assertNotIn('combat_combatturn', connection.introspection.table_names())
@@ -4,13 +4,14 @@ from django.contrib import messages
 from django.utils import timezone
 from django.http import JsonResponse
 from django.db.models import Q
-from django.core.paginator import Paginator
 from apps.players.models import Player
 from apps.ships.models import Ship
 from apps.exploration.models import Region
-from .models import Battle, PirateFleet, CombatTurn
+from .models import Battle, PirateFleet
+from .services.battle_predictor import BattlePredictor
 from .services.battle_service import BattleService
-from .combat_utils import execute_combat_action, execute_npc_turn
+from apps.core.instrumentation import query_budget
+from apps.core.keyset import KeysetPaginator
 import random
 import json
 
@@ -35,8 +36,8 @@ def combat_dashboard(request):
     # Barcos disponibles para combate
     available_ships = Ship.objects.filter(
         owner=player, 
-        status='idle',
-        health__gt=0
+        status='docked',
+        hull_health__gt=0
     ).select_related('ship_type')
     
     # Estadísticas
@@ -60,11 +61,40 @@ def combat_dashboard(request):
 
 
 @login_required
+@query_budget(8)
 def pirate_hunt(request):
     """Caza de piratas - combate PvE."""
     player = get_object_or_404(Player, user=request.user)
     
     # Barcos disponibles
+    available_ships = list(Ship.objects.filter(
+        owner=player,
+        status='docked',
+        hull_health__gt=0
+    ).select_related('ship_type'))
+    
+    # Flotas piratas activas
+    pirate_fleets = list(BattleService.get_active_pirate_fleets(player).select_related('current_region'))
+    
+    # Predicción de cada enfrentamiento para el barco elegido (el primero por defecto)
+    selected_ship = next(
+        (ship for ship in available_ships if str(ship.id) == request.GET.get('ship_id')),
+        available_ships[0] if available_ships else None
+    )
+    if selected_ship:
+        predictions = BattlePredictor.predict_fleets(selected_ship, player, pirate_fleets)
+        for fleet in pirate_fleets:
+            fleet.prediction = predictions[fleet.pk]
+    
+    context = {
+        'player': player,
+        'available_ships': available_ships,
+        'selected_ship': selected_ship,
+        'pirate_fleets': pirate_fleets,
+    }
+    return render(request, 'combat/pirate_hunt.html', context)
+
+
 def combat_action(request, battle_id):
     battle = get_object_or_404(Battle, id=battle_id)
     # Lógica básica de acción de combate
@@ -91,33 +121,31 @@ def start_pirate_battle(request):
         messages.error(request, 'Datos incompletos.')
         return redirect('combat:pirate_hunt')
     
-    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='idle')
+    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='docked')
     pirate_fleet = get_object_or_404(PirateFleet, id=fleet_id, is_active=True)
     
     # Verificaciones
-    if ship.health <= 0:
+    if ship.hull_health <= 0:
         messages.error(request, 'Tu barco está demasiado dañado para el combate.')
         return redirect('combat:pirate_hunt')
     
-    if ship.crew_count < ship.ship_type.crew_capacity * 0.5:
+    if ship.crew_count < ship.crew_capacity * 0.5:
         messages.error(request, 'Necesitas más tripulación para el combate.')
         return redirect('combat:pirate_hunt')
     
     # Crear batalla usando BattleService
-    npc_data = {
-        'name': pirate_fleet.name,
-        'health': pirate_fleet.defense * 10,
-        'max_health': pirate_fleet.defense * 10,
-        'attack_power': pirate_fleet.firepower,
-        'defense': pirate_fleet.defense,
-        'type': pirate_fleet.fleet_type,
-    }
-    battle = BattleService.start_battle(
-        attacker=player,
-        attacker_ship=ship,
-        battle_type='pve',
-        npc_data=npc_data
-    )
+    # Mismo bando NPC que el que usa BattlePredictor en la caza de piratas
+    npc_data = BattleService.pirate_fleet_npc_data(pirate_fleet)
+    try:
+        battle = BattleService.start_battle(
+            attacker=player,
+            attacker_ship=ship,
+            battle_type='pve',
+            npc_data=npc_data
+        )
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('combat:pirate_hunt')
     messages.success(request, f'¡Batalla contra {pirate_fleet.name} iniciada!')
     return redirect('combat:battle_detail', battle_id=battle.id)
 
@@ -133,15 +161,10 @@ def battle_detail(request, battle_id):
         messages.error(request, 'No tienes acceso a esta batalla.')
         return redirect('combat:dashboard')
     
-    # Turnos de la batalla
-    turns = CombatTurn.objects.filter(battle=battle).order_by('turn_number')
+    # Turnos de la batalla (el rival responde en el mismo turno que el jugador)
+    turns = BattleService.get_battle_log(battle)
     
-    # Si la batalla está en progreso y es el turno del jugador
-    can_act = (
-        battle.status == 'in_progress' and 
-        battle.attacker == player and
-        not turns.filter(turn_number=turns.count() + 1).exists()
-    )
+    can_act = battle.status == 'in_progress' and battle.attacker == player
     
     context = {
         'player': player,
@@ -167,28 +190,45 @@ def combat_action(request, battle_id):
         messages.error(request, 'Acción no válida.')
         return redirect('combat:battle_detail', battle_id=battle_id)
     
-    # Procesar turno usando BattleService
-    turn = BattleService.process_turn(battle, player, action_type)
-    # Aquí podrías agregar lógica para el turno del NPC y resolución de batalla
+    # Procesar turno usando BattleService: acción del jugador y respuesta del rival
+    try:
+        BattleService.process_turn(battle, player, action_type)
+    except ValueError as e:
+        # Otra petición terminó la batalla mientras tanto
+        messages.error(request, str(e))
+        return redirect('combat:battle_detail', battle_id=battle_id)
+    if battle.status == 'completed':
+        if battle.winner == player:
+            messages.success(request, '¡Victoria! Has ganado la batalla.')
+        else:
+            messages.info(request, 'Derrota... el enemigo ha vencido.')
     return redirect('combat:battle_detail', battle_id=battle_id)
 
 
 @login_required
+@query_budget(6)
 def battle_history(request):
     """Historial de batallas del jugador."""
     player = get_object_or_404(Player, user=request.user)
     
     battles = Battle.objects.filter(
-        Q(attacker=player) | Q(defender=player),
-        status='completed'
-    ).select_related('attacker', 'defender', 'winner').order_by('-completed_at')
-    
-    paginator = Paginator(battles, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        status='completed',
+        completed_at__isnull=False
+    ).select_related('attacker', 'defender', 'winner', 'attacker_ship')
+    
+    # Sin COUNT ni OFFSET: una rama por índice (atacante / defensor) unidas con UNION,
+    # así que una página profunda cuesta lo mismo que la primera
+    paginator = KeysetPaginator(
+        battles, 10,
+        ordering=('-completed_at', '-id'),
+        branches=[Q(attacker=player), Q(defender=player)],
+    )
+    cursor = request.GET.get('cursor')
+    page_obj = paginator.page(cursor)
     
     context = {
         'player': player,
         'page_obj': page_obj,
+        'cursor': cursor,
     }
     return render(request, 'combat/battle_history.html', context)
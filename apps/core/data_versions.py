@@ -0,0 +1,33 @@
+"""
+DataVersion: Versiones de los datos que cada proceso carga en memoria (grafo de
+rutas, índice de regiones, catálogo de eventos...).
+Se guardan en la caché 'versions', que debe ser compartida —Redis con
+VERSIONS_REDIS_URL— para que una invalidación llegue a todos los procesos web y
+de Celery; sin ella es la memoria del proceso y solo sirve con un único proceso.
+El incremento se aplica al confirmarse la transacción, de modo que ningún
+proceso pueda recargar los datos antiguos bajo la versión nueva.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+
+class DataVersion:
+    @staticmethod
+    def get(key):
+        """Versión vigente de `key` (se crea en el primer uso)."""
+        return caches['versions'].get_or_set(key, time.time_ns, timeout=None)
+
+    @staticmethod
+    def bump(key):
+        """Invalida `key` cuando se confirme la transacción en curso."""
+        transaction.on_commit(lambda: DataVersion._increment(key))
+
+    @staticmethod
+    def _increment(key):
+        store = caches['versions']
+        try:
+            store.incr(key)
+        except ValueError:
+            store.set(key, time.time_ns(), timeout=None)
@@ -0,0 +1,153 @@
+"""
+DirtyFieldsMixin: Guardado de solo los campos modificados.
+Cada instancia cargada recuerda los valores con que salió de la base de datos;
+save() sin update_fields escribe únicamente las columnas que cambiaron (más las
+auto_now) y no toca la fila si no cambió nada.
+Dentro de batched_saves() los save() de filas existentes no se ejecutan: se
+acumulan y se escriben al cerrar el bloque con un bulk_update por modelo y
+conjunto de campos, emitiendo después el post_save de cada instancia.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models, transaction
+from django.db.models.signals import post_save
+
+BATCH_SIZE = 500
+
+# Guardados diferidos del bloque batched_saves() en curso (None fuera de un bloque)
+_pending = ContextVar('batched_saves_pending', default=None)
+
+
+class DirtyFieldsMixin(models.Model):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_clean()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.mark_clean(fields)
+
+    def mark_clean(self, fields=None):
+        """Da por guardados los valores actuales (de todos los campos o de `fields`)."""
+        loaded = self.__dict__
+        if fields is None:
+            self._saved_values = {
+                field.attname: loaded[field.attname]
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname in loaded
+            }
+            return
+        saved = loaded.setdefault('_saved_values', {})
+        for name in fields:
+            attname = self._meta.get_field(name).attname
+            if attname in loaded:
+                saved[attname] = loaded[attname]
+
+    def get_dirty_fields(self):
+        """Campos cambiados desde la carga o el último guardado (None si la instancia no es de la BD)."""
+        saved = self.__dict__.get('_saved_values')
+        if saved is None:
+            return None
+        loaded = self.__dict__
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in loaded
+            and (field.attname not in saved or saved[field.attname] != loaded[field.attname])
+        ]
+
+    def save(self, *args, **kwargs):
+        existing = not self._state.adding and not args and not kwargs.get('force_insert')
+        if existing and kwargs.get('update_fields') is None:
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                # Como en un save() completo, los campos auto_now se renuevan si hay cambios
+                if dirty:
+                    dirty += [
+                        field.name for field in self._meta.concrete_fields
+                        if getattr(field, 'auto_now', False) and field.name not in dirty
+                    ]
+                kwargs['update_fields'] = dirty
+        update_fields = kwargs.get('update_fields')
+
+        batch = _pending.get()
+        if batch is not None and existing and update_fields is not None and kwargs.keys() <= {'update_fields'}:
+            batch.add(self, update_fields)
+            self.mark_clean(update_fields)
+            return
+
+        super().save(*args, **kwargs)
+        self.mark_clean(update_fields)
+
+
+class _SaveBatch:
+    """Valores pendientes por fila: (modelo, pk) → [última instancia, {campo: valor}]."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, instance, fields):
+        values = {}
+        for name in fields:
+            field = instance._meta.get_field(name)
+            if getattr(field, 'auto_now', False):
+                field.pre_save(instance, add=False)
+            values[field.name] = getattr(instance, field.attname)
+        self._merge(instance, values)
+
+    def _merge(self, instance, values):
+        # Guardados sucesivos de la misma fila se combinan campo a campo, como si fueran secuenciales
+        row = self.rows.setdefault((instance._meta.concrete_model, instance.pk), [instance, {}])
+        row[0] = instance
+        row[1].update(values)
+
+    def extend(self, other):
+        for instance, values in other.rows.values():
+            self._merge(instance, values)
+
+    def flush(self, batch_size):
+        groups = {}
+        for (model, pk), (instance, values) in self.rows.items():
+            if values:
+                groups.setdefault((model, frozenset(values)), []).append((pk, instance, values))
+        for (model, fields), rows in groups.items():
+            objs = []
+            for pk, _, values in rows:
+                obj = model(pk=pk)
+                for name, value in values.items():
+                    setattr(obj, model._meta.get_field(name).attname, value)
+                objs.append(obj)
+            model.objects.bulk_update(objs, list(fields), batch_size=batch_size)
+            for _, instance, _ in rows:
+                post_save.send(
+                    sender=type(instance), instance=instance, created=False,
+                    update_fields=fields, raw=False, using=instance._state.db,
+                )
+
+
+@contextmanager
+def batched_saves(batch_size=BATCH_SIZE):
+    """
+    Difiere los save() de filas existentes hasta el final del bloque. Los bloques
+    se pueden anidar: si uno interior falla, sus guardados se descartan con su
+    savepoint y el bloque exterior sigue adelante.
+    """
+    parent = _pending.get()
+    batch = _SaveBatch()
+    token = _pending.set(batch)
+    try:
+        with transaction.atomic():
+            yield
+            if parent is None:
+                batch.flush(batch_size)
+    finally:
+        _pending.reset(token)
+    if parent is not None:
+        parent.extend(batch)
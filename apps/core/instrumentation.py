@@ -0,0 +1,229 @@
+"""
+Instrumentación por petición: consultas SQL, tiempo de base de datos, aciertos y
+fallos de caché y tiempo de renderizado de plantillas.
+El middleware publica las métricas en la cabecera Server-Timing y en una línea de
+log JSON; el decorador query_budget fija un máximo de consultas por vista.
+Las métricas viven en una ContextVar, así que funcionan igual con runserver
+(hilos) que con gunicorn (procesos/hilos).
+"""
+import functools
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Una vista ejecutó más consultas de las declaradas en su presupuesto."""
+
+
+class RequestMetrics:
+    """Contadores acumulados durante una petición (o un bloque medido)."""
+
+    __slots__ = ('queries', 'db_time', 'cache_hits', 'cache_misses', 'template_time', 'budget', 'view')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.budget = None
+        self.view = None
+
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+def current_metrics():
+    """Métricas de la petición en curso (None fuera de una petición instrumentada)."""
+    return _metrics.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+
+@contextmanager
+def _query_wrappers():
+    """Instala el contador de consultas en todas las conexiones del hilo actual."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_record_query))
+        yield
+
+
+@contextmanager
+def measure():
+    """
+    Mide un bloque de código. Si ya hay métricas activas (dentro del middleware)
+    se acumulan en ellas; si no, se instalan unas nuevas.
+    """
+    outer = _metrics.get()
+    metrics = RequestMetrics()
+    token = _metrics.set(metrics)
+    try:
+        # Dentro del middleware los wrappers ya están instalados y escriben en `metrics`
+        with ExitStack() as stack:
+            if outer is None:
+                stack.enter_context(_query_wrappers())
+            yield metrics
+    finally:
+        _metrics.reset(token)
+        if outer is not None:
+            outer.queries += metrics.queries
+            outer.db_time += metrics.db_time
+            outer.cache_hits += metrics.cache_hits
+            outer.cache_misses += metrics.cache_misses
+            outer.template_time += metrics.template_time
+            outer.budget = metrics.budget if metrics.budget is not None else outer.budget
+            outer.view = metrics.view or outer.view
+
+
+def _budget_is_strict():
+    return getattr(settings, 'QUERY_BUDGET_STRICT', False)
+
+
+def query_budget(max_queries):
+    """
+    Declara el número máximo de consultas de una vista.
+    Al excederlo lanza QueryBudgetExceeded si QUERY_BUDGET_STRICT está activo
+    (tests y pruebas de carga); si no, solo lo registra en el log.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            with measure() as metrics:
+                metrics.budget = max_queries
+                metrics.view = f'{view_func.__module__}.{view_func.__qualname__}'
+                response = view_func(request, *args, **kwargs)
+            if metrics.queries > max_queries:
+                message = (
+                    f'{metrics.view} ejecutó {metrics.queries} consultas '
+                    f'(presupuesto: {max_queries}) en {request.path}'
+                )
+                if _budget_is_strict():
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+
+    return decorator
+
+
+class InstrumentationMiddleware:
+    """Mide cada petición y publica las métricas en Server-Timing y en el log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            with _query_wrappers():
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = self.server_timing(metrics, total)
+        logger.info(json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': metrics.view or getattr(getattr(request, 'resolver_match', None), 'view_name', None),
+            'queries': metrics.queries,
+            'query_budget': metrics.budget,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        return response
+
+    @staticmethod
+    def server_timing(metrics, total):
+        return ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'cache;desc="{metrics.cache_hits} hits {metrics.cache_misses} misses"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+class CacheMetricsMixin:
+    """Cuenta aciertos y fallos de get() en las métricas de la petición."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        metrics = _metrics.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(CacheMetricsMixin, RedisCache):
+    pass
+
+
+class _TimedTemplate:
+    """Envuelve una plantilla del backend y acumula su tiempo de renderizado."""
+
+    __slots__ = ('_template',)
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics = _metrics.get()
+            if metrics is not None:
+                metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend de plantillas de Django que mide el renderizado de primer nivel."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
@@ -0,0 +1,162 @@
+"""
+Paginación por clave (keyset) para listados largos.
+En lugar de OFFSET, cada página continúa desde los valores de ordenación de la
+última fila de la anterior (WHERE (created_at, id) < (...)), así que la página
+mil cuesta lo mismo que la primera si hay un índice con ese orden. El cursor que
+se entrega al cliente es opaco: los valores de la última fila serializados en
+JSON y codificados en base64.
+Un filtro con OR entre columnas de índices distintos (atacante o defensor) se
+pagina por ramas: cada rama es una consulta que recorre su propio índice, y las
+claves de página se combinan con UNION antes de cargar las filas.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from operator import itemgetter
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_ORDERING = ('-created_at', '-id')
+
+
+def _json_default(value):
+    # isoformat completo: DjangoJSONEncoder recorta a milisegundos y el cursor
+    # saltaría o repetiría filas creadas dentro del mismo milisegundo
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values):
+    data = json.dumps(list(values), default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Valores de un cursor, o None si no es válido."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+@dataclass
+class KeysetPage:
+    """Una página de resultados y el cursor de la siguiente (None si es la última)."""
+
+    object_list: list
+    next_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Pagina `queryset` por los campos de `ordering` (no nulos; el último debe ser
+    único, normalmente el id, para desempatar). Con `branches` (lista de Q) la
+    página es la unión de `queryset` filtrado por cada rama, en lugar de un OR.
+    """
+
+    def __init__(self, queryset, per_page, ordering=DEFAULT_ORDERING, branches=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.branches = list(branches or ())
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        """Página que sigue a `cursor` (la primera si falta o no es válido)."""
+        values = self.parse(cursor)
+        if self.branches:
+            rows = self._union_page(values)
+        else:
+            queryset = self.queryset.order_by(*self.ordering)
+            if values is not None:
+                queryset = queryset.filter(self.after(values))
+            rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(rows, self.cursor_for(rows[-1]) if has_next else None)
+
+    def parse(self, cursor):
+        """Valores de ordenación de un cursor, convertidos a los tipos de los campos."""
+        values = decode_cursor(cursor) if cursor else None
+        if values is None or len(values) != len(self.fields):
+            return None
+        try:
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except ValidationError:
+            return None
+
+    def cursor_for(self, row):
+        return encode_cursor(getattr(row, field.attname) for field in self.fields)
+
+    def union(self, values=None):
+        """
+        Claves de la página como UNION de una consulta por rama, cada una ya
+        filtrada, ordenada y recortada sobre su propio índice.
+        """
+        first, *rest = self._branch_keys(values)
+        return first.union(*rest).order_by(*self.ordering)[:self.per_page + 1]
+
+    def after(self, values):
+        """
+        Condición "fila posterior a `values`" en el orden del paginador:
+        (a > x) OR (a = x AND b > y) OR ..., con < en los campos descendentes.
+        """
+        condition = Q()
+        equal = {}
+        for name, field, value in zip(self.ordering, self.fields, values):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field.name}__{lookup}': value})
+            equal[field.name] = value
+        return condition
+
+    def _branch_keys(self, values):
+        """Consulta de claves de cada rama: valores de ordenación (y pk si no está entre ellos)."""
+        limit = self.per_page + 1
+        keys = []
+        for branch in self.branches:
+            queryset = self.queryset.filter(branch)
+            if values is not None:
+                queryset = queryset.filter(self.after(values))
+            keys.append(queryset.order_by(*self.ordering).values_list(*self._key_columns())[:limit])
+        return keys
+
+    def _key_columns(self):
+        columns = [field.attname for field in self.fields]
+        pk = self.queryset.model._meta.pk.attname
+        return columns if pk in columns else columns + [pk]
+
+    def _union_page(self, values):
+        limit = self.per_page + 1
+        if connections[self.queryset.db].features.supports_slicing_ordering_in_compound:
+            keys = list(self.union(values))
+        else:
+            # SQLite no admite LIMIT en las partes de un UNION: una consulta por
+            # rama (igual de acotada) y la unión, sin duplicados, se hace aquí
+            keys = list({key for branch in self._branch_keys(values) for key in branch})
+            for position in reversed(range(len(self.ordering))):
+                keys.sort(key=itemgetter(position), reverse=self.ordering[position].startswith('-'))
+            keys = keys[:limit]
+
+        pk_position = self._key_columns().index(self.queryset.model._meta.pk.attname)
+        ids = [key[pk_position] for key in keys]
+        rows = self.queryset.in_bulk(ids)
+        return [rows[pk] for pk in ids if pk in rows]
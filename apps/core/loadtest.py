@@ -0,0 +1,303 @@
+"""
+Generador de carga: reproduce sesiones de jugador ponderadas con el cliente de
+pruebas de Django y mide latencia y consultas SQL por endpoint.
+Los resultados se pueden guardar como línea base JSON y comparar entre ejecuciones.
+"""
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import F
+from django.test import Client
+
+from apps.combat.models import PirateFleet
+from apps.exploration.models import ExplorationMission, Region
+from apps.missions.services.game_tick import GameTickService
+from apps.players.models import Player
+from apps.ships.models import Ship, ShipType
+from apps.trade.models import Market, Resource
+
+LOADTEST_USER_PREFIX = 'loadtest_'
+
+_BATTLE_URL = re.compile(r'/combat/battle/(\d+)/')
+
+
+def request_host():
+    """
+    Host de las peticiones: el primero de ALLOWED_HOSTS que sea un nombre concreto.
+    El 'testserver' por defecto del cliente solo se admite dentro del runner de tests.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (values ya ordenados)."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Recorder:
+    """Acumula latencia, consultas y códigos de estado por endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, name, seconds, queries, status):
+        self.latencies[name].append(seconds * 1000)
+        self.queries[name].append(queries)
+        self.statuses[name][str(status)] += 1
+
+    def summary(self):
+        result = {}
+        for name in sorted(self.latencies):
+            latencies = sorted(self.latencies[name])
+            queries = self.queries[name]
+            statuses = dict(self.statuses[name])
+            errors = sum(count for status, count in statuses.items() if status[0] not in '23')
+            result[name] = {
+                'requests': len(latencies),
+                'errors': errors,
+                'statuses': statuses,
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'avg_queries': round(sum(queries) / len(queries), 2),
+                'max_queries': max(queries),
+            }
+        return result
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Session:
+    """Sesión de un jugador: cliente autenticado más helpers de medición."""
+
+    def __init__(self, player, recorder, rng):
+        self.player = player
+        self.recorder = recorder
+        self.rng = rng
+        self.client = Client(raise_request_exception=False, HTTP_HOST=request_host())
+        self.client.force_login(player.user)
+
+    def _measure(self, name, func):
+        counter = _QueryCounter()
+        with connections['default'].execute_wrapper(counter):
+            start = time.perf_counter()
+            try:
+                result = func()
+                status = getattr(result, 'status_code', 200)
+            except Exception as exc:
+                result, status = None, f'exc:{type(exc).__name__}'
+            elapsed = time.perf_counter() - start
+        self.recorder.add(name, elapsed, counter.count, status)
+        return result
+
+    def get(self, name, path, **params):
+        return self._measure(name, lambda: self.client.get(path, params))
+
+    def post(self, name, path, data):
+        return self._measure(name, lambda: self.client.post(path, data))
+
+    def step(self, name, func):
+        """Paso sin HTTP (p. ej. el tick del juego), medido igual que un endpoint."""
+        return self._measure(name, func)
+
+    def ship_ids(self, **filters):
+        return list(Ship.objects.filter(owner=self.player, **filters).values_list('id', flat=True))
+
+
+def browse_session(session):
+    session.get('players.dashboard', '/dashboard/')
+    session.get('ships.fleet', '/ships/')
+    session.get('players.leaderboard_top', '/leaderboard/api/level/top/', n=20)
+    session.get('players.leaderboard_me', '/leaderboard/api/level/me/')
+    session.get('players.leaderboard_around', '/leaderboard/api/combat/around/', radius=5)
+    session.get('notifications.unread_count', '/notifications/api/unread-count/')
+    session.get('notifications.recent', '/notifications/api/recent/')
+
+
+def explorer_session(session):
+    session.get('exploration.map', '/exploration/')
+    session.get('exploration.viewport', '/exploration/api/viewport/')
+    ships = session.ship_ids(status='docked')
+    if ships:
+        ship_id = session.rng.choice(ships)
+        session.get('ships.status', f'/ships/api/{ship_id}/status/')
+        region_id = session.rng.choice(World.starter_region_ids)
+        session.post('exploration.start', '/exploration/start/', {
+            'region_id': region_id, 'ship_id': ship_id, 'exploration_type': 'quick',
+        })
+
+    # Adelantar el reloj de las misiones del jugador y liquidarlas con el tick
+    def complete():
+        ExplorationMission.objects.filter(player=session.player, status='in_progress').update(
+            started_at=F('started_at') - F('estimated_duration') - timedelta(seconds=1)
+        )
+        return GameTickService.run()
+
+    session.step('exploration.complete_tick', complete)
+
+
+def trader_session(session):
+    session.get('trade.dashboard', '/trade/')
+    session.get('trade.posts', '/trade/posts/')
+    ships = session.ship_ids(status='docked')
+    if ships:
+        session.get('trade.best_routes', '/trade/api/best-routes/', ship_id=session.rng.choice(ships))
+    if ships and len(World.market_ids) >= 2:
+        origin, destination = session.rng.sample(World.market_ids, 2)
+        session.post('trade.create_route', '/trade/routes/create/', {
+            'ship_id': session.rng.choice(ships),
+            'origin_id': origin,
+            'destination_id': destination,
+            'cargo_type': session.rng.choice(World.resource_categories),
+            'cargo_quantity': session.rng.randint(1, 10),
+        })
+
+
+def shipwright_session(session):
+    session.get('ships.shipyard', '/ships/shipyard/')
+    if World.ship_type_ids:
+        session.post('ships.build', '/ships/build/', {'ship_type_id': session.rng.choice(World.ship_type_ids)})
+    session.get('ships.fleet', '/ships/')
+
+
+def pirate_hunter_session(session):
+    session.get('combat.pirate_hunt', '/combat/pirate-hunt/')
+    ships = session.ship_ids()
+    if ships and World.pirate_fleet_ids:
+        response = session.post('combat.start_pirate_battle', '/combat/start-pirate-battle/', {
+            'ship_id': session.rng.choice(ships),
+            'fleet_id': session.rng.choice(World.pirate_fleet_ids),
+        })
+        match = _BATTLE_URL.search(getattr(response, 'url', '') or '')
+        if match:
+            battle_id = match.group(1)
+            session.get('combat.battle_detail', f'/combat/battle/{battle_id}/')
+            for _ in range(session.rng.randint(2, 5)):
+                session.post('combat.action', f'/combat/battle/{battle_id}/action/', {
+                    'action_type': session.rng.choice(['cannon', 'ram', 'board', 'repair']),
+                })
+    session.get('combat.history', '/combat/history/')
+
+
+# Sesión → peso relativo
+SESSIONS = {
+    'browse': (browse_session, 40),
+    'explorer': (explorer_session, 20),
+    'trader': (trader_session, 20),
+    'shipwright': (shipwright_session, 10),
+    'pirate_hunter': (pirate_hunter_session, 10),
+}
+
+
+class World:
+    """Ids del mundo usados por las sesiones (cargados una vez por ejecución)."""
+
+    starter_region_ids = []
+    market_ids = []
+    resource_categories = []
+    ship_type_ids = []
+    pirate_fleet_ids = []
+
+    @classmethod
+    def load(cls):
+        cls.starter_region_ids = list(
+            Region.objects.filter(required_level__lte=5).values_list('id', flat=True)
+        ) or list(Region.objects.values_list('id', flat=True)[:50])
+        cls.market_ids = list(Market.objects.values_list('id', flat=True))
+        cls.resource_categories = list(Resource.objects.values_list('category', flat=True).distinct())
+        cls.ship_type_ids = list(ShipType.objects.filter(required_level__lte=5).values_list('id', flat=True))
+        cls.pirate_fleet_ids = list(PirateFleet.objects.filter(is_active=True).values_list('id', flat=True))
+
+
+def seed_players(count, rng):
+    """Crea (si faltan) `count` jugadores de carga con dos barcos atracados cada uno."""
+    existing = set(
+        User.objects.filter(username__startswith=LOADTEST_USER_PREFIX).values_list('username', flat=True)
+    )
+    usernames = [f'{LOADTEST_USER_PREFIX}{i}' for i in range(count)]
+    missing = [name for name in usernames if name not in existing]
+    if missing:
+        users = User.objects.bulk_create([User(username=name) for name in missing])
+        players = Player.objects.bulk_create([
+            Player(user=user, captain_name=f'Capitán {user.username}', gold=rng.randint(2000, 20000),
+                   level=rng.randint(1, 10))
+            for user in users
+        ])
+        ship_type = ShipType.objects.order_by('required_level', 'purchase_cost').first()
+        regions = World.starter_region_ids or [None]
+        Ship.objects.bulk_create([
+            Ship(
+                owner=player, ship_type=ship_type, name=f'{player.captain_name} {k}',
+                current_location_id=rng.choice(regions),
+                speed=ship_type.base_speed, cargo_capacity=ship_type.base_cargo_capacity,
+                firepower=ship_type.base_firepower, defense=ship_type.base_defense,
+                crew_capacity=ship_type.base_crew_capacity, crew_count=ship_type.base_crew_capacity,
+            )
+            for player in players for k in range(2)
+        ])
+    return list(Player.objects.filter(user__username__in=usernames).select_related('user'))
+
+
+def run(players, sessions, rng, session_weights=None):
+    """Ejecuta `sessions` sesiones elegidas por peso entre los jugadores dados."""
+    weights = session_weights or {name: weight for name, (_, weight) in SESSIONS.items()}
+    names = [name for name in weights if weights[name] > 0]
+    recorder = Recorder()
+    started = time.perf_counter()
+    for _ in range(sessions):
+        name = rng.choices(names, weights=[weights[n] for n in names])[0]
+        SESSIONS[name][0](Session(rng.choice(players), recorder, rng))
+    return recorder, time.perf_counter() - started
+
+
+def compare(current, baseline):
+    """Diferencias de p95 y consultas medias frente a una línea base: {endpoint: {...}}."""
+    diff = {}
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        p95_delta = (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0.0
+        diff[name] = {
+            'p95_ms': stats['p95_ms'],
+            'baseline_p95_ms': base['p95_ms'],
+            'p95_change_pct': round(p95_delta, 1),
+            'avg_queries': stats['avg_queries'],
+            'baseline_avg_queries': base['avg_queries'],
+            'queries_change': round(stats['avg_queries'] - base['avg_queries'], 2),
+        }
+    return diff
+
+
+def save_baseline(path, summary, meta):
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump({'meta': meta, 'endpoints': summary}, fh, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)['endpoints']
+
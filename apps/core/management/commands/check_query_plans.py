@@ -0,0 +1,77 @@
+"""
+Comando para verificar que los filtros más usados siguen usando sus índices
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.core.query_plans import PLAN_CHECKS, analyze, run_checks, seed_dataset
+from apps.players.models import Player
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Ejecutar EXPLAIN sobre las consultas calientes y fallar si alguna vuelve a recorrer la tabla completa'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            metavar='PLAYERS',
+            help='Sembrar PLAYERS jugadores sintéticos (se deshace al terminar)',
+        )
+        parser.add_argument(
+            '--rows-per-player',
+            type=int,
+            default=50,
+            help='Batallas, notificaciones y misiones por jugador sembrado',
+        )
+        parser.add_argument(
+            '--player',
+            type=int,
+            help='Id del jugador para el que se construyen las consultas',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Mostrar el plan completo de cada consulta',
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.stdout.write(f"🌱 Sembrando {options['seed']} jugadores...")
+                    player = seed_dataset(options['seed'], options['rows_per_player'])
+                    analyze()
+                elif options['player']:
+                    player = Player.objects.get(pk=options['player'])
+                else:
+                    player = Player.objects.first()
+                    if player is None:
+                        raise CommandError('No hay jugadores; usa --seed para generar datos')
+                results = run_checks(player)
+                # Los datos sembrados nunca se confirman
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        failures = 0
+        for result in results:
+            if result.ok:
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {result.check.name}: {result.index_used}'))
+            else:
+                failures += 1
+                reason = 'recorrido secuencial' if result.sequential_scan else 'sin índice esperado'
+                self.stdout.write(self.style.ERROR(f'  ❌ {result.check.name}: {reason}'))
+            if options['verbose_plans'] or not result.ok:
+                for line in result.plan.splitlines():
+                    self.stdout.write(f'       {line}')
+
+        if failures:
+            raise CommandError(f'{failures} de {len(PLAN_CHECKS)} consultas no usan sus índices')
+        self.stdout.write(self.style.SUCCESS(f'🔎 {len(results)} planes de consulta correctos'))
@@ -0,0 +1,118 @@
+"""
+Comando de prueba de carga: siembra jugadores y reproduce sesiones ponderadas
+"""
+import logging
+import random
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core import loadtest
+from apps.exploration.models import Region
+
+
+class Command(BaseCommand):
+    help = 'Reproducir sesiones de jugador realistas y medir latencia (p50/p95/p99) y consultas por endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=50, help='Jugadores de carga a sembrar/usar')
+        parser.add_argument('--sessions', type=int, default=200, help='Número de sesiones a reproducir')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla para una ejecución reproducible')
+        parser.add_argument(
+            '--weight',
+            action='append',
+            default=[],
+            metavar='SESION=PESO',
+            help=f"Cambiar el peso de una sesión ({', '.join(loadtest.SESSIONS)}); repetible",
+        )
+        parser.add_argument('--save', metavar='RUTA', help='Guardar el resultado como línea base JSON')
+        parser.add_argument('--compare', metavar='RUTA', help='Comparar con una línea base JSON guardada')
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            metavar='PCT',
+            help='Fallar si el p95 de algún endpoint empeora más de PCT %% frente a --compare',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        weights = self._weights(options['weight'])
+
+        if not Region.objects.exists():
+            self.stdout.write('🌍 Mundo vacío: ejecutando populate_game...')
+            call_command('populate_game', no_input=True, stdout=self.stdout)
+        loadtest.World.load()
+        players = loadtest.seed_players(options['players'], rng)
+        self.stdout.write(f"🚀 {options['sessions']} sesiones con {len(players)} jugadores...")
+
+        # El log por petición y las trazas de errores ensuciarían la tabla (los errores se cuentan en ella)
+        quiet = [logging.getLogger(name) for name in ('apps.core.instrumentation', 'django.request')]
+        previous_levels = [logger.level for logger in quiet]
+        for logger in quiet:
+            logger.setLevel(logging.CRITICAL)
+        try:
+            recorder, elapsed = loadtest.run(players, options['sessions'], rng, weights)
+        finally:
+            for logger, level in zip(quiet, previous_levels):
+                logger.setLevel(level)
+
+        summary = recorder.summary()
+        self._print_summary(summary, elapsed)
+        if all(stats['errors'] == stats['requests'] for stats in summary.values()):
+            # Host no permitido, base de datos sin migrar...: no es una medición válida
+            raise CommandError('Todas las peticiones fallaron; revisa los códigos de estado de la tabla')
+
+        if options['save']:
+            loadtest.save_baseline(options['save'], summary, {
+                'created_at': timezone.now().isoformat(),
+                'players': len(players),
+                'sessions': options['sessions'],
+                'seed': options['seed'],
+                'weights': weights,
+                'elapsed_s': round(elapsed, 2),
+            })
+            self.stdout.write(self.style.SUCCESS(f"💾 Línea base guardada en {options['save']}"))
+
+        if options['compare']:
+            diff = loadtest.compare(summary, loadtest.load_baseline(options['compare']))
+            regressions = self._print_diff(diff, options['max_regression'])
+            if regressions:
+                raise CommandError(f'{len(regressions)} endpoints empeoraron: {", ".join(regressions)}')
+
+    def _weights(self, overrides):
+        weights = {name: weight for name, (_, weight) in loadtest.SESSIONS.items()}
+        for item in overrides:
+            name, _, value = item.partition('=')
+            if name not in weights or not value.isdigit():
+                raise CommandError(f'Peso no válido: {item}')
+            weights[name] = int(value)
+        if not any(weights.values()):
+            raise CommandError('Todas las sesiones tienen peso 0')
+        return weights
+
+    def _print_summary(self, summary, elapsed):
+        total = sum(stats['requests'] for stats in summary.values())
+        self.stdout.write(f'\n{"endpoint":34} {"n":>5} {"err":>4} {"p50":>8} {"p95":>8} {"p99":>8} {"q_avg":>6} {"q_max":>6}')
+        for name, stats in summary.items():
+            line = (
+                f"{name:34} {stats['requests']:>5} {stats['errors']:>4} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                f"{stats['avg_queries']:>6.1f} {stats['max_queries']:>6}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
+        self.stdout.write(f'\n⏱️ {total} peticiones en {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s)')
+
+    def _print_diff(self, diff, max_regression):
+        regressions = []
+        self.stdout.write(f'\n{"endpoint":34} {"p95":>8} {"base":>8} {"Δ%":>7} {"Δq":>6}')
+        for name, row in diff.items():
+            line = (
+                f"{name:34} {row['p95_ms']:>8.1f} {row['baseline_p95_ms']:>8.1f} "
+                f"{row['p95_change_pct']:>+7.1f} {row['queries_change']:>+6.1f}"
+            )
+            regressed = max_regression is not None and row['p95_change_pct'] > max_regression
+            if regressed:
+                regressions.append(name)
+            self.stdout.write(self.style.ERROR(line) if regressed or row['queries_change'] > 0 else line)
+        return regressions
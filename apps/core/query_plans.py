@@ -0,0 +1,210 @@
+"""
+Comprobación de planes de consulta de los filtros más usados por las vistas.
+Cada comprobación construye el queryset de una vista para un jugador, ejecuta
+EXPLAIN y verifica que el plan usa alguno de los índices esperados en lugar de
+recorrer la tabla completa. Funciona con SQLite y PostgreSQL.
+"""
+import random
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.combat.models import Battle
+from apps.exploration.models import ExplorationMission, Region
+from apps.notifications.models import Notification
+from apps.players.models import Player
+from apps.ships.models import Ship, ShipType
+from apps.trade.models import TradeMission, TradeRoute
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    name: str
+    model: type
+    build: object  # función player -> queryset
+    indexes: tuple  # basta con que el plan use uno de ellos
+
+
+PLAN_CHECKS = (
+    PlanCheck(
+        'combat.active_battles',
+        Battle,
+        lambda p: Battle.objects.filter(Q(attacker=p) | Q(defender=p), status__in=['preparing', 'in_progress']),
+        ('combat_battle_attacker_idx', 'combat_battle_defender_idx'),
+    ),
+    # El historial se pagina por ramas (KeysetPaginator): una consulta por índice
+    PlanCheck(
+        'combat.battle_history_attacker',
+        Battle,
+        lambda p: Battle.objects.filter(attacker=p, status='completed', completed_at__isnull=False)
+        .order_by('-completed_at', '-id')[:11],
+        ('combat_battle_attacker_idx',),
+    ),
+    PlanCheck(
+        'combat.battle_history_defender',
+        Battle,
+        lambda p: Battle.objects.filter(defender=p, status='completed', completed_at__isnull=False)
+        .order_by('-completed_at', '-id')[:11],
+        ('combat_battle_defender_idx',),
+    ),
+    PlanCheck(
+        'notifications.list',
+        Notification,
+        lambda p: Notification.objects.filter(recipient=p, is_deleted=False).order_by('-created_at', '-id')[:51],
+        ('notif_recipient_created_idx',),
+    ),
+    PlanCheck(
+        'notifications.unread',
+        Notification,
+        lambda p: Notification.objects.filter(recipient=p, is_read=False).order_by('-created_at'),
+        ('notif_unread_idx', 'notif_recipient_read_idx'),
+    ),
+    PlanCheck(
+        'ships.by_status',
+        Ship,
+        lambda p: Ship.objects.filter(owner=p, status='docked'),
+        ('ships_ship_owner_status_idx',),
+    ),
+    PlanCheck(
+        'trade.recent_missions',
+        TradeMission,
+        lambda p: TradeMission.objects.filter(player=p).order_by('-started_at')[:10],
+        ('trade_mission_player_start_idx',),
+    ),
+    PlanCheck(
+        'trade.history',
+        TradeMission,
+        lambda p: TradeMission.objects.filter(player=p).order_by('-started_at', '-id')[:21],
+        ('trade_mission_player_start_idx',),
+    ),
+    PlanCheck(
+        'exploration.missions_by_status',
+        ExplorationMission,
+        lambda p: ExplorationMission.objects.filter(player=p, status='in_progress'),
+        ('explore_mission_player_st_idx',),
+    ),
+)
+
+
+@dataclass
+class PlanResult:
+    check: PlanCheck
+    plan: str
+    index_used: str
+    sequential_scan: bool
+
+    @property
+    def ok(self):
+        return bool(self.index_used) and not self.sequential_scan
+
+
+def _is_sequential_scan(plan, table):
+    """Detecta un recorrido completo de la tabla en el texto del plan."""
+    if connection.vendor == 'postgresql':
+        return re.search(rf'Seq Scan on {table}\b', plan) is not None
+    # SQLite: "SCAN tabla" sin índice (las búsquedas con índice aparecen como SEARCH)
+    return any(
+        re.search(rf'\bSCAN {table}\b', line) and 'INDEX' not in line
+        for line in plan.splitlines()
+    )
+
+
+def explain(check, player):
+    queryset = check.build(player)
+    plan = queryset.explain()
+    table = check.model._meta.db_table
+    index_used = next((name for name in check.indexes if name in plan), '')
+    return PlanResult(check, plan, index_used, _is_sequential_scan(plan, table))
+
+
+def run_checks(player, checks=PLAN_CHECKS):
+    """Ejecuta EXPLAIN de cada comprobación; en PostgreSQL desactiva el seq scan para la sesión."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            return [explain(check, player) for check in checks]
+        finally:
+            if connection.vendor == 'postgresql':
+                cursor.execute('RESET enable_seqscan')
+
+
+def analyze():
+    """Actualiza las estadísticas del planificador tras sembrar datos."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def seed_dataset(players=200, per_player=50, rng_seed=42):
+    """
+    Siembra un conjunto de datos grande para que el planificador elija como en producción.
+    Devuelve el jugador sobre el que se comprueban los planes.
+    """
+    rng = random.Random(rng_seed)
+    now = timezone.now()
+    ship_type = ShipType.objects.first() or ShipType.objects.create(
+        name='Balandra de pruebas', description='', base_speed=10, base_cargo_capacity=40,
+        base_firepower=10, base_defense=10, base_crew_capacity=10, purchase_cost=100,
+        maintenance_cost_per_day=1, required_level=1,
+    )
+    regions = Region.objects.bulk_create([
+        Region(
+            name=f'Plan {i}', description='', region_type='ocean', climate='tropical',
+            x_coordinate=-1_000_000 - i, y_coordinate=-1_000_000, difficulty='easy',
+        )
+        for i in range(2)
+    ])
+    route = TradeRoute.objects.create(
+        origin=regions[0], destination=regions[1], distance=100, base_travel_time=timedelta(hours=1),
+    )
+
+    users = User.objects.bulk_create([User(username=f'plan_check_{i}') for i in range(players)])
+    players_list = Player.objects.bulk_create([
+        Player(user=user, captain_name=f'Plan {user.username}') for user in users
+    ])
+    ships = Ship.objects.bulk_create([
+        Ship(
+            owner=player, ship_type=ship_type, name=f'Barco {player.pk}-{k}',
+            status=rng.choice(['docked', 'sailing', 'exploring', 'trading']),
+            speed=10, cargo_capacity=40, firepower=10, defense=10, crew_capacity=10,
+        )
+        for player in players_list for k in range(3)
+    ])
+    ships_by_player = {}
+    for ship in ships:
+        ships_by_player.setdefault(ship.owner_id, []).append(ship)
+
+    battles, notifications, trade_missions, explorations = [], [], [], []
+    for player in players_list:
+        own_ships = ships_by_player[player.pk]
+        for k in range(per_player):
+            status = rng.choice(['completed', 'completed', 'completed', 'in_progress', 'cancelled'])
+            opponent = rng.choice(players_list)
+            battles.append(Battle(
+                attacker=player, defender=opponent, attacker_ship=rng.choice(own_ships),
+                battle_type='pvp', status=status,
+                completed_at=now - timedelta(minutes=k) if status == 'completed' else None,
+            ))
+            notifications.append(Notification(
+                recipient=player, title='Aviso', message='', notification_type='battle',
+                is_read=rng.random() < 0.8,
+            ))
+            trade_missions.append(TradeMission(
+                player=player, ship=rng.choice(own_ships), trade_route=route,
+                status=rng.choice(['completed', 'traveling', 'planning']),
+            ))
+            explorations.append(ExplorationMission(
+                player=player, ship=rng.choice(own_ships), region=rng.choice(regions),
+                status=rng.choice(['completed', 'failed', 'in_progress']),
+                estimated_duration=timedelta(hours=1),
+            ))
+    Battle.objects.bulk_create(battles, batch_size=2000)
+    Notification.objects.bulk_create(notifications, batch_size=2000)
+    TradeMission.objects.bulk_create(trade_missions, batch_size=2000)
+    ExplorationMission.objects.bulk_create(explorations, batch_size=2000)
+    return players_list[0]
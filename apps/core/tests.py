@@ -0,0 +1,230 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db.models import F, Q
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.core.dirty_fields import batched_saves
+from apps.core.instrumentation import InstrumentationMiddleware, QueryBudgetExceeded, query_budget
+from apps.core.keyset import KeysetPaginator, decode_cursor, encode_cursor
+from apps.core.query_plans import PLAN_CHECKS, analyze, run_checks, seed_dataset
+from apps.players.models import GoldTransaction, Player
+
+
+class BatchedSavesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('batched', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Diferida', gold=1000, experience=0)
+
+    def _load(self):
+        return Player.objects.get(pk=self.player.pk)
+
+    def test_saves_of_the_same_row_are_merged_field_by_field(self):
+        first, second = self._load(), self._load()
+
+        with batched_saves():
+            first.gold = 500
+            first.save()
+            second.experience = 70
+            second.save()
+            first.gold = 400
+            first.save()
+            # Nada se escribe hasta cerrar el bloque
+            self.assertEqual(self._load().gold, 1000)
+
+        player = self._load()
+        self.assertEqual((player.gold, player.experience), (400, 70))
+        self.assertEqual(player.captain_name, 'Diferida')
+
+    def test_failed_inner_block_discards_its_saves(self):
+        outer, inner = self._load(), self._load()
+
+        with batched_saves():
+            outer.gold = 500
+            outer.save()
+            try:
+                with batched_saves():
+                    inner.experience = 70
+                    inner.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        player = self._load()
+        self.assertEqual((player.gold, player.experience), (500, 0))
+
+
+class DirtyFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('dirty', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Parcial', gold=1000, experience=0)
+
+    def _load(self):
+        return Player.objects.get(pk=self.player.pk)
+
+    def test_save_writes_only_changed_fields(self):
+        player = self._load()
+        # Otro proceso suma oro con F() después de cargar la instancia
+        Player.objects.filter(pk=player.pk).update(gold=F('gold') + 100)
+
+        player.experience = 50
+        player.save()
+
+        player = self._load()
+        self.assertEqual((player.gold, player.experience), (1100, 50))
+
+    def test_f_expression_is_not_applied_again_by_a_later_save(self):
+        player = self._load()
+
+        player.gold = F('gold') + 100
+        player.save()
+        self.assertEqual(player.get_dirty_fields(), [])
+        player.experience = 50
+        player.save()
+
+        player.refresh_from_db()
+        self.assertEqual((player.gold, player.experience), (1100, 50))
+        self.assertEqual(player.get_dirty_fields(), [])
+
+
+@query_budget(2)
+def budgeted_view(request):
+    # ?queries=N ejecuta N consultas
+    for _ in range(int(request.GET['queries'])):
+        Player.objects.exists()
+    return HttpResponse('ok')
+
+
+class QueryBudgetTests(TestCase):
+    def _get(self, queries):
+        request = RequestFactory().get('/presupuesto/', {'queries': queries})
+        return InstrumentationMiddleware(budgeted_view)(request)
+
+    def test_under_budget_request_reports_its_metrics(self):
+        with self.assertLogs('apps.core.instrumentation', 'INFO') as logs:
+            response = self._get(2)
+
+        self.assertEqual(response.content, b'ok')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertEqual(len(logs.records), 1)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            (line['view'], line['queries'], line['query_budget'], line['status']),
+            (f'{__name__}.budgeted_view', 2, 2, 200),
+        )
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_over_budget_request_raises_when_strict(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ejecutó 3 consultas (presupuesto: 2) en /presupuesto/'):
+            self._get(3)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_request_is_logged_when_not_strict(self):
+        with self.assertLogs('apps.core.instrumentation', 'INFO') as logs:
+            response = self._get(3)
+
+        self.assertEqual(response.status_code, 200)
+        warning, request_line = logs.records
+        self.assertEqual(warning.levelname, 'WARNING')
+        self.assertIn('ejecutó 3 consultas (presupuesto: 2)', warning.getMessage())
+        self.assertEqual(json.loads(request_line.getMessage())['queries'], 3)
+
+    def test_middleware_counts_queries_outside_the_view_budget(self):
+        def view(request):
+            Player.objects.exists()
+            return budgeted_view(request)
+
+        request = RequestFactory().get('/presupuesto/', {'queries': 2})
+        with self.assertLogs('apps.core.instrumentation', 'INFO') as logs:
+            InstrumentationMiddleware(view)(request)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['queries'], line['query_budget']), (3, 2))
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('paged', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Paginada')
+        GoldTransaction.objects.bulk_create([
+            GoldTransaction(player=cls.player, amount=amount, reason='adjustment')
+            for amount in range(5)
+        ])
+        cls.expected = list(
+            GoldTransaction.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def _paginator(self):
+        return KeysetPaginator(GoldTransaction.objects.all(), 2)
+
+    def test_cursor_round_trip(self):
+        values = ['2024-05-01T10:00:00.123456+00:00', 42]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_cursors_walk_every_row_once(self):
+        paginator = self._paginator()
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = paginator.page(cursor)
+            seen += [row.id for row in page]
+            pages += 1
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_invalid_cursors_return_the_first_page(self):
+        paginator = self._paginator()
+        first = [row.id for row in paginator.page()]
+
+        for cursor in ('no-es-un-cursor!', encode_cursor([1]), encode_cursor(['ayer', 1]), encode_cursor({'a': 1})):
+            with self.subTest(cursor=cursor):
+                self.assertEqual([row.id for row in paginator.page(cursor)], first)
+
+    def test_branches_page_like_the_or_query(self):
+        other = Player.objects.create(user=User.objects.create_user('other', password='x'), captain_name='Otra')
+        GoldTransaction.objects.bulk_create([
+            GoldTransaction(player=other, counterparty=self.player if i % 2 else None, amount=i, reason='adjustment')
+            for i in range(6)
+        ])
+        branches = [Q(player=self.player), Q(counterparty=self.player)]
+        expected = list(
+            GoldTransaction.objects.filter(branches[0] | branches[1])
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        paginator = KeysetPaginator(GoldTransaction.objects.all(), 2, branches=branches)
+
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += [row.id for row in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(len(expected), 8)
+        self.assertEqual(seen, expected)
+
+
+class QueryPlanTests(TestCase):
+    # Mismos datos que `check_query_plans --seed 50`
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = seed_dataset(players=50)
+        analyze()
+
+    def test_hot_queries_use_their_indexes(self):
+        results = run_checks(self.player)
+
+        self.assertEqual(len(results), len(PLAN_CHECKS))
+        for result in results:
+            with self.subTest(check=result.check.name):
+                self.assertFalse(result.sequential_scan, result.plan)
+                self.assertTrue(result.index_used, result.plan)
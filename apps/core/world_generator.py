@@ -0,0 +1,563 @@
+"""
+Generador de mundos sintéticos a escala de producción (populate_game --scale).
+Crea regiones sobre la cuadrícula de coordenadas, un grafo conexo de rutas
+comerciales, recursos y mercados por región, y jugadores con flotas,
+tripulación, carga e historial de batallas y misiones.
+Todo se escribe con bulk_create por lotes en orden de dependencias y dentro de
+una transacción; la misma semilla sobre la misma base de datos genera el mismo mundo.
+"""
+import math
+import random
+from array import array
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from apps.combat.models import Battle, PirateFleet
+from apps.exploration.models import ExplorationMission, Region, RegionResource
+from apps.exploration.services.spatial_index import RegionSpatialIndex
+from apps.missions.models import Mission, PlayerMission
+from apps.players.models import Player
+from apps.players.services.leaderboard import Leaderboard
+from apps.ships.models import CrewMember, Ship, ShipCargo, ShipType
+from apps.trade.models import Market, Resource, TradeMission, TradeMissionCargo, TradeRoute
+from apps.trade.services.market_snapshot import MarketSnapshot
+from apps.trade.services.route_graph import RouteGraph
+
+SYNTHETIC_USER_PREFIX = 'sim_'
+
+# Un jugador por cada REGIONS_PER_PLAYER regiones si no se indica otra cifra
+REGIONS_PER_PLAYER = 20
+# Los jugadores se generan (con todo su historial) en bloques de este tamaño
+PLAYER_CHUNK = 500
+
+# Fracción de celdas de la cuadrícula ocupadas por regiones
+GRID_FILL = 0.5
+# Fracción superior del mapa con clima ártico
+ARCTIC_BAND = 0.08
+
+# La ruta troncal recorre la cuadrícula en franjas de esta altura, en zigzag
+BAND_HEIGHT = 4
+# Pesos de 0, 1 y 2 atajos por región hacia una de las NEIGHBOR_WINDOW siguientes en la troncal
+SHORTCUT_WEIGHTS = [50, 35, 15]
+NEIGHBOR_WINDOW = 12
+
+MILES_PER_UNIT = 10
+SECONDS_PER_MILE = 360
+
+# Los puertos siempre tienen mercado; el resto con esta probabilidad
+MARKET_CHANCE = 0.1
+HISTORY_DAYS = 90
+
+REGION_TYPE_WEIGHTS = {
+    'ocean': 25, 'island': 20, 'port': 12, 'archipelago': 8, 'bay': 8,
+    'reef': 7, 'strait': 5, 'lagoon': 5, 'atoll': 5, 'cave': 5,
+}
+REGION_TYPE_NAMES = {
+    'ocean': 'Mar', 'island': 'Isla', 'port': 'Puerto', 'archipelago': 'Archipiélago', 'bay': 'Bahía',
+    'reef': 'Arrecife', 'strait': 'Estrecho', 'lagoon': 'Laguna', 'atoll': 'Atolón', 'cave': 'Cueva',
+}
+REGION_NAME_WORDS = [
+    'Coral', 'Niebla', 'Sal', 'Ámbar', 'Ceniza', 'Tormenta', 'Esmeralda', 'Marea', 'Bruma', 'Perla',
+    'Calavera', 'Sirena', 'Tiburón', 'Brisa', 'Ancla', 'Cristal', 'Eco', 'Halcón', 'Luna', 'Sol',
+]
+CLIMATE_WEIGHTS = {'tropical': 45, 'temperate': 40, 'desert': 8, 'stormy': 7}
+
+# Dificultad → (peso, rango de peligro, rango de nivel requerido)
+DIFFICULTY_PROFILES = {
+    'easy': (35, (1, 2), (1, 5)),
+    'medium': (30, (3, 4), (5, 12)),
+    'hard': (20, (5, 7), (10, 20)),
+    'extreme': (10, (7, 9), (18, 35)),
+    'legendary': (5, (9, 10), (30, 60)),
+}
+# Abundancia → (peso, rango del modificador de precio base)
+ABUNDANCE_PROFILES = {
+    'rare': (15, (1.3, 1.8)),
+    'uncommon': (25, (1.1, 1.3)),
+    'common': (40, (0.9, 1.1)),
+    'abundant': (20, (0.6, 0.9)),
+}
+MARKET_SIZE_WEIGHTS = {'small': 40, 'medium': 35, 'large': 20, 'metropolis': 5}
+
+# Coste de contratación por tipo de tripulante (el mismo que en la vista hire_crew)
+CREW_COSTS = {'sailor': 50, 'gunner': 75, 'navigator': 100, 'carpenter': 80, 'cook': 60, 'quartermaster': 120}
+FIRST_NAMES = ['Juan', 'Diego', 'Pedro', 'Ana', 'Lucía', 'Miguel', 'Rosa', 'Tomás', 'Inés', 'Álvaro', 'Marta', 'Gaspar']
+LAST_NAMES = ['Morgan', 'Drake', 'Vane', 'Bonny', 'Read', 'Kidd', 'Teach', 'Lafitte', 'Rackham', 'Roberts', 'Avery', 'Blas']
+SHIP_NAMES = ['Perla Negra', 'Venganza', 'Fortuna', 'Gaviota', 'Santa María', 'Relámpago', 'Intrépido', 'Albatros']
+
+
+@contextmanager
+def backdated(model, *names):
+    """Desactiva auto_now/auto_now_add en esos campos para poder escribir fechas históricas."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class _PlayerPlan:
+    """Jugador sin guardar con su flota e historial, enlazados por instancias."""
+
+    __slots__ = (
+        'user', 'player', 'ships', 'crew', 'cargo', 'battles', 'explorations',
+        'trades', 'trade_cargo', 'missions', 'discoveries',
+    )
+
+    def __init__(self):
+        self.ships, self.crew, self.cargo = [], [], []
+        self.battles, self.explorations, self.trades, self.trade_cargo, self.missions = [], [], [], [], []
+        self.discoveries = []
+
+
+class WorldGenerator:
+    """
+    Genera `regions` regiones y `players` jugadores (por defecto uno por cada
+    REGIONS_PER_PLAYER regiones). `progress(paso, hechos, total)` se llama tras
+    escribir cada lote.
+    """
+
+    def __init__(self, regions, players=None, seed=1, batch_size=2000, progress=None):
+        self.region_count = regions
+        self.player_count = players if players is not None else max(1, regions // REGIONS_PER_PLAYER)
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.progress = progress or (lambda step, done, total: None)
+        self.now = timezone.now()
+        self.counts = {}
+
+        # Datos de las regiones sintéticas por posición (arrays compactos)
+        self.region_ids = array('q')
+        self.xs = array('q')
+        self.ys = array('q')
+        self.dangers = array('b')
+        self.levels = array('b')
+        self.market_positions = []
+        self.route_ids = array('q')
+        # Posiciones de regiones ya descubiertas por algún jugador sintético
+        self.discovered = set()
+
+    @staticmethod
+    def exists():
+        """¿Hay ya un mundo sintético en la base de datos?"""
+        return User.objects.filter(username__startswith=SYNTHETIC_USER_PREFIX).exists()
+
+    def run(self):
+        """Genera el mundo completo y devuelve las filas escritas por modelo."""
+        self._load_catalog()
+        with transaction.atomic():
+            self.generate_regions()
+            self.generate_trade_routes()
+            self.generate_region_resources()
+            self.generate_markets()
+            self.generate_players()
+        # bulk_create no emite señales: invalidar a mano las estructuras derivadas
+        RegionSpatialIndex.bump_version()
+        RouteGraph.bump_version()
+        MarketSnapshot.invalidate()
+        Leaderboard.rebuild()
+        return self.counts
+
+    def _load_catalog(self):
+        self.resources = list(Resource.objects.order_by('pk').values_list('pk', 'weight', 'base_price', 'category'))
+        self.ship_types = list(ShipType.objects.order_by('required_level', 'purchase_cost'))
+        self.fleets = list(PirateFleet.objects.filter(is_active=True).order_by('level', 'pk'))
+        self.missions = list(Mission.objects.filter(is_active=True).order_by('pk').values_list('pk', 'required_level'))
+        if not (self.resources and self.ship_types and self.fleets):
+            raise ValueError('Faltan recursos, tipos de barco o flotas piratas en el catálogo')
+        self.existing_regions = list(Region.objects.order_by('pk').values_list(
+            'pk', 'x_coordinate', 'y_coordinate', 'danger_level', 'required_level',
+        ))
+
+    def _write(self, model, objs):
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def _write_in_batches(self, step, model, total, make, ids=None):
+        """Crea `total` objetos con `make(i)` lote a lote; guarda sus claves en `ids` si se indica."""
+        for start in range(0, total, self.batch_size):
+            end = min(total, start + self.batch_size)
+            created = self._write(model, [make(i) for i in range(start, end)])
+            if ids is not None:
+                ids.extend(obj.pk for obj in created)
+            self.progress(step, end, total)
+
+    def _ago(self, max_days, min_seconds=0):
+        """Instante aleatorio entre hace `max_days` días y hace `min_seconds` segundos."""
+        return self.now - timedelta(seconds=self.rng.randint(min_seconds, max_days * 86400))
+
+    # Mundo
+
+    def generate_regions(self):
+        rng = self.rng
+        n = self.region_count
+        occupied = {(x, y) for _, x, y, _, _ in self.existing_regions}
+        side = math.ceil(math.sqrt((n + len(occupied)) / GRID_FILL))
+        cells = [
+            cell for cell in rng.sample(range(side * side), n + len(occupied))
+            if divmod(cell, side)[::-1] not in occupied
+        ][:n]
+        difficulty_weights = {name: profile[0] for name, profile in DIFFICULTY_PROFILES.items()}
+
+        def make(i):
+            y, x = divmod(cells[i], side)
+            region_type = _weighted(rng, REGION_TYPE_WEIGHTS)
+            difficulty = _weighted(rng, difficulty_weights)
+            _, danger_range, level_range = DIFFICULTY_PROFILES[difficulty]
+            danger = rng.randint(*danger_range)
+            level = rng.randint(*level_range)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.dangers.append(danger)
+            self.levels.append(level)
+            if region_type == 'port' or rng.random() < MARKET_CHANCE:
+                self.market_positions.append(i)
+            return Region(
+                name=f'{REGION_TYPE_NAMES[region_type]} {rng.choice(REGION_NAME_WORDS)} {i + 1}',
+                region_type=region_type,
+                climate='arctic' if y < side * ARCTIC_BAND else _weighted(rng, CLIMATE_WEIGHTS),
+                difficulty=difficulty,
+                x_coordinate=x,
+                y_coordinate=y,
+                exploration_cost=20 + danger * rng.randint(5, 15),
+                danger_level=danger,
+                base_gold_reward=danger * rng.randint(20, 60),
+                base_experience_reward=50 + danger * rng.randint(10, 30),
+                required_level=level,
+                required_ship_speed=rng.randint(4, 10) if difficulty in ('extreme', 'legendary') else 0,
+            )
+
+        self._write_in_batches('Regiones', Region, n, make, ids=self.region_ids)
+
+    def generate_trade_routes(self):
+        """
+        Una ruta troncal en zigzag por franjas horizontales une todas las regiones,
+        incluidas las que ya existían, así que el grafo es conexo; cada región añade
+        además hasta dos atajos hacia vecinas cercanas en la troncal. Cada arista
+        se escribe en ambos sentidos.
+        """
+        rng = self.rng
+        ids, xs, ys = array('q', self.region_ids), array('q', self.xs), array('q', self.ys)
+        dangers, levels = array('b', self.dangers), array('b', self.levels)
+        for pk, x, y, danger, level in self.existing_regions:
+            ids.append(pk)
+            xs.append(x)
+            ys.append(y)
+            dangers.append(danger)
+            levels.append(min(level, 127))
+
+        def trunk_key(i):
+            band = ys[i] // BAND_HEIGHT
+            return band, xs[i] if band % 2 == 0 else -xs[i]
+
+        order = sorted(range(len(ids)), key=trunk_key)
+        shortcut_counts = range(len(SHORTCUT_WEIGHTS))
+        edges = {}
+        for p in range(len(order) - 1):
+            edges[order[p], order[p + 1]] = None
+            for _ in range(rng.choices(shortcut_counts, weights=SHORTCUT_WEIGHTS)[0]):
+                q = p + rng.randint(2, NEIGHBOR_WINDOW)
+                if q < len(order):
+                    edges[order[p], order[q]] = None
+        existing = set(TradeRoute.objects.values_list('origin_id', 'destination_id'))
+        pairs = [
+            (a, b)
+            for edge in edges
+            for a, b in (edge, edge[::-1])
+            if (ids[a], ids[b]) not in existing
+        ]
+        del edges, order
+
+        def make(i):
+            a, b = pairs[i]
+            distance = max(1, round(math.hypot(xs[a] - xs[b], ys[a] - ys[b]) * MILES_PER_UNIT))
+            return TradeRoute(
+                origin_id=ids[a],
+                destination_id=ids[b],
+                distance=distance,
+                danger_level=(dangers[a] + dangers[b] + 1) // 2,
+                base_travel_time=timedelta(seconds=distance * SECONDS_PER_MILE),
+                required_level=min(levels[a], levels[b]),
+            )
+
+        self._write_in_batches('Rutas comerciales', TradeRoute, len(pairs), make, ids=self.route_ids)
+
+    def generate_region_resources(self):
+        rng = self.rng
+        resource_ids = [pk for pk, *_ in self.resources]
+        abundance_weights = {name: profile[0] for name, profile in ABUNDANCE_PROFILES.items()}
+        total = len(self.region_ids)
+        rows = []
+        for position, region_id in enumerate(self.region_ids, start=1):
+            for resource_id in rng.sample(resource_ids, min(len(resource_ids), rng.randint(1, 4))):
+                abundance = _weighted(rng, abundance_weights)
+                rows.append(RegionResource(
+                    region_id=region_id,
+                    resource_id=resource_id,
+                    abundance=abundance,
+                    base_price_modifier=round(rng.uniform(*ABUNDANCE_PROFILES[abundance][1]), 2),
+                ))
+            if len(rows) >= self.batch_size or position == total:
+                self._write(RegionResource, rows)
+                rows = []
+                self.progress('Recursos de regiones', position, total)
+
+    def generate_markets(self):
+        rng = self.rng
+        categories = sorted({category for *_, category in self.resources})
+
+        def make(i):
+            return Market(
+                region_id=self.region_ids[self.market_positions[i]],
+                size=_weighted(rng, MARKET_SIZE_WEIGHTS),
+                specialization=rng.choice(categories) if rng.random() < 0.6 else '',
+                prosperity_level=rng.randint(20, 90),
+            )
+
+        self._write_in_batches('Mercados', Market, len(self.market_positions), make)
+
+    # Jugadores
+
+    def generate_players(self):
+        """
+        Cada bloque de jugadores se planifica entero en memoria (instancias sin
+        guardar enlazadas entre sí) y se escribe modelo a modelo: usuarios,
+        jugadores, barcos, tripulación, carga, batallas y misiones. bulk_create
+        copia la clave de cada instancia padre ya guardada a la columna FK del hijo.
+        """
+        for start in range(0, self.player_count, PLAYER_CHUNK):
+            end = min(self.player_count, start + PLAYER_CHUNK)
+            plans = [self._plan_player(i) for i in range(start, end)]
+            self._write_plans(plans)
+            self.progress('Jugadores', end, self.player_count)
+
+    def _write_plans(self, plans):
+        self._write(User, [plan.user for plan in plans])
+        with backdated(Player, 'created_at'):
+            self._write(Player, [plan.player for plan in plans])
+        with backdated(Ship, 'created_at', 'last_maintenance'):
+            self._write(Ship, [ship for plan in plans for ship in plan.ships])
+        for model, attr in ((CrewMember, 'crew'), (ShipCargo, 'cargo')):
+            self._write(model, [obj for plan in plans for obj in getattr(plan, attr)])
+        with backdated(Battle, 'started_at'):
+            self._write(Battle, [obj for plan in plans for obj in plan.battles])
+        with backdated(ExplorationMission, 'started_at'):
+            self._write(ExplorationMission, [obj for plan in plans for obj in plan.explorations])
+        with backdated(TradeMission, 'started_at'):
+            self._write(TradeMission, [obj for plan in plans for obj in plan.trades])
+        self._write(TradeMissionCargo, [obj for plan in plans for obj in plan.trade_cargo])
+        with backdated(PlayerMission, 'assigned_at'):
+            self._write(PlayerMission, [obj for plan in plans for obj in plan.missions])
+
+        # Primeros descubrimientos: las regiones ya existen, se actualizan al final del bloque
+        discoveries = [
+            Region(pk=mission.region_id, is_discovered=True, discoverer_id=mission.player_id, discovery_date=mission.completed_at)
+            for plan in plans for mission in plan.discoveries
+        ]
+        Region.objects.bulk_update(discoveries, ['is_discovered', 'discoverer', 'discovery_date'], batch_size=self.batch_size)
+
+    def _plan_player(self, index):
+        rng = self.rng
+        plan = _PlayerPlan()
+        level = min(100, 1 + int(rng.expovariate(1 / 8)))
+        skill_cap = min(20, 1 + level // 4)
+        plan.user = User(username=f'{SYNTHETIC_USER_PREFIX}{index}')
+        player = plan.player = Player(
+            user=plan.user,
+            captain_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index + 1}',
+            level=level,
+            experience=(level - 1) * 1000 + rng.randint(0, 999),
+            gold=rng.randint(500, 3000) + level * rng.randint(100, 1000),
+            reputation=rng.choice([code for code, _ in Player.REPUTATION_CHOICES]),
+            navigation_skill=rng.randint(1, skill_cap),
+            combat_skill=rng.randint(1, skill_cap),
+            trade_skill=rng.randint(1, skill_cap),
+            leadership_skill=rng.randint(1, skill_cap),
+            diplomacy_skill=rng.randint(1, skill_cap),
+            created_at=self._ago(365, HISTORY_DAYS * 86400),
+        )
+        self._plan_fleet(plan)
+        self._plan_battles(plan)
+        self._plan_explorations(plan)
+        self._plan_trades(plan)
+        self._plan_missions(plan)
+        return plan
+
+    def _plan_fleet(self, plan):
+        rng = self.rng
+        player = plan.player
+        available = [t for t in self.ship_types if t.required_level <= player.level] or self.ship_types[:1]
+        for _ in range(rng.randint(1, 4)):
+            ship_type = rng.choice(available)
+            hired = rng.randint(0, min(6, ship_type.base_crew_capacity - ship_type.base_crew_capacity // 2))
+            ship = Ship(
+                owner=player,
+                ship_type=ship_type,
+                name=rng.choice(SHIP_NAMES),
+                current_location_id=self.region_ids[rng.randrange(len(self.region_ids))],
+                speed=ship_type.base_speed + rng.randint(0, 2),
+                cargo_capacity=ship_type.base_cargo_capacity + rng.randint(0, player.level),
+                firepower=ship_type.base_firepower + rng.randint(0, 5),
+                defense=ship_type.base_defense + rng.randint(0, 5),
+                crew_capacity=ship_type.base_crew_capacity,
+                hull_health=rng.randint(40, 100),
+                crew_count=ship_type.base_crew_capacity // 2 + hired,
+                created_at=player.created_at,
+                last_maintenance=self._ago(HISTORY_DAYS),
+            )
+            plan.ships.append(ship)
+            for _ in range(hired):
+                crew_type = rng.choice(list(CREW_COSTS))
+                plan.crew.append(CrewMember(
+                    ship=ship,
+                    name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    crew_type=crew_type,
+                    skill_level=rng.randint(1, 10),
+                    salary_per_day=CREW_COSTS[crew_type] // 10,
+                ))
+            # bulk_create no pasa por ShipCargo.save: el peso se acumula aquí
+            if rng.random() < 0.6:
+                for resource_id, weight, _, _ in rng.sample(self.resources, min(len(self.resources), rng.randint(1, 3))):
+                    room = ship.cargo_capacity - ship.cargo_weight
+                    if weight > room:
+                        continue
+                    quantity = rng.randint(1, min(50, room // weight) if weight else 50)
+                    plan.cargo.append(ShipCargo(ship=ship, resource_id=resource_id, quantity=quantity))
+                    ship.cargo_weight += quantity * weight
+
+    def _plan_battles(self, plan):
+        rng = self.rng
+        player = plan.player
+        fleets = [f for f in self.fleets if f.level <= player.level + 2] or self.fleets[:1]
+        for _ in range(rng.randint(0, min(15, 2 + player.level))):
+            fleet = rng.choice(fleets)
+            chance = min(0.9, max(0.1, 0.5 + (player.level - fleet.level) * 0.04 + player.combat_skill * 0.01))
+            won = rng.random() < chance
+            started_at = self._ago(HISTORY_DAYS, 3600)
+            max_health = 100 + fleet.defense * 2
+            plan.battles.append(Battle(
+                attacker=player,
+                attacker_ship=rng.choice(plan.ships),
+                battle_type=rng.choice(['pve', 'pve', 'raid']),
+                status='completed',
+                npc_name=fleet.name,
+                npc_health=0 if won else rng.randint(1, max_health),
+                npc_max_health=max_health,
+                npc_attack_power=fleet.firepower,
+                npc_defense=fleet.defense,
+                npc_type=fleet.fleet_type,
+                winner=player if won else None,
+                started_at=started_at,
+                completed_at=started_at + timedelta(minutes=rng.randint(5, 60)),
+                gold_stakes=fleet.gold_reward if won else 0,
+                experience_reward=fleet.experience_reward if won else fleet.experience_reward // 4,
+                battle_log=f'{player.captain_name} contra {fleet.name}: {"victoria" if won else "derrota"}',
+            ))
+            if won:
+                player.total_battles_won += 1
+            else:
+                player.total_battles_lost += 1
+
+    def _plan_explorations(self, plan):
+        rng = self.rng
+        player = plan.player
+        for _ in range(rng.randint(0, 8)):
+            position = rng.randrange(len(self.region_ids))
+            ship = rng.choice(plan.ships)
+            started_at = self._ago(HISTORY_DAYS, 3600)
+            duration = timedelta(minutes=rng.randint(30, 240))
+            danger = self.dangers[position]
+            mission = ExplorationMission(
+                player=player,
+                ship=ship,
+                region_id=self.region_ids[position],
+                started_at=started_at,
+                estimated_duration=duration,
+                completed_at=started_at + duration,
+            )
+            if rng.randint(1, 100) <= min(95, max(10, 90 - danger * 8) + player.navigation_skill * 2 + ship.speed):
+                mission.status = 'completed'
+                mission.gold_earned = danger * rng.randint(20, 60) * (1 + player.level // 10)
+                mission.experience_earned = (50 + danger * rng.randint(10, 30)) * (1 + player.level // 10)
+                mission.result_description = 'Exploración exitosa.'
+                if position not in self.discovered:
+                    self.discovered.add(position)
+                    plan.discoveries.append(mission)
+                    mission.gold_earned += 500
+                    player.regions_discovered += 1
+            else:
+                mission.status = 'failed'
+                mission.hull_damage_taken = rng.randint(10, 30)
+                mission.result_description = f'La exploración falló. Tu barco sufrió {mission.hull_damage_taken} puntos de daño.'
+            plan.explorations.append(mission)
+
+    def _plan_trades(self, plan):
+        """Misiones comerciales completadas, con las mismas cuentas que TradeMission.process_arrival."""
+        rng = self.rng
+        player = plan.player
+        if not self.route_ids:
+            return
+        for _ in range(rng.randint(0, 5)):
+            departure = self._ago(HISTORY_DAYS, 7200)
+            mission = TradeMission(
+                player=player,
+                ship=rng.choice(plan.ships),
+                trade_route_id=self.route_ids[rng.randrange(len(self.route_ids))],
+                status='completed',
+                started_at=departure - timedelta(minutes=rng.randint(5, 60)),
+                departure_time=departure,
+                estimated_arrival=departure + timedelta(hours=rng.randint(1, 12)),
+                total_expenses=rng.randint(0, 200),
+            )
+            mission.completed_at = mission.estimated_arrival
+            revenue = 0
+            for resource_id, _, base_price, _ in rng.sample(self.resources, min(len(self.resources), rng.randint(1, 3))):
+                quantity = rng.randint(1, 40)
+                purchase_price = max(1, round(base_price * rng.uniform(0.7, 1.1)))
+                selling_price = max(1, round(base_price * rng.uniform(0.8, 1.5)))
+                cargo = TradeMissionCargo(
+                    trade_mission=mission,
+                    resource_id=resource_id,
+                    quantity=quantity,
+                    purchase_price=purchase_price,
+                    selling_price=selling_price,
+                    total_cost=purchase_price * quantity,
+                    total_revenue=selling_price * quantity,
+                )
+                plan.trade_cargo.append(cargo)
+                mission.initial_investment += cargo.total_cost
+                revenue += cargo.total_revenue
+            mission.final_profit = revenue - mission.initial_investment - mission.total_expenses
+            player.total_trade_profit += max(0, mission.final_profit)
+            plan.trades.append(mission)
+
+    def _plan_missions(self, plan):
+        rng = self.rng
+        player = plan.player
+        eligible = [pk for pk, required_level in self.missions if required_level <= player.level]
+        for mission_id in rng.sample(eligible, min(len(eligible), rng.randint(0, 3))):
+            status = rng.choice(['assigned', 'in_progress', 'completed', 'completed', 'failed'])
+            assigned_at = self._ago(HISTORY_DAYS)
+            started = status != 'assigned'
+            plan.missions.append(PlayerMission(
+                player=player,
+                mission_id=mission_id,
+                status=status,
+                progress_percentage=100 if status == 'completed' else rng.randint(0, 90) if started else 0,
+                assigned_at=assigned_at,
+                started_at=assigned_at + timedelta(hours=1) if started else None,
+                completed_at=assigned_at + timedelta(days=1) if status in ('completed', 'failed') else None,
+            ))
@@ -5,3 +5,6 @@ class ExplorationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.exploration'
     verbose_name = 'Exploración - Age of Voyage'
+
+    def ready(self):
+        import apps.exploration.signals
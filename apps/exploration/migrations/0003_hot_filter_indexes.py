@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exploration', '0002_initial'),
+        ('players', '0001_initial'),
+        ('ships', '0004_ship_cargo_weight'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='explorationmission',
+            index=models.Index(fields=['player', 'status'], name='explore_mission_player_st_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.core.dirty_fields import DirtyFieldsMixin
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
+from apps.exploration.services.event_table import ExplorationEventTable
 import random
 
 
@@ -130,7 +133,7 @@ class ExplorationEvent(models.Model):
         return f"{self.name} ({self.get_event_type_display()})"
 
 
-class ExplorationMission(models.Model):
+class ExplorationMission(DirtyFieldsMixin, models.Model):
     """Misión de exploración de un jugador"""
     
     STATUS_CHOICES = [
@@ -165,6 +168,9 @@ class ExplorationMission(models.Model):
         verbose_name = "Misión de Exploración"
         verbose_name_plural = "Misiones de Exploración"
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['player', 'status'], name='explore_mission_player_st_idx'),
+        ]
     
     def __str__(self):
         return f"{self.player.captain_name} explorando {self.region.name}"
@@ -206,7 +212,6 @@ class ExplorationMission(models.Model):
             self.status = 'completed'
             
             # Agregar recompensas al jugador
-            self.player.gold += gold_reward
             level_up = self.player.add_experience(exp_reward)
             
             # Marcar región como descubierta si es la primera vez
@@ -214,13 +219,15 @@ class ExplorationMission(models.Model):
                 self.region.is_discovered = True
                 self.region.discoverer = self.player
                 self.region.discovery_date = self.completed_at
-                self.region.save()
+                self.region.save(update_fields=['is_discovered', 'discoverer', 'discovery_date'])
+                self.player.regions_discovered += 1
                 
                 # Bonus por descubrimiento
                 discovery_bonus = 500
-                self.player.gold += discovery_bonus
                 self.gold_earned += discovery_bonus
+                gold_reward += discovery_bonus
             
+            GoldLedger.credit(self.player, gold_reward, 'exploration_reward', f'exploration:{self.pk}')
             self.result_description = f"¡Exploración exitosa! Descubriste {self.region.name}."
             
         else:
@@ -229,48 +236,50 @@ class ExplorationMission(models.Model):
             hull_damage = random.randint(10, 30)
             self.hull_damage_taken = hull_damage
             self.ship.hull_health = max(0, self.ship.hull_health - hull_damage)
-            self.ship.save()
             
             self.result_description = f"La exploración falló. Tu barco sufrió {hull_damage} puntos de daño."
         
         # Procesar eventos aleatorios
         self.process_random_events()
         
-        # Guardar cambios
-        self.player.save()
+        # Guardar cambios (una sola escritura por objeto; el oro ya lo aplicó GoldLedger)
+        self.ship.save()
+        self.player.save(update_fields=['level', 'experience', 'regions_discovered'])
         self.save()
     
     def process_random_events(self):
-        """Procesar eventos aleatorios durante la exploración"""
-        possible_events = ExplorationEvent.objects.all()
+        """
+        Procesar eventos aleatorios durante la exploración.
+        Los eventos elegibles por tipo de región y clima vienen precalculados; todas las
+        tiradas se hacen en un solo sorteo y los eventos ocurridos se guardan con un
+        único bulk_create. El barco y el jugador se guardan en process_exploration.
+        """
+        events = ExplorationEventTable.current().eligible(self.region.region_type, self.region.climate)
+        if not len(events):
+            return []
         
-        # Filtrar eventos por tipo de región y clima
-        if self.region.region_type:
-            possible_events = possible_events.filter(
-                models.Q(required_region_type='') | 
-                models.Q(required_region_type=self.region.region_type)
-            )
+        triggered = events.roll()
+        if not triggered.any():
+            return []
         
-        if self.region.climate:
-            possible_events = possible_events.filter(
-                models.Q(required_climate='') | 
-                models.Q(required_climate=self.region.climate)
-            )
+        event_ids = events.ids[triggered].tolist()
+        through = ExplorationMission.events_encountered.through
+        through.objects.bulk_create(
+            [through(explorationmission_id=self.pk, explorationevent_id=event_id) for event_id in event_ids],
+            ignore_conflicts=True,
+        )
         
-        # Determinar qué eventos ocurren
-        for event in possible_events:
-            event_roll = random.randint(1, 100)
-            if event_roll <= event.probability:
-                self.events_encountered.add(event)
-                
-                # Aplicar efectos del evento
-                self.gold_earned += event.gold_effect
-                self.experience_earned += event.experience_effect
-                
-                if event.hull_damage > 0:
-                    self.hull_damage_taken += event.hull_damage
-                    self.ship.hull_health = max(0, self.ship.hull_health - event.hull_damage)
-                    self.ship.save()
+        # Aplicar efectos de los eventos
+        self.gold_earned += int(events.gold_effects[triggered].sum())
+        self.experience_earned += int(events.experience_effects[triggered].sum())
+        
+        damages = events.hull_damages[triggered]
+        hull_damage = int(damages[damages > 0].sum())
+        if hull_damage:
+            self.hull_damage_taken += hull_damage
+            self.ship.hull_health = max(0, self.ship.hull_health - hull_damage)
+        
+        return event_ids
 
 
 class RegionResource(models.Model):
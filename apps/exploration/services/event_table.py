@@ -0,0 +1,104 @@
+"""
+ExplorationEventTable: Catálogo de eventos de exploración precalculado.
+Carga todos los eventos con una única consulta y guarda, por cada combinación
+(tipo de región, clima), los arrays NumPy de los eventos elegibles, de modo que
+las tiradas de una misión se resuelven en un solo sorteo vectorizado. Cada
+proceso la recarga cuando cambia su versión (DataVersion), al guardar o borrar
+un ExplorationEvent.
+"""
+import numpy as np
+
+from apps.core.data_versions import DataVersion
+
+_rng = np.random.default_rng()
+
+
+class EligibleEvents:
+    """Eventos elegibles para una combinación (tipo de región, clima)."""
+
+    __slots__ = ('ids', 'probabilities', 'gold_effects', 'experience_effects', 'hull_damages')
+
+    def __init__(self, ids, probabilities, gold_effects, experience_effects, hull_damages):
+        self.ids = ids
+        self.probabilities = probabilities
+        self.gold_effects = gold_effects
+        self.experience_effects = experience_effects
+        self.hull_damages = hull_damages
+
+    def __len__(self):
+        return len(self.ids)
+
+    def roll(self, rng=None):
+        """Tira 1-100 por evento en un solo sorteo y devuelve la máscara de eventos ocurridos."""
+        rolls = (rng or _rng).integers(1, 101, size=len(self.ids))
+        return rolls <= self.probabilities
+
+
+class ExplorationEventTable:
+    VERSION_KEY = 'exploration:event_table:version'
+
+    FIELDS = ('id', 'probability', 'gold_effect', 'experience_effect', 'hull_damage', 'required_region_type', 'required_climate')
+
+    # Tabla cargada en este proceso
+    _local = {}
+
+    __slots__ = ('version', 'ids', 'probabilities', 'gold_effects', 'experience_effects', 'hull_damages',
+                 'region_types', 'climates', '_eligible')
+
+    def __init__(self, version, rows):
+        self.version = version
+        columns = list(zip(*rows)) if rows else [()] * len(self.FIELDS)
+        self.ids = np.array(columns[0], dtype=np.int64)
+        self.probabilities = np.array(columns[1], dtype=np.int64)
+        self.gold_effects = np.array(columns[2], dtype=np.int64)
+        self.experience_effects = np.array(columns[3], dtype=np.int64)
+        self.hull_damages = np.array(columns[4], dtype=np.int64)
+        self.region_types = np.array(columns[5], dtype=object)
+        self.climates = np.array(columns[6], dtype=object)
+        self._eligible = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, version=None):
+        """Carga el catálogo completo de eventos con una única consulta."""
+        from apps.exploration.models import ExplorationEvent
+
+        return cls(version, list(ExplorationEvent.objects.order_by('id').values_list(*cls.FIELDS)))
+
+    @classmethod
+    def current(cls):
+        """Tabla de la versión vigente del catálogo de eventos."""
+        version = DataVersion.get(cls.VERSION_KEY)
+        table = cls._local.get('table')
+        if table is None or table.version != version:
+            table = cls.build(version)
+            cls._local['table'] = table
+        return table
+
+    @classmethod
+    def bump_version(cls):
+        """Invalida la tabla en los procesos que comparten la caché de versiones."""
+        DataVersion.bump(cls.VERSION_KEY)
+
+    def eligible(self, region_type, climate):
+        """Eventos que pueden ocurrir en una región de este tipo y clima (memorizado)."""
+        key = (region_type or '', climate or '')
+        events = self._eligible.get(key)
+        if events is None:
+            mask = np.ones(len(self.ids), dtype=bool)
+            # Sin tipo o clima en la región no se filtra por ese criterio
+            if region_type:
+                mask &= (self.region_types == '') | (self.region_types == region_type)
+            if climate:
+                mask &= (self.climates == '') | (self.climates == climate)
+            events = EligibleEvents(
+                self.ids[mask],
+                self.probabilities[mask],
+                self.gold_effects[mask],
+                self.experience_effects[mask],
+                self.hull_damages[mask],
+            )
+            self._eligible[key] = events
+        return events
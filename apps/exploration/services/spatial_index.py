@@ -0,0 +1,162 @@
+"""
+RegionSpatialIndex: Índice espacial de regiones por celdas de cuadrícula.
+Permite consultas por ventana visible (bounding box) y de regiones más cercanas
+sin recorrer toda la tabla de regiones. Se construye en el primer uso de cada
+proceso y se reconstruye cuando cambia la versión de la geometría de las regiones
+(DataVersion). El estado de descubrimiento tiene su propia versión: descubrir una
+región solo recarga el conjunto de ids descubiertos, no la cuadrícula.
+"""
+import heapq
+import math
+
+from apps.core.data_versions import DataVersion
+from apps.exploration.models import Region
+
+# Lado de cada celda de la cuadrícula, en unidades del mapa
+CELL_SIZE = 50
+
+
+class RegionSpatialIndex:
+    VERSION_KEY = 'exploration:region_index:version'
+    DISCOVERED_VERSION_KEY = 'exploration:region_index:discovered_version'
+
+    # Campos guardados por región (suficientes para pintar el mapa); is_discovered
+    # se añade al devolverlas a partir del conjunto de descubiertas
+    FIELDS = ('id', 'name', 'x_coordinate', 'y_coordinate', 'region_type', 'difficulty', 'required_level', 'danger_level')
+
+    # Índice cargado en este proceso
+    _local = {}
+
+    __slots__ = ('version', 'cell_size', 'cells', 'entries', 'bounds', 'discovered', 'discovered_version')
+
+    def __init__(self, version, rows, cell_size=CELL_SIZE, discovered=(), discovered_version=None):
+        self.version = version
+        self.cell_size = cell_size
+        self.entries = [dict(zip(self.FIELDS, row)) for row in rows]
+        self.discovered = frozenset(discovered)
+        self.discovered_version = discovered_version
+        self.cells = {}
+        for position, entry in enumerate(self.entries):
+            self.cells.setdefault(self._cell(entry['x_coordinate'], entry['y_coordinate']), []).append(position)
+        if self.cells:
+            cxs = [cx for cx, _ in self.cells]
+            cys = [cy for _, cy in self.cells]
+            self.bounds = (min(cxs), min(cys), max(cxs), max(cys))
+        else:
+            self.bounds = (0, 0, 0, 0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _cell(self, x, y):
+        return x // self.cell_size, y // self.cell_size
+
+    @classmethod
+    def build(cls, version=None, discovered_version=None):
+        """Carga las coordenadas de todas las regiones con una única consulta."""
+        rows = list(Region.objects.values_list(*cls.FIELDS, 'is_discovered'))
+        return cls(
+            version, [row[:-1] for row in rows],
+            discovered=[row[0] for row in rows if row[-1]], discovered_version=discovered_version,
+        )
+
+    @classmethod
+    def current(cls):
+        """Índice de la versión vigente de la tabla de regiones."""
+        # Versiones leídas antes de cargar: un cambio durante la carga fuerza otra al siguiente uso
+        version = DataVersion.get(cls.VERSION_KEY)
+        discovered_version = DataVersion.get(cls.DISCOVERED_VERSION_KEY)
+        index = cls._local.get('index')
+        if index is None or index.version != version:
+            index = cls.build(version, discovered_version)
+            cls._local['index'] = index
+        elif index.discovered_version != discovered_version:
+            index.discovered = frozenset(Region.objects.filter(is_discovered=True).values_list('id', flat=True))
+            index.discovered_version = discovered_version
+        return index
+
+    @classmethod
+    def bump_version(cls):
+        """Invalida el índice en los procesos que comparten la caché de versiones."""
+        DataVersion.bump(cls.VERSION_KEY)
+
+    @classmethod
+    def bump_discovered(cls):
+        """Invalida solo el conjunto de regiones descubiertas."""
+        DataVersion.bump(cls.DISCOVERED_VERSION_KEY)
+
+    def _output(self, entry):
+        return {**entry, 'is_discovered': entry['id'] in self.discovered}
+
+    def viewport(self, x_min, y_min, x_max, y_max, limit=None):
+        """Regiones dentro del rectángulo [x_min, x_max] × [y_min, y_max]."""
+        cx_min, cy_min = self._cell(x_min, y_min)
+        cx_max, cy_max = self._cell(x_max, y_max)
+        cx_min, cy_min = max(cx_min, self.bounds[0]), max(cy_min, self.bounds[1])
+        cx_max, cy_max = min(cx_max, self.bounds[2]), min(cy_max, self.bounds[3])
+        if cx_min > cx_max or cy_min > cy_max:
+            return []
+
+        # Si la ventana abarca más celdas de las que hay ocupadas, recorrer solo las ocupadas
+        span = (cx_max - cx_min + 1) * (cy_max - cy_min + 1)
+        if span > len(self.cells):
+            cells = [
+                positions for (cx, cy), positions in self.cells.items()
+                if cx_min <= cx <= cx_max and cy_min <= cy <= cy_max
+            ]
+        else:
+            cells = [
+                self.cells[(cx, cy)]
+                for cx in range(cx_min, cx_max + 1)
+                for cy in range(cy_min, cy_max + 1)
+                if (cx, cy) in self.cells
+            ]
+
+        result = []
+        for positions in cells:
+            for position in positions:
+                entry = self.entries[position]
+                if x_min <= entry['x_coordinate'] <= x_max and y_min <= entry['y_coordinate'] <= y_max:
+                    result.append(self._output(entry))
+                    if limit is not None and len(result) >= limit:
+                        return result
+        return result
+
+    def nearest(self, x, y, n=10, exclude=None):
+        """Las `n` regiones más cercanas a (x, y), buscando por anillos de celdas."""
+        if n <= 0 or not self.entries:
+            return []
+        cx, cy = self._cell(x, y)
+        max_ring = max(
+            abs(cx - self.bounds[0]), abs(cx - self.bounds[2]),
+            abs(cy - self.bounds[1]), abs(cy - self.bounds[3]),
+        )
+
+        candidates = []
+        ring = 0
+        while ring <= max_ring:
+            for cell in self._ring(cx, cy, ring):
+                for position in self.cells.get(cell, ()):
+                    entry = self.entries[position]
+                    if exclude is not None and entry['id'] == exclude:
+                        continue
+                    distance = math.hypot(entry['x_coordinate'] - x, entry['y_coordinate'] - y)
+                    candidates.append((distance, entry['id'], position))
+            # Todo lo que quede fuera del anillo actual está al menos a ring * cell_size
+            if len(candidates) >= n and heapq.nsmallest(n, candidates)[-1][0] <= ring * self.cell_size:
+                break
+            ring += 1
+
+        return [self._output(self.entries[position]) for _, _, position in heapq.nsmallest(n, candidates)]
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
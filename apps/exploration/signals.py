@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Region, ExplorationEvent
+from .services.spatial_index import RegionSpatialIndex
+from .services.event_table import ExplorationEventTable
+
+@receiver(post_save, sender=Region)
+def invalidate_region_index(sender, instance, created, update_fields=None, **kwargs):
+    # Con update_fields solo se invalida lo que cambió: un descubrimiento no reconstruye la cuadrícula
+    if created or update_fields is None or set(update_fields) & set(RegionSpatialIndex.FIELDS):
+        RegionSpatialIndex.bump_version()
+    elif 'is_discovered' in update_fields:
+        RegionSpatialIndex.bump_discovered()
+
+
+@receiver(post_delete, sender=Region)
+def drop_region_from_index(sender, instance, **kwargs):
+    RegionSpatialIndex.bump_version()
+
+
+@receiver(post_save, sender=ExplorationEvent)
+@receiver(post_delete, sender=ExplorationEvent)
+def invalidate_event_table(sender, instance, **kwargs):
+    ExplorationEventTable.bump_version()
@@ -0,0 +1,199 @@
+import math
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+
+from apps.exploration.models import ExplorationEvent, ExplorationMission, Region
+from apps.exploration.services.event_table import ExplorationEventTable
+from apps.exploration.services.spatial_index import RegionSpatialIndex
+from apps.players.models import Player
+from apps.ships.models import Ship, ShipType
+from apps.trade.models import TradeRoute
+
+
+def make_region(name, x, y):
+    return Region.objects.create(
+        name=name, description='', region_type='island', climate='tropical', difficulty='easy',
+        x_coordinate=x, y_coordinate=y,
+    )
+
+
+class StartExplorationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('explorer', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Exploradora')
+        cls.home = make_region('Puerto de pruebas', 0, 0)
+        cls.target = make_region('Isla de pruebas', 30, 40)
+        ship_type = ShipType.objects.create(
+            name='Goleta de pruebas', description='', base_speed=10, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Goleta', current_location=cls.home, speed=10,
+            cargo_capacity=100, firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+
+    def setUp(self):
+        # Las versiones no cambian dentro de un TestCase (se incrementan al confirmar)
+        for alias in ('default', 'versions'):
+            caches[alias].clear()
+        self.client.force_login(self.player.user)
+
+    def _start(self):
+        return self.client.post('/exploration/start/', {
+            'region_id': self.target.pk, 'ship_id': self.ship.pk, 'exploration_type': 'quick',
+        })
+
+    def test_exploration_adds_the_planned_voyage_time(self):
+        TradeRoute.objects.create(
+            origin=self.home, destination=self.target, distance=50, base_travel_time=timedelta(hours=2),
+        )
+        voyage = Ship.objects.get(pk=self.ship.pk).plan_voyage(self.target)
+
+        response = self._start()
+
+        self.assertRedirects(response, '/exploration/missions/', fetch_redirect_response=False)
+        mission = ExplorationMission.objects.get()
+        self.assertEqual(mission.status, 'in_progress')
+        self.assertEqual(mission.region, self.target)
+        self.assertEqual(
+            mission.estimated_duration,
+            timedelta(minutes=30 + int(voyage.travel_time.total_seconds() // 60)),
+        )
+        self.assertEqual(Ship.objects.get(pk=self.ship.pk).status, 'exploring')
+
+    def test_exploration_without_a_route_is_rejected(self):
+        response = self._start()
+
+        self.assertRedirects(response, '/exploration/', fetch_redirect_response=False)
+        self.assertFalse(ExplorationMission.objects.exists())
+        self.assertEqual(Ship.objects.get(pk=self.ship.pk).status, 'docked')
+
+
+class RegionSpatialIndexTests(TestCase):
+    def setUp(self):
+        caches['versions'].clear()
+        self.region = make_region('Cala de pruebas', 10, 10)
+
+    def _viewport(self):
+        return RegionSpatialIndex.current().viewport(0, 0, 100, 100)
+
+    def test_discovery_refreshes_the_flag_without_rebuilding_the_grid(self):
+        index = RegionSpatialIndex.current()
+        self.assertEqual([entry['is_discovered'] for entry in self._viewport()], [False])
+
+        self.region.is_discovered = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.region.save(update_fields=['is_discovered', 'discoverer', 'discovery_date'])
+
+        self.assertEqual([entry['is_discovered'] for entry in self._viewport()], [True])
+        self.assertIs(RegionSpatialIndex.current(), index)
+
+    def test_moving_a_region_rebuilds_the_grid(self):
+        index = RegionSpatialIndex.current()
+
+        self.region.x_coordinate = 500
+        with self.captureOnCommitCallbacks(execute=True):
+            self.region.save()
+
+        self.assertIsNot(RegionSpatialIndex.current(), index)
+        self.assertEqual(self._viewport(), [])
+
+
+class RegionSpatialIndexQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Regiones repartidas por varias celdas, con coordenadas en los bordes de la ventana
+        cls.regions = {
+            (x, y): make_region(f'Región de pruebas {x}/{y}', x, y)
+            for x in (-60, 0, 49, 50, 120, 400)
+            for y in (0, 75, 200)
+        }
+
+    def setUp(self):
+        caches['versions'].clear()
+        RegionSpatialIndex._local.clear()
+        self.index = RegionSpatialIndex.current()
+
+    def _ids(self, entries):
+        return {entry['id'] for entry in entries}
+
+    def test_viewport_matches_a_bounding_box_filter(self):
+        for box in [(0, 0, 100, 100), (-100, -100, 50, 75), (49, 0, 49, 200), (121, 0, 399, 200), (-500, -500, 500, 500)]:
+            x_min, y_min, x_max, y_max = box
+            expected = set(Region.objects.filter(
+                x_coordinate__range=(x_min, x_max), y_coordinate__range=(y_min, y_max),
+            ).values_list('id', flat=True))
+            with self.subTest(box=box):
+                self.assertEqual(self._ids(self.index.viewport(*box)), expected)
+
+    def test_viewport_outside_the_map_is_empty(self):
+        self.assertEqual(self.index.viewport(1000, 1000, 2000, 2000), [])
+
+    def test_viewport_limit(self):
+        self.assertEqual(len(self.index.viewport(-500, -500, 500, 500, limit=4)), 4)
+
+    def test_nearest_orders_by_distance(self):
+        home = self.regions[(50, 75)]
+        nearest = self.index.nearest(52, 70, n=3, exclude=home.pk)
+
+        by_distance = sorted(
+            (region for region in self.regions.values() if region != home),
+            key=lambda region: math.hypot(region.x_coordinate - 52, region.y_coordinate - 70),
+        )
+        self.assertEqual([entry['id'] for entry in nearest], [region.pk for region in by_distance[:3]])
+
+
+class ExplorationMapViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('cartographer', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Cartógrafa')
+        cls.home = make_region('Puerto de pruebas', 100, 100)
+        cls.near = make_region('Arrecife de pruebas', 120, 100)
+        cls.far = make_region('Isla lejana de pruebas', 900, 900)
+        ship_type = ShipType.objects.create(
+            name='Goleta de pruebas', description='', base_speed=10, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Goleta', current_location=cls.home, speed=10,
+            cargo_capacity=100, firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+
+    def setUp(self):
+        caches['versions'].clear()
+        self.client.force_login(self.player.user)
+        session = self.client.session
+        session['selected_ship_id'] = self.ship.pk
+        session.save()
+
+    def test_map_shows_the_viewport_and_nearby_regions(self):
+        response = self.client.get('/exploration/')
+
+        self.assertEqual(response.context['viewport'], {'x_min': -50, 'y_min': -50, 'x_max': 250, 'y_max': 250})
+        self.assertEqual(set(response.context['regions']), {self.home, self.near})
+        self.assertEqual([entry['id'] for entry in response.context['nearby_regions']], [self.near.pk, self.far.pk])
+        self.assertContains(response, 'Zona visible: (-50, -50) – (250, 250)')
+        self.assertContains(response, 'Regiones Cercanas')
+        self.assertContains(response, 'Isla lejana de pruebas')
+
+
+class ExplorationEventTableTests(TestCase):
+    def setUp(self):
+        caches['versions'].clear()
+
+    def test_event_changes_reach_the_table_on_commit(self):
+        event = ExplorationEvent.objects.create(
+            name='Tesoro de pruebas', description='', event_type='treasure', probability=10, gold_effect=100,
+        )
+        self.assertEqual(ExplorationEventTable.current().eligible('island', 'tropical').gold_effects.tolist(), [100])
+
+        event.gold_effect = 250
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+
+        self.assertEqual(ExplorationEventTable.current().eligible('island', 'tropical').gold_effects.tolist(), [250])
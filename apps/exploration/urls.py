@@ -8,4 +8,5 @@ urlpatterns = [
     path('select-ship/<int:ship_id>/', views.select_ship, name='select_ship'),
     path('start/', views.start_exploration, name='start_exploration'),
     path('missions/', views.exploration_missions, name='missions'),
+    path('api/viewport/', views.map_viewport_api, name='map_viewport_api'),
 ]
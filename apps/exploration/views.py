@@ -2,33 +2,50 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.utils import timezone
 from datetime import timedelta
 import random
 from .models import Region, ExplorationEvent, ExplorationMission, RegionResource
+from .services.spatial_index import RegionSpatialIndex
 from apps.players.models import Player
 from apps.ships.models import Ship
+from apps.core.instrumentation import query_budget
+
+# Tamaño por defecto de la ventana del mapa y máximo de regiones devueltas
+VIEWPORT_HALF_SIZE = 150
+MAX_VIEWPORT_REGIONS = 500
 
 
 @login_required
+@query_budget(8)
 def exploration_map(request):
     """Mapa de exploración con selección de barcos y regiones."""
     player = get_object_or_404(Player, user=request.user)
     
-    # Barcos disponibles (idle)
-    available_ships = Ship.objects.filter(owner=player, status='idle')
+    # Barcos disponibles (atracados)
+    available_ships = Ship.objects.filter(owner=player, status='docked').select_related('ship_type')
     
     # Barco seleccionado (desde sesión o None)
     selected_ship_id = request.session.get('selected_ship_id')
     selected_ship = None
     if selected_ship_id:
         try:
-            selected_ship = Ship.objects.get(id=selected_ship_id, owner=player, status='idle')
+            selected_ship = Ship.objects.select_related('ship_type', 'current_location').get(
+                id=selected_ship_id, owner=player, status='docked'
+            )
         except Ship.DoesNotExist:
             request.session.pop('selected_ship_id', None)
     
-    # Todas las regiones
-    regions = Region.objects.all().order_by('required_level', 'name')
+    # Solo las regiones visibles en la ventana del mapa
+    x_min, y_min, x_max, y_max = _viewport_from_request(request, selected_ship or available_ships.first())
+    index = RegionSpatialIndex.current()
+    visible_ids = [entry['id'] for entry in index.viewport(x_min, y_min, x_max, y_max, limit=MAX_VIEWPORT_REGIONS)]
+    regions = Region.objects.filter(id__in=visible_ids).order_by('required_level', 'name')
+    
+    # Regiones más cercanas al barco seleccionado
+    nearby_regions = []
+    if selected_ship and selected_ship.current_location:
+        location = selected_ship.current_location
+        nearby_regions = index.nearest(location.x_coordinate, location.y_coordinate, n=10, exclude=location.id)
     
     # Estadísticas de exploración
     exploration_stats = {
@@ -42,16 +59,64 @@ def exploration_map(request):
         'available_ships': available_ships,
         'selected_ship': selected_ship,
         'regions': regions,
+        'nearby_regions': nearby_regions,
+        'viewport': {'x_min': x_min, 'y_min': y_min, 'x_max': x_max, 'y_max': y_max},
         'exploration_stats': exploration_stats,
     }
     return render(request, 'exploration/map.html', context)
 
 
+@login_required
+@query_budget(4)
+def map_viewport_api(request):
+    """Regiones visibles en una ventana del mapa (JSON)."""
+    player = get_object_or_404(Player, user=request.user)
+    ship = Ship.objects.filter(owner=player, current_location__isnull=False).select_related('current_location').first()
+    x_min, y_min, x_max, y_max = _viewport_from_request(request, ship)
+    
+    index = RegionSpatialIndex.current()
+    regions = index.viewport(x_min, y_min, x_max, y_max, limit=MAX_VIEWPORT_REGIONS)
+    
+    data = {
+        'viewport': {'x_min': x_min, 'y_min': y_min, 'x_max': x_max, 'y_max': y_max},
+        'regions': regions,
+    }
+    
+    # Regiones más cercanas a un punto (?near_x=&near_y=&n=)
+    if 'near_x' in request.GET and 'near_y' in request.GET:
+        try:
+            near_x, near_y = int(request.GET['near_x']), int(request.GET['near_y'])
+            n = min(MAX_VIEWPORT_REGIONS, max(1, int(request.GET.get('n', 10))))
+        except ValueError:
+            return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+        data['nearest'] = index.nearest(near_x, near_y, n=n)
+    
+    return JsonResponse(data)
+
+
+def _viewport_from_request(request, ship=None):
+    """Ventana del mapa pedida por GET o centrada en la ubicación del barco."""
+    try:
+        return tuple(int(request.GET[key]) for key in ('x_min', 'y_min', 'x_max', 'y_max'))
+    except (KeyError, ValueError):
+        pass
+    
+    center_x, center_y = VIEWPORT_HALF_SIZE, VIEWPORT_HALF_SIZE
+    if ship and ship.current_location:
+        center_x, center_y = ship.current_location.x_coordinate, ship.current_location.y_coordinate
+    return (
+        center_x - VIEWPORT_HALF_SIZE,
+        center_y - VIEWPORT_HALF_SIZE,
+        center_x + VIEWPORT_HALF_SIZE,
+        center_y + VIEWPORT_HALF_SIZE,
+    )
+
+
 @login_required
 def select_ship(request, ship_id):
     """Seleccionar barco para exploración."""
     player = get_object_or_404(Player, user=request.user)
-    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='idle')
+    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='docked')
     
     request.session['selected_ship_id'] = ship.id
     messages.success(request, f'Barco "{ship.name}" seleccionado para exploración.')
@@ -75,17 +140,23 @@ def start_exploration(request):
         return redirect('exploration:map')
     
     region = get_object_or_404(Region, id=region_id)
-    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='idle')
+    ship = get_object_or_404(Ship, id=ship_id, owner=player, status='docked')
     
     # Verificaciones
     if player.level < region.required_level:
         messages.error(request, f'Necesitas nivel {region.required_level} para explorar esta región.')
         return redirect('exploration:map')
     
-    if ship.health < ship.ship_type.max_health * 0.3:
+    if ship.hull_health < 30:
         messages.error(request, 'El barco necesita reparación antes de explorar.')
         return redirect('exploration:map')
     
+    # Validar que existe una ruta marítima hasta la región
+    voyage = ship.plan_voyage(region)
+    if ship.current_location_id and voyage is None:
+        messages.error(request, 'No hay ninguna ruta marítima conocida hasta esta región.')
+        return redirect('exploration:map')
+    
     # Determinar duración según tipo de exploración
     duration_map = {
         'quick': 30,
@@ -94,15 +165,17 @@ def start_exploration(request):
     }
     duration_minutes = duration_map.get(exploration_type, 60)
     
+    # Sumar el tiempo de navegación hasta la región
+    if voyage:
+        duration_minutes += int(voyage.travel_time.total_seconds() // 60)
+    
     # Crear misión de exploración
     mission = ExplorationMission.objects.create(
         player=player,
         ship=ship,
-        target_region=region,
-        exploration_type=exploration_type,
-        status='active',
-        started_at=timezone.now(),
-        estimated_completion=timezone.now() + timedelta(minutes=duration_minutes)
+        region=region,
+        status='in_progress',
+        estimated_duration=timedelta(minutes=duration_minutes)
     )
     
     # Cambiar estado del barco
@@ -124,14 +197,14 @@ def exploration_missions(request):
     # Misiones activas
     active_missions = ExplorationMission.objects.filter(
         player=player, 
-        status='active'
-    ).select_related('target_region', 'ship').order_by('estimated_completion')
+        status='in_progress'
+    ).select_related('region', 'ship').order_by('started_at')
     
     # Misiones completadas recientes
     completed_missions = ExplorationMission.objects.filter(
         player=player, 
         status__in=['completed', 'failed']
-    ).select_related('target_region', 'ship').order_by('-completed_at')[:10]
+    ).select_related('region', 'ship').order_by('-completed_at')[:10]
     
     context = {
         'player': player,
@@ -2,9 +2,11 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from django.db import transaction
 from django.db.models import Q
 from .models import Guild, GuildMembership
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
 from .services.guild_service import GuildService
 
 
@@ -77,12 +79,11 @@ def create_guild(request):
             messages.error(request, 'Debes proporcionar un nombre para el gremio.')
             return redirect('guilds:create_guild')
         creation_cost = 1000
-        if player.gold < creation_cost:
-            messages.error(request, f'Necesitas {creation_cost} oro para crear un gremio.')
-            return redirect('guilds:create_guild')
-        guild = GuildService.create_guild(player, guild_name, description)
-        player.gold -= creation_cost
-        player.save()
+        with transaction.atomic():
+            if not GoldLedger.debit(player, creation_cost, 'guild_creation'):
+                messages.error(request, f'Necesitas {creation_cost} oro para crear un gremio.')
+                return redirect('guilds:create_guild')
+            GuildService.create_guild(player, guild_name, description)
         messages.success(request, f'¡Gremio "{guild_name}" creado exitosamente!')
         return redirect('guilds:dashboard')
     player = get_object_or_404(Player, user=request.user)
@@ -0,0 +1,43 @@
+"""
+Comando para ejecutar el tick del juego: liquida misiones y construcciones vencidas
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.missions.services.game_tick import GameTickService
+
+
+class Command(BaseCommand):
+    help = 'Liquidar exploraciones, misiones comerciales y construcciones cuyo tiempo ya se cumplió'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Elementos liquidados por transacción',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar ticks continuamente',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.GAME_SETTINGS.get('GAME_TICK_SECONDS', 30),
+            help='Segundos entre ticks con --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = GameTickService.run(chunk_size=options['chunk_size'])
+            self.stdout.write(
+                f"⏱️ Tick: {result['exploration']} exploraciones, "
+                f"{result['trade']} misiones comerciales, {result['buildings']} construcciones"
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,161 @@
+"""
+GameTickService: Liquidación periódica de misiones y construcciones vencidas.
+Cada tick selecciona las exploraciones, misiones comerciales y construcciones cuyo
+tiempo ya se cumplió y las liquida en transacciones por lotes con
+select_for_update(skip_locked=True), de modo que varios workers puedan vaciar la
+cola en paralelo sin pisarse.
+"""
+import logging
+
+from django.conf import settings
+from django.db.models import DateTimeField, ExpressionWrapper, F
+from django.utils import timezone
+
+from apps.buildings.models import PlayerBuilding
+from apps.buildings.services.building_service import BuildingService
+from apps.core.dirty_fields import batched_saves
+from apps.exploration.models import ExplorationMission
+from apps.players.services.gold_ledger import GoldLedger
+from apps.trade.models import TradeMission
+
+logger = logging.getLogger(__name__)
+
+
+class _SettlementFailed(Exception):
+    """Una fila del lote falló: el lote se deshace y se repite sin ella."""
+
+    def __init__(self, pk):
+        super().__init__(pk)
+        self.pk = pk
+
+
+class GameTickService:
+    @staticmethod
+    def run(now=None, chunk_size=None):
+        """Ejecuta un tick completo y devuelve cuántos elementos se liquidaron de cada tipo."""
+        now = now or timezone.now()
+        chunk_size = chunk_size or settings.GAME_SETTINGS.get('GAME_TICK_CHUNK_SIZE', 100)
+        return {
+            'exploration': GameTickService.settle_exploration_missions(now, chunk_size),
+            'trade': GameTickService.settle_trade_missions(now, chunk_size),
+            'buildings': GameTickService.settle_buildings(now, chunk_size),
+        }
+
+    @staticmethod
+    def due_exploration_missions(now):
+        return ExplorationMission.objects.annotate(
+            due_at=ExpressionWrapper(F('started_at') + F('estimated_duration'), output_field=DateTimeField())
+        ).filter(status='in_progress', due_at__lte=now)
+
+    @staticmethod
+    def due_trade_missions(now):
+        return TradeMission.objects.filter(status='traveling', estimated_arrival__lte=now)
+
+    @staticmethod
+    def due_buildings(now):
+        return PlayerBuilding.objects.filter(status='building', completion_time__lte=now)
+
+    @staticmethod
+    def settle_exploration_missions(now, chunk_size):
+        def settle(mission):
+            # process_exploration guarda el barco una sola vez, ya liberado
+            mission.completed_at = now
+            mission.ship.status = 'docked'
+            mission.process_exploration()
+            return mission.status != 'in_progress'
+
+        return GameTickService._drain(
+            GameTickService.due_exploration_missions(now).select_related('player', 'ship', 'region'),
+            settle,
+            chunk_size,
+        )
+
+    @staticmethod
+    def settle_trade_missions(now, chunk_size):
+        def settle(mission):
+            mission.process_arrival()
+            return mission.status != 'traveling'
+
+        return GameTickService._drain(
+            GameTickService.due_trade_missions(now).select_related(
+                'player', 'ship', 'trade_route', 'trade_route__destination'
+            ),
+            settle,
+            chunk_size,
+        )
+
+    @staticmethod
+    def settle_buildings(now, chunk_size):
+        def settle(building):
+            BuildingService.complete_building(building)
+            return True
+
+        return GameTickService._drain(GameTickService.due_buildings(now), settle, chunk_size)
+
+    @staticmethod
+    def _drain(queryset, settle, chunk_size):
+        """
+        Liquida la cola en lotes de `chunk_size`, cada uno en su propia transacción.
+        Las filas bloqueadas por otro worker se saltan; las que fallan se registran
+        y se excluyen del resto del tick. Los save() del lote se escriben al final
+        con bulk_update y los movimientos de oro con un único bulk_create (los de
+        una fila fallida se descartan con ella).
+        Las filas relacionadas (jugador, barco...) se comparten dentro del lote: con
+        una copia por misión, dos misiones del mismo jugador sumarían la experiencia
+        sobre el mismo valor inicial y el bulk_update se quedaría con la última.
+        Si una fila falla, sus cambios en memoria pueden haber quedado en esas
+        instancias compartidas: el lote entero se deshace y se vuelve a liquidar,
+        recargado de la base de datos, sin la fila fallida.
+        """
+        settled = 0
+        skipped = set()
+        while True:
+            chunk_settled = 0
+            chunk_skipped = set()
+            try:
+                with GoldLedger.batch(), batched_saves():
+                    batch = list(
+                        queryset.exclude(pk__in=skipped)
+                        .select_for_update(skip_locked=True, of=('self',))
+                        .order_by('pk')[:chunk_size]
+                    )
+                    if not batch:
+                        break
+                    GameTickService._share_related(batch)
+                    for obj in batch:
+                        try:
+                            with GoldLedger.batch(), batched_saves():
+                                done = settle(obj)
+                        except Exception as e:
+                            logger.exception('Error liquidando %s #%s', obj._meta.label, obj.pk)
+                            raise _SettlementFailed(obj.pk) from e
+                        if done:
+                            chunk_settled += 1
+                        else:
+                            chunk_skipped.add(obj.pk)
+            except _SettlementFailed as e:
+                skipped.add(e.pk)
+                continue
+            settled += chunk_settled
+            skipped |= chunk_skipped
+        return settled
+
+    @staticmethod
+    def _share_related(batch):
+        """Sustituye las copias de una misma fila relacionada (select_related) por una sola instancia."""
+        shared = {}
+        pending = list(batch)
+        while pending:
+            obj = pending.pop()
+            for field in obj._meta.concrete_fields:
+                if not field.is_relation or not field.is_cached(obj):
+                    continue
+                related = getattr(obj, field.name)
+                if related is None:
+                    continue
+                key = (related._meta.concrete_model, related.pk)
+                if key not in shared:
+                    shared[key] = related
+                    pending.append(related)
+                elif shared[key] is not related:
+                    setattr(obj, field.name, shared[key])
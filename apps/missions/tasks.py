@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .services.game_tick import GameTickService
+
+
+@shared_task
+def run_game_tick():
+    """Liquida las misiones y construcciones vencidas."""
+    return GameTickService.run()
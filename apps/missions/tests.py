@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.exploration.models import ExplorationMission, Region
+from apps.missions.services.game_tick import GameTickService
+from apps.players.models import Player
+from apps.ships.models import Ship, ShipType
+
+
+class GameTickExplorationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('tick', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Tick')
+        cls.ship_type = ShipType.objects.create(
+            name='Balandra', description='', base_speed=5, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+
+    def _mission(self, index):
+        region = Region.objects.create(
+            name=f'Región {index}', description='', region_type='island', climate='tropical',
+            difficulty='easy', x_coordinate=index, y_coordinate=index, base_experience_reward=200,
+        )
+        ship = Ship.objects.create(
+            owner=self.player, ship_type=self.ship_type, name=f'Barco {index}', status='exploring',
+            speed=5, cargo_capacity=100, firepower=10, defense=10, crew_capacity=10, crew_count=5,
+        )
+        return ExplorationMission.objects.create(
+            player=self.player, ship=ship, region=region, status='in_progress',
+            estimated_duration=timedelta(minutes=10),
+        )
+
+    @mock.patch('apps.exploration.models.random.randint', return_value=1)
+    def test_two_due_missions_of_the_same_player_add_up(self, _randint):
+        missions = [self._mission(1), self._mission(2)]
+        _, experience = missions[0].region.calculate_rewards(self.player.level, 5)
+
+        settled = GameTickService.settle_exploration_missions(timezone.now() + timedelta(hours=1), chunk_size=10)
+
+        self.assertEqual(settled, 2)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.experience, 2 * experience)
+        self.assertEqual(self.player.regions_discovered, 2)
+        self.assertEqual(self.player.gold, 1000 + 2 * 500)
+        self.assertEqual(
+            set(ExplorationMission.objects.values_list('status', flat=True)), {'completed'}
+        )
+
+    @mock.patch('apps.exploration.models.random.randint', return_value=1)
+    def test_failed_settlement_does_not_leak_into_the_shared_player(self, _randint):
+        missions = [self._mission(1), self._mission(2), self._mission(3)]
+        _, experience = missions[0].region.calculate_rewards(self.player.level, 5)
+        original = ExplorationMission.process_exploration
+
+        def process_exploration(mission):
+            original(mission)
+            if mission.pk == missions[1].pk:
+                raise RuntimeError('fallo simulado')
+
+        with mock.patch.object(ExplorationMission, 'process_exploration', process_exploration), \
+                self.assertLogs('apps.missions.services.game_tick', 'ERROR'):
+            settled = GameTickService.settle_exploration_missions(
+                timezone.now() + timedelta(hours=1), chunk_size=10,
+            )
+
+        self.assertEqual(settled, 2)
+        self.player.refresh_from_db()
+        self.assertEqual(self.player.experience, 2 * experience)
+        self.assertEqual(self.player.regions_discovered, 2)
+        self.assertEqual(self.player.gold, 1000 + 2 * 500)
+        self.assertEqual(
+            dict(ExplorationMission.objects.values_list('pk', 'status')),
+            {missions[0].pk: 'completed', missions[1].pk: 'in_progress', missions[2].pk: 'completed'},
+        )
+        self.assertEqual(Ship.objects.get(pk=missions[1].ship_id).status, 'exploring')
@@ -5,6 +5,7 @@ from django.http import JsonResponse
 from django.utils import timezone
 from .models import Mission, PlayerMission
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
 
 
 @login_required
@@ -153,9 +154,9 @@ def update_mission_progress(request, progress_id):
                 elif reward.reward_type == 'experience':
                     total_experience += reward.amount
             
-            player.gold += total_gold
+            GoldLedger.credit(player, total_gold, 'mission_reward', f'mission_progress:{progress.pk}')
             player.experience += total_experience
-            player.save()
+            player.save(update_fields=['experience'])
             
             messages.success(request, f'¡Misión completada! Recompensas: {total_gold} oro, {total_experience} XP')
         else:
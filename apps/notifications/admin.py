@@ -1,10 +1,27 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, NotificationArchive, NotificationCounter
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['recipient', 'title', 'notification_type', 'is_read', 'created_at']
+    list_select_related = ['recipient']
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['recipient__user__username', 'title', 'message']
     readonly_fields = ['created_at', 'read_at']
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'notification_type', 'total', 'unread']
+    list_select_related = ['recipient']
+    list_filter = ['notification_type']
+    search_fields = ['recipient__user__username']
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'month', 'count']
+    list_select_related = ['recipient']
+    search_fields = ['recipient__user__username']
+    readonly_fields = ['notifications']
@@ -0,0 +1,23 @@
+"""
+Comando para archivar las notificaciones caducadas y compactar las borradas
+"""
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.notification_retention import CHUNK_SIZE, NotificationRetention
+
+
+class Command(BaseCommand):
+    help = 'Archivar las notificaciones leídas caducadas y eliminar las borradas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Notificaciones por lote (cada lote en su propia transacción)',
+        )
+
+    def handle(self, *args, **options):
+        result = NotificationRetention.run(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"📦 {result['archived']} notificaciones archivadas"))
+        self.stdout.write(self.style.SUCCESS(f"🧹 {result['purged']} notificaciones borradas eliminadas"))
@@ -0,0 +1,22 @@
+"""
+Comando para corregir los contadores de notificaciones contra el recuento real
+"""
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.notification_counters import RECONCILE_CHUNK_SIZE, NotificationCounters
+
+
+class Command(BaseCommand):
+    help = 'Recalcular los contadores de notificaciones desviados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECONCILE_CHUNK_SIZE,
+            help='Jugadores comparados por lote',
+        )
+
+    def handle(self, *args, **options):
+        fixed = NotificationCounters.reconcile(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'🔔 {fixed} jugadores con contadores corregidos'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_hot_filter_indexes'),
+        ('players', '0002_gold_transaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(max_length=20)),
+                ('total', models.IntegerField(default=0)),
+                ('unread', models.IntegerField(default=0)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counters', to='players.player')),
+            ],
+            options={
+                'verbose_name': 'Contador de notificaciones',
+                'verbose_name_plural': 'Contadores de notificaciones',
+                'unique_together': {('recipient', 'notification_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='occurrences',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
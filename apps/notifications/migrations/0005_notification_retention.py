@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_notification_grouping'),
+        ('players', '0002_gold_transaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('notifications', models.JSONField(default=list)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Archivo de notificaciones',
+                'verbose_name_plural': 'Archivos de notificaciones',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_recipient_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['notification_type', 'created_at'], name='notif_retention_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['id'], name='notif_deleted_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationarchive',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_archives', to='players.player'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='notificationarchive',
+            unique_together={('recipient', 'month')},
+        ),
+    ]
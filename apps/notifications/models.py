@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from apps.players.models import Player
 
 
@@ -31,6 +32,10 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
     
+    # Agrupación: avisos repetidos con la misma clave se resumen en una sola notificación
+    group_key = models.CharField(max_length=100, blank=True)
+    occurrences = models.PositiveIntegerField(default=1)
+    
     # Enlaces
     action_url = models.URLField(blank=True)
     action_text = models.CharField(max_length=100, blank=True)
@@ -42,13 +47,70 @@ class Notification(models.Model):
         verbose_name = "Notificación"
         verbose_name_plural = "Notificaciones"
         ordering = ['-created_at']
+        indexes = [
+            # Con id al final: orden completo de la paginación por clave (created_at, id)
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_read_idx'),
+            # Índice parcial: solo las no leídas (contador y marcar como leídas)
+            models.Index(
+                fields=['recipient', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notif_unread_idx',
+            ),
+            # Retención: leídas caducadas por tipo y borradas pendientes de compactar
+            models.Index(
+                fields=['notification_type', 'created_at'],
+                condition=models.Q(is_read=True),
+                name='notif_retention_idx',
+            ),
+            models.Index(fields=['id'], condition=models.Q(is_deleted=True), name='notif_deleted_idx'),
+        ]
     
     def __str__(self):
         return f"{self.recipient.captain_name} - {self.title}"
     
     def mark_as_read(self):
         """Marcar notificación como leída"""
+        from apps.notifications.services.notification_counters import NotificationCounters
+        
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
+            self.save(update_fields=['is_read', 'read_at'])
+            NotificationCounters.marked_read(self.recipient_id, {self.notification_type: 1})
+
+
+class NotificationArchive(models.Model):
+    """Notificaciones antiguas de un jugador, archivadas por mes en un único registro"""
+    
+    recipient = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='notification_archives')
+    month = models.DateField()  # Primer día del mes
+    # Lista de [creada, tipo, prioridad, título, mensaje, repeticiones]
+    notifications = models.JSONField(default=list)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Archivo de notificaciones"
+        verbose_name_plural = "Archivos de notificaciones"
+        ordering = ['-month']
+        unique_together = ['recipient', 'month']
+    
+    def __str__(self):
+        return f"{self.recipient_id} - {self.month:%Y-%m} ({self.count})"
+
+
+class NotificationCounter(models.Model):
+    """Contadores de notificaciones por jugador y tipo, mantenidos de forma incremental"""
+    
+    recipient = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='notification_counters')
+    notification_type = models.CharField(max_length=20)
+    total = models.IntegerField(default=0)
+    unread = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Contador de notificaciones"
+        verbose_name_plural = "Contadores de notificaciones"
+        unique_together = ['recipient', 'notification_type']
+    
+    def __str__(self):
+        return f"{self.recipient_id} - {self.notification_type}: {self.unread}/{self.total}"
@@ -0,0 +1,159 @@
+"""
+NotificationCounters: Contadores de notificaciones totales y no leídas por jugador y tipo.
+Se guardan en NotificationCounter, una fila por (jugador, tipo), y cada alta,
+lectura o borrado (is_deleted) los ajusta con un UPDATE con F() en la misma transacción que el
+cambio de la notificación. Los contadores de un jugador se inicializan al primer
+uso con una única consulta agrupada; hasta entonces los ajustes no tocan nada.
+reconcile() recalcula periódicamente los ya inicializados y corrige la deriva que
+dejen las carreras entre peticiones o los cambios hechos fuera de este servicio.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from apps.notifications.models import Notification, NotificationCounter
+
+RECONCILE_CHUNK_SIZE = 500
+
+
+class NotificationCounters:
+    @staticmethod
+    def for_player(player_id):
+        """{tipo: (total, no leídas)} del jugador, inicializándolos si aún no existen."""
+        rows = list(
+            NotificationCounter.objects.filter(recipient_id=player_id)
+            .values_list('notification_type', 'total', 'unread')
+        )
+        if not rows:
+            return NotificationCounters._store(player_id)
+        # Una deriva negativa se corrige en reconcile(); mientras tanto no se muestra
+        return {notification_type: (max(0, total), max(0, unread)) for notification_type, total, unread in rows}
+
+    @staticmethod
+    def unread_count(player_id):
+        return sum(unread for _, unread in NotificationCounters.for_player(player_id).values())
+
+    @staticmethod
+    def stats(player_id):
+        """Totales del jugador: notificaciones, no leídas y notificaciones por tipo."""
+        counters = NotificationCounters.for_player(player_id)
+        return {
+            'total': sum(total for total, _ in counters.values()),
+            'unread': sum(unread for _, unread in counters.values()),
+            'by_type': {notification_type: total for notification_type, (total, _) in counters.items()},
+        }
+
+    @staticmethod
+    def created(notifications):
+        """Suma las notificaciones nuevas a los contadores de sus destinatarios."""
+        deltas = {}
+        for notification in notifications:
+            total, unread = deltas.get((notification.recipient_id, notification.notification_type), (0, 0))
+            deltas[notification.recipient_id, notification.notification_type] = (
+                total + 1, unread + (not notification.is_read),
+            )
+        for (player_id, notification_type), (total, unread) in deltas.items():
+            NotificationCounters._apply(player_id, notification_type, total, unread)
+
+    @staticmethod
+    def marked_read(player_id, counts_by_type):
+        """Resta de las no leídas las notificaciones marcadas como leídas ({tipo: cantidad})."""
+        for notification_type, count in counts_by_type.items():
+            NotificationCounters._apply(player_id, notification_type, 0, -count)
+
+    @staticmethod
+    def all_read(player_id):
+        """Pone a cero las no leídas del jugador tras marcarlas todas como leídas."""
+        NotificationCounter.objects.filter(recipient_id=player_id).exclude(unread=0).update(unread=0)
+
+    @staticmethod
+    def deleted(player_id, counts_by_type):
+        """Resta las notificaciones borradas ({tipo: (total, no leídas)})."""
+        for notification_type, (total, unread) in counts_by_type.items():
+            NotificationCounters._apply(player_id, notification_type, -total, -unread)
+
+    @staticmethod
+    def count_by_type(notifications):
+        """{tipo: (total, no leídas)} de un queryset de notificaciones, con una consulta agrupada."""
+        rows = (
+            notifications.order_by()
+            .values('notification_type')
+            .annotate(total=Count('pk'), unread=Count('pk', filter=Q(is_read=False)))
+            .values_list('notification_type', 'total', 'unread')
+        )
+        return {notification_type: (total, unread) for notification_type, total, unread in rows}
+
+    @staticmethod
+    def rebuild(player_id):
+        """Descarta los contadores del jugador y los vuelve a calcular."""
+        with transaction.atomic():
+            NotificationCounter.objects.filter(recipient_id=player_id).delete()
+            return NotificationCounters._store(player_id)
+
+    @staticmethod
+    def reconcile(chunk_size=RECONCILE_CHUNK_SIZE):
+        """
+        Compara los contadores inicializados con el recuento real, por lotes de
+        jugadores, y reconstruye los que se hayan desviado. Devuelve cuántos jugadores corrigió.
+        """
+        player_ids = list(
+            NotificationCounter.objects.order_by('recipient_id').values_list('recipient_id', flat=True).distinct()
+        )
+        fixed = 0
+        for start in range(0, len(player_ids), chunk_size):
+            chunk = player_ids[start:start + chunk_size]
+            actual = {player_id: {} for player_id in chunk}
+            rows = (
+                Notification.objects.filter(recipient_id__in=chunk, is_deleted=False).order_by()
+                .values('recipient_id', 'notification_type')
+                .annotate(total=Count('pk'), unread=Count('pk', filter=Q(is_read=False)))
+                .values_list('recipient_id', 'notification_type', 'total', 'unread')
+            )
+            for player_id, notification_type, total, unread in rows:
+                actual[player_id][notification_type] = (total, unread)
+
+            stored = {player_id: {} for player_id in chunk}
+            rows = NotificationCounter.objects.filter(recipient_id__in=chunk).values_list(
+                'recipient_id', 'notification_type', 'total', 'unread',
+            )
+            for player_id, notification_type, total, unread in rows:
+                if total or unread:
+                    stored[player_id][notification_type] = (total, unread)
+
+            for player_id in chunk:
+                if stored[player_id] != actual[player_id]:
+                    # Recuento fresco: el de este lote puede haberse quedado atrás de un alta concurrente
+                    NotificationCounters.rebuild(player_id)
+                    fixed += 1
+        return fixed
+
+    @staticmethod
+    def _store(player_id):
+        """Calcula los contadores del jugador con una consulta agrupada y los guarda."""
+        counts = NotificationCounters.count_by_type(Notification.objects.filter(recipient_id=player_id, is_deleted=False))
+        # Fila para cada tipo conocido aunque esté a cero: así un alta posterior siempre la encuentra
+        counts = {notification_type: (0, 0) for notification_type, _ in Notification.NOTIFICATION_TYPES} | counts
+        # Dos inicializaciones simultáneas del mismo jugador guardan la misma foto
+        NotificationCounter.objects.bulk_create(
+            [
+                NotificationCounter(recipient_id=player_id, notification_type=notification_type, total=total, unread=unread)
+                for notification_type, (total, unread) in counts.items()
+            ],
+            ignore_conflicts=True,
+        )
+        return counts
+
+    @staticmethod
+    def _apply(player_id, notification_type, total, unread):
+        updated = NotificationCounter.objects.filter(recipient_id=player_id, notification_type=notification_type).update(
+            total=F('total') + total, unread=F('unread') + unread,
+        )
+        # Sin fila: o el jugador aún no tiene contadores (se calcularán completos al
+        # primer uso) o es un tipo fuera de NOTIFICATION_TYPES, que se añade ahora
+        if not updated and NotificationCounter.objects.filter(recipient_id=player_id).exists():
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(
+                    recipient_id=player_id, notification_type=notification_type,
+                    total=max(0, total), unread=max(0, unread),
+                )],
+                ignore_conflicts=True,
+            )
@@ -0,0 +1,231 @@
+"""
+NotificationHub: Entrega push de notificaciones por Server-Sent Events.
+Los receptores post_save de Notification publican cada cambio (notificación nueva
+o nuevo contador de no leídas) en un canal pub/sub —Redis si hay
+NOTIFICATIONS_REDIS_URL, si no uno en memoria del proceso— y cada proceso ASGI
+mantiene una única suscripción a ese canal desde la que reparte los eventos a las
+colas asyncio de las conexiones abiertas de cada jugador. Una conexión inactiva
+solo cuesta su cola y su generador, sin hilos ni consultas periódicas.
+"""
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from apps.notifications.services.notification_counters import NotificationCounters
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'notifications:events'
+
+# Eventos pendientes por conexión; si un cliente lento la llena se descartan los nuevos
+QUEUE_SIZE = 100
+
+# Comentario SSE periódico para que proxies y balanceadores no cierren la conexión
+KEEPALIVE_SECONDS = 25
+
+
+class MemoryChannel:
+    """Pub/sub en memoria del proceso (desarrollo y tests)."""
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def publish(self, message):
+        with self._lock:
+            listeners = list(self._listeners)
+        for loop, callback in listeners:
+            # Los receptores post_save corren en hilos síncronos: se entrega en el bucle del oyente
+            loop.call_soon_threadsafe(callback, message)
+
+    async def listen(self, callback):
+        listener = (asyncio.get_running_loop(), callback)
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
+
+
+class RedisChannel:
+    """Canal PUBLISH / SUBSCRIBE de Redis compartido por todos los procesos."""
+
+    def __init__(self, url):
+        import redis
+
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, message):
+        self._client.publish(CHANNEL, message)
+
+    async def listen(self, callback):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(CHANNEL)
+        try:
+            async for item in pubsub.listen():
+                if item['type'] == 'message':
+                    callback(item['data'])
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class NotificationHub:
+    _channel = None
+    _channel_lock = threading.Lock()
+
+    # Estado del proceso: colas de las conexiones abiertas por jugador y tarea oyente del canal
+    _subscribers = {}
+    _listener = None
+
+    @classmethod
+    def channel(cls):
+        """Canal configurado: Redis si hay NOTIFICATIONS_REDIS_URL, si no memoria del proceso."""
+        if cls._channel is None:
+            with cls._channel_lock:
+                if cls._channel is None:
+                    url = getattr(settings, 'NOTIFICATIONS_REDIS_URL', None)
+                    cls._channel = RedisChannel(url) if url else MemoryChannel()
+        return cls._channel
+
+    @classmethod
+    def set_channel(cls, channel):
+        cls._channel = channel
+
+    # Publicación (lado síncrono: señales y vistas)
+
+    @classmethod
+    def notify_created(cls, notification):
+        """Publica una notificación nueva cuando se confirma la transacción."""
+        cls.notify_created_many([notification])
+
+    @classmethod
+    def notify_created_many(cls, notifications):
+        """
+        Publica varias notificaciones nuevas cuando se confirma la transacción,
+        leyendo el contador de no leídas una sola vez por destinatario.
+        """
+        notifications = list(notifications)
+        if not notifications:
+            return
+
+        def publish():
+            unread = {}
+            for notification in notifications:
+                recipient_id = notification.recipient_id
+                if recipient_id not in unread:
+                    unread[recipient_id] = cls.unread_count(recipient_id)
+                data = cls.serialize(notification)
+                data['unread_count'] = unread[recipient_id]
+                cls.publish(recipient_id, 'notification', data)
+
+        transaction.on_commit(publish)
+
+    @classmethod
+    def notify_unread_count(cls, player_id):
+        """Publica el contador de no leídas del jugador cuando se confirma la transacción."""
+        transaction.on_commit(
+            lambda: cls.publish(player_id, 'unread_count', {'unread_count': cls.unread_count(player_id)})
+        )
+
+    @classmethod
+    def publish(cls, player_id, event, data):
+        try:
+            cls.channel().publish(json.dumps({'player_id': player_id, 'event': event, 'data': data}))
+        except Exception:
+            # La entrega push es best-effort: un fallo del canal no debe tumbar la petición
+            logger.exception('No se pudo publicar el evento %s del jugador %s', event, player_id)
+
+    @staticmethod
+    def unread_count(player_id):
+        return NotificationCounters.unread_count(player_id)
+
+    @staticmethod
+    def serialize(notification):
+        return {
+            'id': notification.id,
+            'title': notification.title,
+            'message': notification.message,
+            'type': notification.notification_type,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at.isoformat(),
+            'priority': notification.priority,
+            'occurrences': notification.occurrences,
+        }
+
+    # Entrega (lado asíncrono: conexiones SSE)
+
+    @classmethod
+    async def stream(cls, player_id, keepalive=KEEPALIVE_SECONDS):
+        """Eventos SSE del jugador: el contador actual y luego cada cambio publicado."""
+        async with cls.subscribe(player_id) as queue:
+            # Suscrito antes de leer el contador, para no perder eventos intermedios
+            count = await sync_to_async(cls._initial_count)(player_id)
+            yield cls.format_event('unread_count', {'unread_count': count})
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield cls.format_event(event, data)
+
+    @classmethod
+    @asynccontextmanager
+    async def subscribe(cls, player_id):
+        cls._ensure_listener()
+        queue = asyncio.Queue(QUEUE_SIZE)
+        cls._subscribers.setdefault(player_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = cls._subscribers.get(player_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del cls._subscribers[player_id]
+
+    @classmethod
+    def _initial_count(cls, player_id):
+        try:
+            return cls.unread_count(player_id)
+        finally:
+            # request_finished no llega hasta que se cierra el flujo: sin esto cada
+            # conexión abierta retendría sus conexiones a la base de datos durante horas
+            connections.close_all()
+
+    @staticmethod
+    def format_event(event, data):
+        return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+    @classmethod
+    def connection_count(cls):
+        return sum(len(queues) for queues in cls._subscribers.values())
+
+    @classmethod
+    def _ensure_listener(cls):
+        # Una sola suscripción al canal por proceso; se relanza si se cayó
+        if cls._listener is None or cls._listener.done():
+            cls._listener = asyncio.get_running_loop().create_task(cls.channel().listen(cls._dispatch))
+
+    @classmethod
+    def _dispatch(cls, message):
+        payload = json.loads(message)
+        for queue in cls._subscribers.get(payload['player_id'], ()):
+            try:
+                queue.put_nowait((payload['event'], payload['data']))
+            except asyncio.QueueFull:
+                # Cada evento lleva el contador de no leídas: el siguiente que quepa lo corrige
+                pass
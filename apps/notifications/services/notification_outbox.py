@@ -0,0 +1,173 @@
+"""
+NotificationOutbox: Creación diferida y agrupada de notificaciones.
+Los receptores de señales y create_notification no insertan nada: encolan un
+PendingNotification en memoria en la bandeja de la transacción en curso, que se
+vacía una sola vez con transaction.on_commit (sin transacción, al momento). Al
+vaciarla, los avisos repetidos con la misma clave de agrupación se resumen en una
+única notificación —o se suman a la no leída equivalente creada hace menos de
+COALESCE_WINDOW— y el resto se escribe con un solo bulk_create. Si la transacción
+o el savepoint se deshacen, su bandeja se descarta con ellos.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+from apps.notifications.services.notification_counters import NotificationCounters
+from apps.notifications.services.notification_hub import NotificationHub
+
+BATCH_SIZE = 500
+
+# Antigüedad máxima de una notificación no leída para sumarle avisos repetidos
+COALESCE_WINDOW = timedelta(minutes=1)
+
+# Bandeja de la transacción en curso en este contexto
+_current = ContextVar('notification_outbox', default=None)
+
+
+@dataclass(slots=True)
+class PendingNotification:
+    """Notificación encolada, aún sin escribir."""
+
+    recipient_id: int
+    title: str
+    message: str
+    notification_type: str = 'system'
+    priority: str = 'medium'
+    action_url: str = ''
+    group_key: str = ''
+    # Mensaje para varias repeticiones; '{count}' se sustituye por el número de avisos
+    summary: str = ''
+    occurrences: int = 1
+
+    @property
+    def coalesce_key(self):
+        # Sin clave de agrupación solo se funden los avisos idénticos de la misma bandeja
+        return (self.recipient_id, self.group_key or (self.notification_type, self.title, self.message))
+
+    def summarize(self, occurrences):
+        if occurrences == 1:
+            return self.message
+        if self.summary:
+            return self.summary.replace('{count}', str(occurrences))
+        return f'{self.message} (x{occurrences})'
+
+    def build(self):
+        return Notification(
+            recipient_id=self.recipient_id,
+            title=self.title,
+            message=self.summarize(self.occurrences),
+            notification_type=self.notification_type,
+            priority=self.priority,
+            action_url=self.action_url,
+            group_key=self.group_key,
+            occurrences=self.occurrences,
+        )
+
+
+class _Outbox:
+    """Bandeja de una transacción; vive mientras su callback siga pendiente de on_commit."""
+
+    __slots__ = ('records', 'savepoint_ids')
+
+    def __init__(self, savepoint_ids):
+        self.records = []
+        self.savepoint_ids = savepoint_ids
+
+    def flush(self):
+        NotificationOutbox.flush(self.records)
+
+
+class NotificationOutbox:
+    @staticmethod
+    def enqueue(recipient, title, message, notification_type='system', priority='medium', action_url='',
+                group_key='', summary=''):
+        """Encola una notificación para escribirla al confirmarse la transacción en curso."""
+        record = PendingNotification(
+            recipient_id=getattr(recipient, 'pk', recipient),
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            priority=priority,
+            action_url=action_url or '',
+            group_key=group_key,
+            summary=summary,
+        )
+        outbox = _current.get()
+        connection = transaction.get_connection()
+        savepoint_ids = tuple(connection.savepoint_ids)
+        # Una bandeja por savepoint: si este se deshace, on_commit descarta su callback
+        # y con él los avisos encolados dentro; sin callback pendiente, la transacción
+        # de la bandeja ya terminó o se deshizo
+        if (
+            outbox is None
+            or outbox.savepoint_ids != savepoint_ids
+            or not any(func == outbox.flush for _, func, _ in connection.run_on_commit)
+        ):
+            outbox = _Outbox(savepoint_ids)
+            outbox.records.append(record)
+            _current.set(outbox)
+            # Sin transacción en curso on_commit la vacía aquí mismo
+            transaction.on_commit(outbox.flush)
+        else:
+            outbox.records.append(record)
+        return record
+
+    @staticmethod
+    def flush(records):
+        """
+        Escribe las notificaciones encoladas: agrupa las repetidas, suma a las no
+        leídas recientes con la misma clave y crea el resto con un solo bulk_create.
+        """
+        merged = {}
+        for record in records:
+            current = merged.get(record.coalesce_key)
+            if current is None:
+                merged[record.coalesce_key] = record
+            else:
+                current.occurrences += record.occurrences
+        records = list(merged.values())
+        if not records:
+            return
+
+        with transaction.atomic():
+            updated = NotificationOutbox._merge_recent(records)
+            merged_keys = {(notification.recipient_id, notification.group_key) for notification in updated}
+            created = Notification.objects.bulk_create(
+                [record.build() for record in records if record.coalesce_key not in merged_keys],
+                batch_size=BATCH_SIZE,
+            )
+            # bulk_create no emite post_save: contadores y entrega push a mano
+            NotificationCounters.created(created)
+            NotificationHub.notify_created_many(created + updated)
+
+    @staticmethod
+    def _merge_recent(records):
+        """Suma los avisos agrupables a las notificaciones no leídas recientes con su clave."""
+        grouped = {record.coalesce_key: record for record in records if record.group_key}
+        if not grouped:
+            return []
+        recent = Notification.objects.filter(
+            recipient_id__in={player_id for player_id, _ in grouped},
+            group_key__in={group_key for _, group_key in grouped},
+            is_read=False,
+            is_deleted=False,
+            created_at__gte=timezone.now() - COALESCE_WINDOW,
+        ).order_by('created_at')
+        # Si hay varias, la más reciente
+        latest = {(notification.recipient_id, notification.group_key): notification for notification in recent}
+
+        updated = []
+        for key, record in grouped.items():
+            notification = latest.get(key)
+            if notification is None:
+                continue
+            notification.occurrences += record.occurrences
+            notification.title = record.title
+            notification.message = record.summarize(notification.occurrences)
+            updated.append(notification)
+        Notification.objects.bulk_update(updated, ['occurrences', 'title', 'message'])
+        return updated
@@ -0,0 +1,122 @@
+"""
+NotificationRetention: Poda periódica de la tabla de notificaciones.
+Las notificaciones leídas que superan la retención de su tipo
+(GAME_SETTINGS['NOTIFICATION_RETENTION_DAYS']) se copian en NotificationArchive,
+un registro compacto por jugador y mes, y se borran; las marcadas como borradas
+por el jugador (is_deleted) se eliminan sin archivar. Todo se hace por lotes de
+ids, cada uno en su propia transacción corta, para no mantener bloqueos largos
+sobre la tabla mientras el juego sigue escribiendo.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.notifications.models import Notification, NotificationArchive
+from apps.notifications.services.notification_counters import NotificationCounters
+
+CHUNK_SIZE = 1000
+
+# Retención de los tipos sin entrada en NOTIFICATION_RETENTION_DAYS
+DEFAULT_RETENTION_DAYS = 30
+
+ARCHIVE_FIELDS = ('created_at', 'notification_type', 'priority', 'title', 'message', 'occurrences')
+
+
+def _month(dt):
+    return timezone.localtime(dt).date().replace(day=1)
+
+
+class NotificationRetention:
+    @staticmethod
+    def run(chunk_size=CHUNK_SIZE, now=None):
+        """Archiva las leídas caducadas y compacta las borradas."""
+        return {
+            'archived': NotificationRetention.archive_expired(chunk_size, now),
+            'purged': NotificationRetention.purge_deleted(chunk_size),
+        }
+
+    @staticmethod
+    def expired(now=None):
+        """Notificaciones leídas (y no borradas) que superan la retención de su tipo."""
+        now = now or timezone.now()
+        retention = settings.GAME_SETTINGS.get('NOTIFICATION_RETENTION_DAYS', {})
+        condition = Q(
+            ~Q(notification_type__in=list(retention)),
+            created_at__lt=now - timedelta(days=DEFAULT_RETENTION_DAYS),
+        )
+        for notification_type, days in retention.items():
+            condition |= Q(notification_type=notification_type, created_at__lt=now - timedelta(days=days))
+        return Notification.objects.filter(condition, is_read=True, is_deleted=False)
+
+    @staticmethod
+    def archive_expired(chunk_size=CHUNK_SIZE, now=None):
+        """Mueve las caducadas a los archivos mensuales, un lote por transacción. Devuelve cuántas movió."""
+        expired = NotificationRetention.expired(now)
+        archived = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    expired.order_by('id').values_list('id', 'recipient_id', *ARCHIVE_FIELDS)[:chunk_size]
+                )
+                if not rows:
+                    break
+                NotificationRetention._archive(rows)
+                Notification.objects.filter(pk__in=[row[0] for row in rows]).delete()
+
+                deleted = {}
+                for _, recipient_id, _, notification_type, *_ in rows:
+                    counts = deleted.setdefault(recipient_id, {})
+                    total, _ = counts.get(notification_type, (0, 0))
+                    counts[notification_type] = (total + 1, 0)
+                for recipient_id, counts in deleted.items():
+                    NotificationCounters.deleted(recipient_id, counts)
+            archived += len(rows)
+        return archived
+
+    @staticmethod
+    def purge_deleted(chunk_size=CHUNK_SIZE):
+        """Elimina las borradas por los jugadores (ya descontadas de los contadores), por lotes."""
+        purged = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    Notification.objects.filter(is_deleted=True).order_by('id').values_list('id', flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+                Notification.objects.filter(pk__in=ids).delete()
+            purged += len(ids)
+        return purged
+
+    @staticmethod
+    def _archive(rows):
+        """Añade las filas a los archivos (jugador, mes), creando los que falten."""
+        entries = {}
+        for _, recipient_id, created_at, notification_type, priority, title, message, occurrences in rows:
+            entries.setdefault((recipient_id, _month(created_at)), []).append(
+                [created_at.isoformat(), notification_type, priority, title, message, occurrences]
+            )
+
+        existing = {
+            (archive.recipient_id, archive.month): archive
+            for archive in NotificationArchive.objects.select_for_update().filter(
+                recipient_id__in={recipient_id for recipient_id, _ in entries},
+                month__in={month for _, month in entries},
+            )
+        }
+        updated, created = [], []
+        for key, items in entries.items():
+            archive = existing.get(key)
+            if archive is None:
+                created.append(NotificationArchive(
+                    recipient_id=key[0], month=key[1], notifications=items, count=len(items),
+                ))
+            else:
+                archive.notifications.extend(items)
+                archive.count += len(items)
+                updated.append(archive)
+        NotificationArchive.objects.bulk_create(created)
+        NotificationArchive.objects.bulk_update(updated, ['notifications', 'count'])
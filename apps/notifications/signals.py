@@ -4,44 +4,66 @@ from apps.combat.models import Battle
 from apps.trade.models import TradeMission
 from apps.guilds.models import GuildMembership
 from .models import Notification
+from .services.notification_counters import NotificationCounters
+from .services.notification_hub import NotificationHub
+from .services.notification_outbox import NotificationOutbox
 
 @receiver(post_save, sender=Battle)
 def notify_battle(sender, instance, created, **kwargs):
     if created:
-        Notification.objects.create(
-            recipient=instance.attacker,
+        NotificationOutbox.enqueue(
+            recipient=instance.attacker_id,
             title="¡Nueva batalla iniciada!",
             message=f"Has iniciado una batalla contra {instance.npc_name or instance.defender.captain_name}.",
             notification_type="battle",
             priority="high"
         )
-        if instance.defender:
-            Notification.objects.create(
-                recipient=instance.defender,
+        if instance.defender_id:
+            attacker_name = instance.attacker.captain_name
+            NotificationOutbox.enqueue(
+                recipient=instance.defender_id,
                 title="¡Has sido atacado!",
-                message=f"{instance.attacker.captain_name} ha iniciado una batalla contra ti.",
+                message=f"{attacker_name} ha iniciado una batalla contra ti.",
                 notification_type="battle",
-                priority="high"
+                priority="high",
+                group_key=f"attacked_by:{instance.attacker_id}",
+                summary=f"{attacker_name} ha iniciado {{count}} batallas contra ti."
             )
 
 @receiver(post_save, sender=TradeMission)
 def notify_trade(sender, instance, created, **kwargs):
     if created:
-        Notification.objects.create(
-            recipient=instance.player,
+        NotificationOutbox.enqueue(
+            recipient=instance.player_id,
             title="Misión comercial iniciada",
             message=f"Has iniciado una misión comercial en la ruta {instance.trade_route}.",
             notification_type="trade",
-            priority="medium"
+            priority="medium",
+            group_key="trade_started",
+            summary="Has iniciado {count} misiones comerciales."
         )
 
 @receiver(post_save, sender=GuildMembership)
 def notify_guild(sender, instance, created, **kwargs):
     if created:
-        Notification.objects.create(
-            recipient=instance.player,
+        NotificationOutbox.enqueue(
+            recipient=instance.player_id,
             title="Unión a gremio",
             message=f"Te has unido al gremio {instance.guild.name} como {instance.get_rank_display()}.",
             notification_type="guild",
             priority="medium"
         )
+
+@receiver(post_save, sender=Notification)
+def count_notification(sender, instance, created, **kwargs):
+    """Suma las altas a los contadores; lecturas y borrados los ajusta NotificationCounters."""
+    if created:
+        NotificationCounters.created([instance])
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, update_fields=None, **kwargs):
+    """Alimenta la entrega push (NotificationHub) con las altas y los cambios de lectura."""
+    if created:
+        NotificationHub.notify_created(instance)
+    elif update_fields is None or 'is_read' in update_fields:
+        NotificationHub.notify_unread_count(instance.recipient_id)
@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from .services.notification_counters import NotificationCounters
+from .services.notification_retention import NotificationRetention
+
+
+@shared_task
+def reconcile_notification_counters():
+    """Corrige la deriva de los contadores de notificaciones no leídas."""
+    return NotificationCounters.reconcile()
+
+
+@shared_task
+def apply_notification_retention():
+    """Archiva las notificaciones leídas caducadas y compacta las borradas."""
+    return NotificationRetention.run()
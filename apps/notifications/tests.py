@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from apps.notifications.models import Notification, NotificationCounter
+from apps.notifications.services.notification_hub import NotificationHub
+from apps.notifications.services.notification_outbox import NotificationOutbox
+from apps.players.models import Player
+
+
+class UnreadCountViewTests(TransactionTestCase):
+    # Fuera de una transacción de test, como en producción: la inicialización de
+    # los contadores abre su propia transacción (BEGIN explícito en SQLite)
+
+    def setUp(self):
+        user = User.objects.create_user('notified', password='x')
+        self.player = Player.objects.create(user=user, captain_name='Avisada')
+        Notification.objects.bulk_create([
+            Notification(recipient=self.player, title='Aviso', message='', notification_type='system'),
+            Notification(recipient=self.player, title='Aviso', message='', notification_type='battle'),
+            Notification(recipient=self.player, title='Leída', message='', notification_type='trade', is_read=True),
+        ])
+        self.client.force_login(user)
+
+    def test_first_call_initializes_the_counters_within_budget(self):
+        self.assertFalse(NotificationCounter.objects.filter(recipient=self.player).exists())
+
+        response = self.client.get('/notifications/api/unread-count/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'unread_count': 2})
+        self.assertTrue(NotificationCounter.objects.filter(recipient=self.player).exists())
+
+        response = self.client.get('/notifications/api/unread-count/')
+        self.assertEqual(response.json(), {'unread_count': 2})
+
+
+class NotificationOutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.players = [
+            Player.objects.create(user=User.objects.create_user(f'outbox{i}', password='x'), captain_name=f'Bandeja {i}')
+            for i in range(2)
+        ]
+
+    def test_flush_reads_the_unread_count_once_per_recipient(self):
+        with mock.patch.object(NotificationHub, 'publish') as publish, \
+                mock.patch.object(NotificationHub, 'unread_count', wraps=NotificationHub.unread_count) as unread_count:
+            with self.captureOnCommitCallbacks(execute=True):
+                for player in self.players:
+                    for title in ('Uno', 'Dos', 'Tres'):
+                        NotificationOutbox.enqueue(player, title, '')
+
+        self.assertEqual(Notification.objects.count(), 6)
+        self.assertEqual(unread_count.call_count, 2)
+        self.assertEqual(publish.call_count, 6)
+        self.assertEqual({call.args[2]['unread_count'] for call in publish.call_args_list}, {3})
+
+    def test_rolled_back_savepoint_discards_its_notifications(self):
+        player = self.players[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                NotificationOutbox.enqueue(player, 'Fuera', '')
+                try:
+                    with transaction.atomic():
+                        NotificationOutbox.enqueue(player, 'Dentro', '')
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                NotificationOutbox.enqueue(player, 'Después', '')
+
+        self.assertEqual(
+            set(Notification.objects.values_list('title', flat=True)), {'Fuera', 'Después'},
+        )
+
+    def test_rolled_back_transaction_creates_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    NotificationOutbox.enqueue(self.players[0], 'Perdida', '')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertFalse(Notification.objects.exists())
@@ -13,4 +13,5 @@ urlpatterns = [
     path('settings/', views.notification_settings, name='notification_settings'),
     path('api/unread-count/', views.get_unread_count, name='get_unread_count'),
     path('api/recent/', views.get_recent_notifications, name='get_recent_notifications'),
+    path('api/stream/', views.notification_stream, name='notification_stream'),
 ]
@@ -1,11 +1,19 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from .models import Notification
+from .services.notification_counters import NotificationCounters
+from .services.notification_hub import NotificationHub
+from .services.notification_outbox import NotificationOutbox
 from apps.players.models import Player
+from apps.core.instrumentation import query_budget
+from apps.core.keyset import KeysetPaginator
+
+NOTIFICATIONS_PER_PAGE = 50
 
 
 @login_required
@@ -15,24 +23,35 @@ def notifications_list(request):
     
     # Obtener notificaciones del jugador
     notifications = Notification.objects.filter(
-        recipient=player
-    ).order_by('-created_at')
-    
-    # Marcar como leídas al ver la lista
-    unread_notifications = notifications.filter(is_read=False)
-    unread_notifications.update(is_read=True, read_at=timezone.now())
+        recipient=player,
+        is_deleted=False
+    )
     
     # Filtrar por tipo si se especifica
     notification_type = request.GET.get('type')
     if notification_type:
         notifications = notifications.filter(notification_type=notification_type)
     
-    # Paginación simple
-    notifications = notifications[:50]  # Limitar a 50 notificaciones
+    # Paginación por clave (created_at, id): sin OFFSET, cada página cuesta lo mismo
+    page = KeysetPaginator(notifications, NOTIFICATIONS_PER_PAGE).page(request.GET.get('cursor'))
+    
+    # Marcar como leídas las notificaciones mostradas
+    unread = [notification for notification in page if not notification.is_read]
+    if unread:
+        read_by_type = {}
+        for notification in unread:
+            read_by_type[notification.notification_type] = read_by_type.get(notification.notification_type, 0) + 1
+        with transaction.atomic():
+            Notification.objects.filter(pk__in=[notification.pk for notification in unread], is_read=False).update(
+                is_read=True, read_at=timezone.now()
+            )
+            NotificationCounters.marked_read(player.pk, read_by_type)
+        NotificationHub.notify_unread_count(player.pk)
     
     context = {
         'player': player,
-        'notifications': notifications,
+        'notifications': page,
+        'next_cursor': page.next_cursor,
         'current_type': notification_type,
         'notification_types': [
             ('system', 'Sistema'),
@@ -51,13 +70,10 @@ def notifications_list(request):
 def notification_detail(request, notification_id):
     """Ver detalles de una notificación."""
     player = get_object_or_404(Player, user=request.user)
-    notification = get_object_or_404(Notification, id=notification_id, recipient=player)
+    notification = get_object_or_404(Notification, id=notification_id, recipient=player, is_deleted=False)
     
     # Marcar como leída
-    if not notification.is_read:
-        notification.is_read = True
-        notification.read_at = timezone.now()
-        notification.save()
+    notification.mark_as_read()
     
     context = {
         'player': player,
@@ -71,19 +87,16 @@ def mark_as_read(request, notification_id):
     """Marcar notificación como leída."""
     if request.method == 'POST':
         player = get_object_or_404(Player, user=request.user)
-        notification = get_object_or_404(Notification, id=notification_id, recipient=player)
+        notification = get_object_or_404(Notification, id=notification_id, recipient=player, is_deleted=False)
         
-        if not notification.is_read:
-            notification.is_read = True
-            notification.read_at = timezone.now()
-            notification.save()
+        notification.mark_as_read()
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'status': 'success'})
         
-        return redirect('notifications:list')
+        return redirect('notifications:notifications_list')
     
-    return redirect('notifications:list')
+    return redirect('notifications:notifications_list')
 
 
 @login_required
@@ -94,16 +107,20 @@ def mark_all_as_read(request):
         
         unread_notifications = Notification.objects.filter(
             recipient=player,
-            is_read=False
+            is_read=False,
+            is_deleted=False
         )
         
-        count = unread_notifications.count()
-        unread_notifications.update(is_read=True, read_at=timezone.now())
+        with transaction.atomic():
+            count = unread_notifications.update(is_read=True, read_at=timezone.now())
+            if count:
+                NotificationCounters.all_read(player.pk)
+                NotificationHub.notify_unread_count(player.pk)
         
         messages.success(request, f'{count} notificaciones marcadas como leídas.')
-        return redirect('notifications:list')
+        return redirect('notifications:notifications_list')
     
-    return redirect('notifications:list')
+    return redirect('notifications:notifications_list')
 
 
 @login_required
@@ -111,17 +128,23 @@ def delete_notification(request, notification_id):
     """Eliminar una notificación."""
     if request.method == 'POST':
         player = get_object_or_404(Player, user=request.user)
-        notification = get_object_or_404(Notification, id=notification_id, recipient=player)
+        notification = get_object_or_404(Notification, id=notification_id, recipient=player, is_deleted=False)
         
-        notification.delete()
+        # Borrado lógico: NotificationRetention elimina las filas por lotes
+        with transaction.atomic():
+            notification.is_deleted = True
+            notification.save(update_fields=['is_deleted'])
+            NotificationCounters.deleted(player.pk, {notification.notification_type: (1, int(not notification.is_read))})
+        if not notification.is_read:
+            NotificationHub.notify_unread_count(player.pk)
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'status': 'success'})
         
         messages.success(request, 'Notificación eliminada.')
-        return redirect('notifications:list')
+        return redirect('notifications:notifications_list')
     
-    return redirect('notifications:list')
+    return redirect('notifications:notifications_list')
 
 
 @login_required
@@ -132,16 +155,20 @@ def delete_all_read(request):
         
         read_notifications = Notification.objects.filter(
             recipient=player,
-            is_read=True
+            is_read=True,
+            is_deleted=False
         )
         
-        count = read_notifications.count()
-        read_notifications.delete()
+        with transaction.atomic():
+            counts = NotificationCounters.count_by_type(read_notifications)
+            read_notifications.update(is_deleted=True)
+            NotificationCounters.deleted(player.pk, counts)
+        count = sum(total for total, _ in counts.values())
         
         messages.success(request, f'{count} notificaciones eliminadas.')
-        return redirect('notifications:list')
+        return redirect('notifications:notifications_list')
     
-    return redirect('notifications:list')
+    return redirect('notifications:notifications_list')
 
 
 @login_required
@@ -153,87 +180,86 @@ def notification_settings(request):
         # Aquí podrías manejar las preferencias de notificaciones
         # Por ahora, solo mostramos un mensaje de éxito
         messages.success(request, 'Configuración de notificaciones actualizada.')
-        return redirect('notifications:settings')
+        return redirect('notifications:notification_settings')
     
-    # Obtener estadísticas de notificaciones
-    total_notifications = Notification.objects.filter(recipient=player).count()
-    unread_notifications = Notification.objects.filter(recipient=player, is_read=False).count()
-    
-    # Notificaciones por tipo
-    notification_stats = {}
-    for type_code, type_name in [
-        ('system', 'Sistema'),
-        ('trade', 'Comercio'),
-        ('combat', 'Combate'),
-        ('exploration', 'Exploración'),
-        ('guild', 'Gremio'),
-        ('mission', 'Misiones'),
-        ('achievement', 'Logros'),
-    ]:
-        count = Notification.objects.filter(
-            recipient=player,
-            notification_type=type_code
-        ).count()
-        notification_stats[type_name] = count
+    # Estadísticas de notificaciones desde los contadores (por tipos del modelo)
+    stats = NotificationCounters.stats(player.pk)
+    notification_stats = {
+        type_name: stats['by_type'].get(type_code, 0)
+        for type_code, type_name in Notification.NOTIFICATION_TYPES
+    }
     
     context = {
         'player': player,
-        'total_notifications': total_notifications,
-        'unread_notifications': unread_notifications,
+        'total_notifications': stats['total'],
+        'unread_notifications': stats['unread'],
         'notification_stats': notification_stats,
     }
     return render(request, 'notifications/settings.html', context)
 
 
 @login_required
+@query_budget(5)  # Con los contadores en frío: lectura, consulta agrupada e inserción (con BEGIN explícito en SQLite)
 def get_unread_count(request):
     """Obtener número de notificaciones no leídas (AJAX)."""
     player = get_object_or_404(Player, user=request.user)
     
-    unread_count = Notification.objects.filter(
-        recipient=player,
-        is_read=False
-    ).count()
+    unread_count = NotificationCounters.unread_count(player.pk)
     
     return JsonResponse({'unread_count': unread_count})
 
 
 @login_required
+@query_budget(3)
 def get_recent_notifications(request):
     """Obtener notificaciones recientes (AJAX)."""
     player = get_object_or_404(Player, user=request.user)
     
     recent_notifications = Notification.objects.filter(
-        recipient=player
-    ).order_by('-created_at')[:10]
+        recipient=player,
+        is_deleted=False
+    ).order_by('-created_at', '-id')[:10]
     
-    notifications_data = []
-    for notification in recent_notifications:
-        notifications_data.append({
-            'id': notification.id,
-            'title': notification.title,
-            'message': notification.message,
-            'type': notification.notification_type,
-            'is_read': notification.is_read,
-            'created_at': notification.created_at.isoformat(),
-            'priority': notification.priority,
-        })
+    notifications_data = [NotificationHub.serialize(notification) for notification in recent_notifications]
     
     return JsonResponse({'notifications': notifications_data})
 
 
-def create_notification(recipient, title, message, notification_type='system', priority='normal', action_url=None):
+@login_required
+async def notification_stream(request):
+    """
+    Flujo Server-Sent Events con las notificaciones nuevas y los cambios del
+    contador de no leídas; sustituye al sondeo de get_unread_count y
+    get_recent_notifications. Servir con el ASGI (config.asgi).
+    """
+    user = await request.auser()
+    player_id = await Player.objects.filter(user=user).values_list('pk', flat=True).afirst()
+    if player_id is None:
+        raise Http404
+    
+    response = StreamingHttpResponse(NotificationHub.stream(player_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def create_notification(recipient, title, message, notification_type='system', priority='medium', action_url=None,
+                        group_key='', summary=''):
     """
     Función utilitaria para crear notificaciones.
-    Esta función puede ser importada desde otras apps.
+    Esta función puede ser importada desde otras apps. La notificación se encola en
+    NotificationOutbox y se escribe al confirmarse la transacción en curso; con
+    `group_key`, los avisos repetidos se resumen con `summary` ('{count}' = repeticiones).
     """
-    return Notification.objects.create(
+    return NotificationOutbox.enqueue(
         recipient=recipient,
         title=title,
         message=message,
         notification_type=notification_type,
         priority=priority,
-        action_url=action_url
+        action_url=action_url,
+        group_key=group_key,
+        summary=summary
     )
 
 
@@ -261,7 +287,7 @@ def create_notification_from_template(recipient, template_name, context_data=Non
             title=title,
             message=message,
             notification_type='system',  # Default value
-            priority='normal'  # Default value
+            priority='medium'  # Default value
         )
     
     except Exception:  # Generic exception until NotificationTemplate model is created
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Player, PlayerAchievement, PlayerSettings
+from .models import Player, PlayerAchievement, PlayerSettings, GoldTransaction
 
 
 @admin.register(Player)
@@ -37,3 +37,21 @@ class PlayerAchievementAdmin(admin.ModelAdmin):
 class PlayerSettingsAdmin(admin.ModelAdmin):
     list_display = ['player', 'notifications_enabled', 'auto_repair_ships', 'preferred_language']
     list_filter = ['notifications_enabled', 'auto_repair_ships', 'preferred_language']
+
+
+@admin.register(GoldTransaction)
+class GoldTransactionAdmin(admin.ModelAdmin):
+    list_display = ['player', 'amount', 'reason', 'counterparty', 'reference', 'created_at']
+    list_filter = ['reason', 'created_at']
+    search_fields = ['player__captain_name', 'reference']
+    list_select_related = ['player', 'counterparty']
+    readonly_fields = [field.name for field in GoldTransaction._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class PlayersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.players'
     verbose_name = 'Jugadores - Age of Voyage'
+
+    def ready(self):
+        import apps.players.signals
@@ -1,8 +1,9 @@
 """
 Comando personalizado para poblar la base de datos con datos iniciales del juego
 """
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
+from apps.core.world_generator import WorldGenerator
 from apps.players.models import Player
 from apps.ships.models import ShipType
 from apps.exploration.models import Region, ExplorationEvent
@@ -20,6 +21,15 @@ class Command(BaseCommand):
             action='store_true',
             help='No solicitar confirmación antes de poblar',
         )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            metavar='REGIONES',
+            help='Generar además un mundo sintético con este número de regiones (con rutas, mercados, jugadores e historial)',
+        )
+        parser.add_argument('--players', type=int, help='Jugadores sintéticos (por defecto, uno cada 20 regiones)')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla del mundo sintético')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Filas por bulk_create')
 
     def handle(self, *args, **options):
         if not options['no_input']:
@@ -30,11 +40,60 @@ class Command(BaseCommand):
         
         self.stdout.write('🚢 Iniciando población de Age of Voyage...')
         
+        if options['scale']:
+            self.populate_at_scale(options)
+            return
+        
         # Verificar si ya hay datos
         if Player.objects.exists():
             self.stdout.write('⚠️ Ya existen datos en la base de datos. Saltando población...')
             return
         
+        self.create_catalog()
+        
+        # Crear jugador administrador
+        self.create_admin_player()
+        
+        self.stdout.write(
+            self.style.SUCCESS('🎉 ¡Age of Voyage poblado exitosamente!')
+        )
+
+    def populate_at_scale(self, options):
+        """Catálogo base (idempotente) más un mundo sintético generado por lotes"""
+        if options['scale'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--scale y --batch-size deben ser positivos')
+        if WorldGenerator.exists():
+            raise CommandError('Ya existe un mundo sintético en la base de datos.')
+        
+        self.create_catalog()
+        generator = WorldGenerator(
+            options['scale'],
+            players=options['players'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            progress=self.report_progress,
+        )
+        self.stdout.write(
+            f'🌍 Generando {generator.region_count} regiones y {generator.player_count} jugadores '
+            f'(semilla {options["seed"]})...'
+        )
+        self._reported = {}
+        counts = generator.run()
+        
+        for model, count in counts.items():
+            self.stdout.write(f'   {model}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(f'🎉 ¡Mundo sintético generado: {sum(counts.values())} filas!')
+        )
+
+    def report_progress(self, step, done, total):
+        # Una línea por cada 10% de avance de cada paso
+        decile = done * 10 // total if total else 10
+        if self._reported.get(step) != decile:
+            self._reported[step] = decile
+            self.stdout.write(f'   {step}: {done}/{total} ({decile * 10}%)')
+
+    def create_catalog(self):
         # Crear tipos de barcos
         self.create_ship_types()
         
@@ -52,13 +111,6 @@ class Command(BaseCommand):
         
         # Crear misiones
         self.create_missions()
-        
-        # Crear jugador administrador
-        self.create_admin_player()
-        
-        self.stdout.write(
-            self.style.SUCCESS('🎉 ¡Age of Voyage poblado exitosamente!')
-        )
 
     def create_ship_types(self):
         ship_types = [
@@ -147,66 +199,66 @@ class Command(BaseCommand):
     def create_regions(self):
         regions = [
             # Caribe (30 regiones)
-            {'name': 'Puerto Real, Jamaica', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x': 100, 'y': 200, 'required_level': 1},
-            {'name': 'Tortuga', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x': 120, 'y': 180, 'required_level': 3},
-            {'name': 'La Habana, Cuba', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x': 80, 'y': 160, 'required_level': 1},
-            {'name': 'Cartagena', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x': 70, 'y': 220, 'required_level': 5},
-            {'name': 'Nassau, Bahamas', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x': 110, 'y': 140, 'required_level': 2},
-            {'name': 'Barbados', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x': 160, 'y': 200, 'required_level': 4},
-            {'name': 'Martinica', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x': 150, 'y': 190, 'required_level': 6},
-            {'name': 'Puerto Príncipe', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x': 130, 'y': 170, 'required_level': 8},
-            {'name': 'Vera Cruz', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x': 40, 'y': 180, 'required_level': 7},
-            {'name': 'Isla del Coco', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'hard', 'x': 20, 'y': 240, 'required_level': 10},
+            {'name': 'Puerto Real, Jamaica', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x_coordinate': 100, 'y_coordinate': 200, 'required_level': 1},
+            {'name': 'Tortuga', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 120, 'y_coordinate': 180, 'required_level': 3},
+            {'name': 'La Habana, Cuba', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x_coordinate': 80, 'y_coordinate': 160, 'required_level': 1},
+            {'name': 'Cartagena', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 70, 'y_coordinate': 220, 'required_level': 5},
+            {'name': 'Nassau, Bahamas', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'easy', 'x_coordinate': 110, 'y_coordinate': 140, 'required_level': 2},
+            {'name': 'Barbados', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 160, 'y_coordinate': 200, 'required_level': 4},
+            {'name': 'Martinica', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 150, 'y_coordinate': 190, 'required_level': 6},
+            {'name': 'Puerto Príncipe', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x_coordinate': 130, 'y_coordinate': 170, 'required_level': 8},
+            {'name': 'Vera Cruz', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 40, 'y_coordinate': 180, 'required_level': 7},
+            {'name': 'Isla del Coco', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'hard', 'x_coordinate': 20, 'y_coordinate': 240, 'required_level': 10},
             
             # Atlántico (25 regiones)
-            {'name': 'Lisboa', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x': 300, 'y': 100, 'required_level': 1},
-            {'name': 'Sevilla', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x': 280, 'y': 120, 'required_level': 2},
-            {'name': 'Cádiz', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x': 270, 'y': 130, 'required_level': 1},
-            {'name': 'Plymouth', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 320, 'y': 60, 'required_level': 5},
-            {'name': 'Amsterdam', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 340, 'y': 70, 'required_level': 6},
-            {'name': 'Azores', 'region_type': 'archipelago', 'climate': 'temperate', 'difficulty': 'medium', 'x': 260, 'y': 110, 'required_level': 4},
-            {'name': 'Canarias', 'region_type': 'archipelago', 'climate': 'temperate', 'difficulty': 'easy', 'x': 250, 'y': 140, 'required_level': 3},
-            {'name': 'Cabo Verde', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'medium', 'x': 240, 'y': 180, 'required_level': 7},
-            {'name': 'Costa de Oro', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x': 290, 'y': 200, 'required_level': 12},
-            {'name': 'Estrecho de Gibraltar', 'region_type': 'strait', 'climate': 'temperate', 'difficulty': 'medium', 'x': 275, 'y': 125, 'required_level': 8},
+            {'name': 'Lisboa', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x_coordinate': 300, 'y_coordinate': 100, 'required_level': 1},
+            {'name': 'Sevilla', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x_coordinate': 280, 'y_coordinate': 120, 'required_level': 2},
+            {'name': 'Cádiz', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x_coordinate': 270, 'y_coordinate': 130, 'required_level': 1},
+            {'name': 'Plymouth', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 320, 'y_coordinate': 60, 'required_level': 5},
+            {'name': 'Amsterdam', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 340, 'y_coordinate': 70, 'required_level': 6},
+            {'name': 'Azores', 'region_type': 'archipelago', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 260, 'y_coordinate': 110, 'required_level': 4},
+            {'name': 'Canarias', 'region_type': 'archipelago', 'climate': 'temperate', 'difficulty': 'easy', 'x_coordinate': 250, 'y_coordinate': 140, 'required_level': 3},
+            {'name': 'Cabo Verde', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 240, 'y_coordinate': 180, 'required_level': 7},
+            {'name': 'Costa de Oro', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x_coordinate': 290, 'y_coordinate': 200, 'required_level': 12},
+            {'name': 'Estrecho de Gibraltar', 'region_type': 'strait', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 275, 'y_coordinate': 125, 'required_level': 8},
             
             # Mediterráneo (20 regiones)
-            {'name': 'Barcelona', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x': 380, 'y': 120, 'required_level': 3},
-            {'name': 'Génova', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 390, 'y': 110, 'required_level': 5},
-            {'name': 'Venecia', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 410, 'y': 105, 'required_level': 6},
-            {'name': 'Nápoles', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 400, 'y': 130, 'required_level': 7},
-            {'name': 'Palermo', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 395, 'y': 140, 'required_level': 6},
-            {'name': 'Malta', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'hard', 'x': 405, 'y': 145, 'required_level': 10},
-            {'name': 'Creta', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'hard', 'x': 450, 'y': 140, 'required_level': 12},
-            {'name': 'Chipre', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'medium', 'x': 460, 'y': 135, 'required_level': 8},
-            {'name': 'Constantinopla', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'hard', 'x': 470, 'y': 120, 'required_level': 15},
-            {'name': 'Alejandría', 'region_type': 'port', 'climate': 'desert', 'difficulty': 'hard', 'x': 480, 'y': 150, 'required_level': 13},
+            {'name': 'Barcelona', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'easy', 'x_coordinate': 380, 'y_coordinate': 120, 'required_level': 3},
+            {'name': 'Génova', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 390, 'y_coordinate': 110, 'required_level': 5},
+            {'name': 'Venecia', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 410, 'y_coordinate': 105, 'required_level': 6},
+            {'name': 'Nápoles', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 400, 'y_coordinate': 130, 'required_level': 7},
+            {'name': 'Palermo', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 395, 'y_coordinate': 140, 'required_level': 6},
+            {'name': 'Malta', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'hard', 'x_coordinate': 405, 'y_coordinate': 145, 'required_level': 10},
+            {'name': 'Creta', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'hard', 'x_coordinate': 450, 'y_coordinate': 140, 'required_level': 12},
+            {'name': 'Chipre', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 460, 'y_coordinate': 135, 'required_level': 8},
+            {'name': 'Constantinopla', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'hard', 'x_coordinate': 470, 'y_coordinate': 120, 'required_level': 15},
+            {'name': 'Alejandría', 'region_type': 'port', 'climate': 'desert', 'difficulty': 'hard', 'x_coordinate': 480, 'y_coordinate': 150, 'required_level': 13},
             
             # Pacífico (25 regiones) 
-            {'name': 'Acapulco', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x': 50, 'y': 170, 'required_level': 8},
-            {'name': 'Callao, Perú', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x': 60, 'y': 280, 'required_level': 10},
-            {'name': 'Valparaíso', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'hard', 'x': 70, 'y': 320, 'required_level': 12},
-            {'name': 'Islas Galápagos', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'hard', 'x': 30, 'y': 260, 'required_level': 15},
-            {'name': 'Tahití', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'extreme', 'x': 150, 'y': 300, 'required_level': 20},
-            {'name': 'Isla de Pascua', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'extreme', 'x': 100, 'y': 330, 'required_level': 22},
-            {'name': 'Hawái', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'extreme', 'x': 200, 'y': 160, 'required_level': 18},
-            {'name': 'Islas Filipinas', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'extreme', 'x': 500, 'y': 200, 'required_level': 25},
-            {'name': 'Macao', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x': 520, 'y': 180, 'required_level': 20},
-            {'name': 'Nagasaki', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'extreme', 'x': 550, 'y': 140, 'required_level': 30},
+            {'name': 'Acapulco', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'medium', 'x_coordinate': 50, 'y_coordinate': 170, 'required_level': 8},
+            {'name': 'Callao, Perú', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'medium', 'x_coordinate': 60, 'y_coordinate': 280, 'required_level': 10},
+            {'name': 'Valparaíso', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'hard', 'x_coordinate': 70, 'y_coordinate': 320, 'required_level': 12},
+            {'name': 'Islas Galápagos', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'hard', 'x_coordinate': 30, 'y_coordinate': 260, 'required_level': 15},
+            {'name': 'Tahití', 'region_type': 'island', 'climate': 'tropical', 'difficulty': 'extreme', 'x_coordinate': 150, 'y_coordinate': 300, 'required_level': 20},
+            {'name': 'Isla de Pascua', 'region_type': 'island', 'climate': 'temperate', 'difficulty': 'extreme', 'x_coordinate': 100, 'y_coordinate': 330, 'required_level': 22},
+            {'name': 'Hawái', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'extreme', 'x_coordinate': 200, 'y_coordinate': 160, 'required_level': 18},
+            {'name': 'Islas Filipinas', 'region_type': 'archipelago', 'climate': 'tropical', 'difficulty': 'extreme', 'x_coordinate': 500, 'y_coordinate': 200, 'required_level': 25},
+            {'name': 'Macao', 'region_type': 'port', 'climate': 'tropical', 'difficulty': 'hard', 'x_coordinate': 520, 'y_coordinate': 180, 'required_level': 20},
+            {'name': 'Nagasaki', 'region_type': 'port', 'climate': 'temperate', 'difficulty': 'extreme', 'x_coordinate': 550, 'y_coordinate': 140, 'required_level': 30},
             
             # Ártico (15 regiones)
-            {'name': 'Groenlandia', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'extreme', 'x': 200, 'y': 20, 'required_level': 25},
-            {'name': 'Islandia', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'hard', 'x': 300, 'y': 30, 'required_level': 18},
-            {'name': 'Spitsbergen', 'region_type': 'archipelago', 'climate': 'arctic', 'difficulty': 'extreme', 'x': 350, 'y': 10, 'required_level': 30},
-            {'name': 'Paso del Noroeste', 'region_type': 'strait', 'climate': 'arctic', 'difficulty': 'legendary', 'x': 150, 'y': 10, 'required_level': 35},
-            {'name': 'Tierra de Baffin', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'extreme', 'x': 180, 'y': 25, 'required_level': 28},
+            {'name': 'Groenlandia', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'extreme', 'x_coordinate': 200, 'y_coordinate': 20, 'required_level': 25},
+            {'name': 'Islandia', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'hard', 'x_coordinate': 300, 'y_coordinate': 30, 'required_level': 18},
+            {'name': 'Spitsbergen', 'region_type': 'archipelago', 'climate': 'arctic', 'difficulty': 'extreme', 'x_coordinate': 350, 'y_coordinate': 10, 'required_level': 30},
+            {'name': 'Paso del Noroeste', 'region_type': 'strait', 'climate': 'arctic', 'difficulty': 'legendary', 'x_coordinate': 150, 'y_coordinate': 10, 'required_level': 35},
+            {'name': 'Tierra de Baffin', 'region_type': 'island', 'climate': 'arctic', 'difficulty': 'extreme', 'x_coordinate': 180, 'y_coordinate': 25, 'required_level': 28},
             
             # Refugios Piratas (5 regiones secretas)
-            {'name': 'Isla Tortuga Secreta', 'region_type': 'cave', 'climate': 'tropical', 'difficulty': 'legendary', 'x': 125, 'y': 185, 'required_level': 40},
-            {'name': 'Refugio de Barbanegra', 'region_type': 'lagoon', 'climate': 'tropical', 'difficulty': 'legendary', 'x': 115, 'y': 145, 'required_level': 35},
-            {'name': 'Cueva del Tesoro Maldito', 'region_type': 'cave', 'climate': 'tropical', 'difficulty': 'legendary', 'x': 45, 'y': 245, 'required_level': 45},
-            {'name': 'Atolón Fantasma', 'region_type': 'atoll', 'climate': 'tropical', 'difficulty': 'legendary', 'x': 175, 'y': 275, 'required_level': 50},
-            {'name': 'Puerto de los Condenados', 'region_type': 'port', 'climate': 'stormy', 'difficulty': 'legendary', 'x': 500, 'y': 300, 'required_level': 60},
+            {'name': 'Isla Tortuga Secreta', 'region_type': 'cave', 'climate': 'tropical', 'difficulty': 'legendary', 'x_coordinate': 125, 'y_coordinate': 185, 'required_level': 40},
+            {'name': 'Refugio de Barbanegra', 'region_type': 'lagoon', 'climate': 'tropical', 'difficulty': 'legendary', 'x_coordinate': 115, 'y_coordinate': 145, 'required_level': 35},
+            {'name': 'Cueva del Tesoro Maldito', 'region_type': 'cave', 'climate': 'tropical', 'difficulty': 'legendary', 'x_coordinate': 45, 'y_coordinate': 245, 'required_level': 45},
+            {'name': 'Atolón Fantasma', 'region_type': 'atoll', 'climate': 'tropical', 'difficulty': 'legendary', 'x_coordinate': 175, 'y_coordinate': 275, 'required_level': 50},
+            {'name': 'Puerto de los Condenados', 'region_type': 'port', 'climate': 'stormy', 'difficulty': 'legendary', 'x_coordinate': 500, 'y_coordinate': 300, 'required_level': 60},
         ]
         
         for region_data in regions:
@@ -0,0 +1,22 @@
+"""
+Comando para reconstruir las clasificaciones desde la tabla de jugadores
+"""
+from django.core.management.base import BaseCommand
+
+from apps.players.services.leaderboard import CATEGORIES, Leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Reconstruir las clasificaciones materializadas de jugadores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--category',
+            choices=sorted(CATEGORIES),
+            help='Reconstruir solo esta categoría',
+        )
+
+    def handle(self, *args, **options):
+        counts = Leaderboard.rebuild(options['category'])
+        for category, count in counts.items():
+            self.stdout.write(self.style.SUCCESS(f'🏆 {category}: {count} jugadores clasificados'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoldTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(help_text='Positivo para ingresos, negativo para gastos')),
+                ('reason', models.CharField(choices=[('ship_purchase', 'Compra de Barco'), ('ship_repair', 'Reparación de Barco'), ('crew_hire', 'Contratación de Tripulante'), ('guild_creation', 'Creación de Gremio'), ('battle_reward', 'Recompensa de Batalla'), ('battle_plunder', 'Botín de Batalla'), ('exploration_reward', 'Recompensa de Exploración'), ('trade_revenue', 'Venta Comercial'), ('mission_reward', 'Recompensa de Misión'), ('adjustment', 'Ajuste')], max_length=30)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('counterparty', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='players.player')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gold_transactions', to='players.player')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Oro',
+                'verbose_name_plural': 'Movimientos de Oro',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['player', '-created_at'], name='players_goldtx_player_idx')],
+            },
+        ),
+    ]
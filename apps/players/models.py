@@ -1,9 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.core.dirty_fields import DirtyFieldsMixin
 
 
-class Player(models.Model):
+class Player(DirtyFieldsMixin, models.Model):
     """Perfil de jugador extendido para Age of Voyage"""
     
     REPUTATION_CHOICES = [
@@ -71,12 +72,11 @@ class Player(models.Model):
         """Verificar si el jugador puede pagar cierto costo"""
         return self.gold >= cost
     
-    def spend_gold(self, amount):
-        """Gastar oro si es posible"""
-        if self.can_afford(amount):
-            self.gold -= amount
-            return True
-        return False
+    def spend_gold(self, amount, reason='adjustment', reference=''):
+        """Gastar oro si es posible (cobro atómico a través de GoldLedger)"""
+        from apps.players.services.gold_ledger import GoldLedger
+
+        return GoldLedger.debit(self, amount, reason, reference)
 
 
 class PlayerAchievement(models.Model):
@@ -123,3 +123,44 @@ class PlayerSettings(models.Model):
     
     def __str__(self):
         return f"Configuración de {self.player.captain_name}"
+
+
+class GoldTransaction(models.Model):
+    """Movimiento de oro de un jugador (registro de solo inserción, ver GoldLedger)"""
+    REASON_CHOICES = [
+        ('ship_purchase', 'Compra de Barco'),
+        ('ship_repair', 'Reparación de Barco'),
+        ('crew_hire', 'Contratación de Tripulante'),
+        ('guild_creation', 'Creación de Gremio'),
+        ('battle_reward', 'Recompensa de Batalla'),
+        ('battle_plunder', 'Botín de Batalla'),
+        ('exploration_reward', 'Recompensa de Exploración'),
+        ('trade_revenue', 'Venta Comercial'),
+        ('mission_reward', 'Recompensa de Misión'),
+        ('adjustment', 'Ajuste'),
+    ]
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='gold_transactions')
+    amount = models.IntegerField(help_text="Positivo para ingresos, negativo para gastos")
+    reason = models.CharField(max_length=30, choices=REASON_CHOICES)
+    # Jugador que recibe o entrega el oro en una transferencia
+    counterparty = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Objeto que originó el movimiento, p. ej. "battle:42"
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Movimiento de Oro"
+        verbose_name_plural = "Movimientos de Oro"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['player', '-created_at'], name='players_goldtx_player_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player.captain_name}: {self.amount:+d} oro ({self.get_reason_display()})"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Los movimientos de oro no se modifican")
+        super().save(*args, **kwargs)
@@ -0,0 +1,140 @@
+"""
+GoldLedger: Movimientos atómicos del oro de los jugadores.
+Cada operación aplica el delta con F() en un único UPDATE (los cargos, con la
+condición gold >= importe), sin reescribir el resto de la fila del jugador, y
+anota el movimiento en la tabla de solo inserción GoldTransaction.
+Dentro de GoldLedger.batch() las anotaciones se acumulan y se escriben con un
+solo bulk_create al cerrar el bloque, en la misma transacción que los UPDATE.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+
+from apps.players.models import GoldTransaction, Player
+
+BATCH_SIZE = 500
+
+# Anotaciones pendientes del bloque batch() en curso (None fuera de un bloque)
+_pending = ContextVar('gold_ledger_pending', default=None)
+
+
+class GoldLedger:
+    @staticmethod
+    def debit(player, amount, reason, reference=''):
+        """
+        Cobra `amount` solo si el saldo alcanza (UPDATE ... WHERE gold >= amount).
+        Devuelve True si se cobró.
+        """
+        GoldLedger._check_amount(amount)
+        if not amount:
+            return True
+        with transaction.atomic():
+            if not GoldLedger._apply(player, -amount, minimum=amount):
+                return False
+            GoldLedger._record([GoldLedger._entry(player, -amount, reason, reference)])
+        return True
+
+    @staticmethod
+    def credit(player, amount, reason, reference=''):
+        """Abona `amount` al jugador."""
+        GoldLedger._check_amount(amount)
+        if not amount:
+            return
+        with transaction.atomic():
+            GoldLedger._apply(player, amount)
+            GoldLedger._record([GoldLedger._entry(player, amount, reason, reference)])
+
+    @staticmethod
+    def transfer(source, target, amount, reason, reference='', partial=False):
+        """
+        Pasa oro de `source` a `target` en una transacción. Con partial=True se
+        transfiere lo que haya hasta `amount`; si no, todo o nada.
+        Devuelve el importe transferido.
+        """
+        GoldLedger._check_amount(amount)
+        with transaction.atomic():
+            if partial:
+                balance = (
+                    Player.objects.select_for_update()
+                    .filter(pk=GoldLedger._pk(source))
+                    .values_list('gold', flat=True)
+                    .first()
+                ) or 0
+                amount = min(amount, max(0, balance))
+            if not amount or not GoldLedger._apply(source, -amount, minimum=amount):
+                return 0
+            GoldLedger._apply(target, amount)
+            GoldLedger._record([
+                GoldLedger._entry(source, -amount, reason, reference, counterparty=target),
+                GoldLedger._entry(target, amount, reason, reference, counterparty=source),
+            ])
+        return amount
+
+    @staticmethod
+    def balance(player):
+        """Saldo actual leído de la base de datos."""
+        return Player.objects.filter(pk=GoldLedger._pk(player)).values_list('gold', flat=True).first()
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Agrupa las anotaciones del bloque en un solo bulk_create. Los bloques se
+        pueden anidar: si uno interior falla, sus anotaciones se descartan junto
+        con su savepoint y el resto del bloque exterior sigue adelante.
+        """
+        parent = _pending.get()
+        entries = []
+        token = _pending.set(entries)
+        try:
+            with transaction.atomic():
+                yield
+                if parent is None and entries:
+                    GoldTransaction.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        finally:
+            _pending.reset(token)
+        if parent is not None:
+            parent.extend(entries)
+
+    @staticmethod
+    def _apply(player, delta, minimum=None):
+        """UPDATE con F(); mantiene al día `gold` en la instancia si se pasó una."""
+        queryset = Player.objects.filter(pk=GoldLedger._pk(player))
+        if minimum is not None:
+            queryset = queryset.filter(gold__gte=minimum)
+        if not queryset.update(gold=F('gold') + delta):
+            return False
+        if isinstance(player, Player):
+            # El saldo ya está escrito: que un save() posterior no lo reescriba
+            player.gold += delta
+            player.mark_clean(['gold'])
+        return True
+
+    @staticmethod
+    def _record(entries):
+        pending = _pending.get()
+        if pending is not None:
+            pending.extend(entries)
+        else:
+            GoldTransaction.objects.bulk_create(entries)
+
+    @staticmethod
+    def _entry(player, amount, reason, reference, counterparty=None):
+        return GoldTransaction(
+            player_id=GoldLedger._pk(player),
+            amount=amount,
+            reason=reason,
+            reference=reference,
+            counterparty_id=GoldLedger._pk(counterparty) if counterparty is not None else None,
+        )
+
+    @staticmethod
+    def _pk(player):
+        return getattr(player, 'pk', player)
+
+    @staticmethod
+    def _check_amount(amount):
+        if amount < 0:
+            raise ValueError('El importe debe ser positivo')
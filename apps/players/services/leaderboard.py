@@ -0,0 +1,271 @@
+"""
+Leaderboard: Clasificaciones materializadas de jugadores.
+Cada categoría se mantiene como un conjunto ordenado (sorted set de Redis o, sin
+Redis configurado, una lista ordenada en memoria del proceso) que se actualiza al
+guardar un jugador, de modo que el top-N, la posición propia y los vecinos se
+resuelven en O(log n) sin recorrer la tabla de jugadores.
+"""
+import bisect
+import threading
+
+from django.conf import settings
+
+from apps.players.models import Player
+
+# Factor que combina nivel y experiencia en una sola puntuación
+_LEVEL_WEIGHT = 10 ** 9
+
+# Categoría → (campos del jugador que la afectan, función de puntuación)
+CATEGORIES = {
+    'level': (('level', 'experience'), lambda p: p.level * _LEVEL_WEIGHT + p.experience),
+    'combat': (('total_battles_won',), lambda p: p.total_battles_won),
+    'trade': (('total_trade_profit',), lambda p: p.total_trade_profit),
+    'exploration': (('regions_discovered',), lambda p: p.regions_discovered),
+}
+
+SCORE_FIELDS = frozenset(field for fields, _ in CATEGORIES.values() for field in fields)
+
+REBUILD_CHUNK_SIZE = 2000
+
+
+class MemoryBackend:
+    """
+    Conjuntos ordenados en memoria del proceso (desarrollo y tests).
+    Cada conjunto es una lista ordenada de (-puntuación, miembro) más un índice
+    miembro → puntuación; las búsquedas de rango son bisecciones.
+    """
+
+    def __init__(self):
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        return self._sets.setdefault(key, ([], {}))
+
+    def exists(self, key):
+        return key in self._sets
+
+    def add(self, key, scores):
+        with self._lock:
+            entries, index = self._get(key)
+            for member, score in scores.items():
+                old = index.get(member)
+                if old is not None:
+                    if old == score:
+                        continue
+                    del entries[bisect.bisect_left(entries, (-old, member))]
+                bisect.insort(entries, (-score, member))
+                index[member] = score
+
+    def remove(self, key, member):
+        if key not in self._sets:
+            return
+        with self._lock:
+            entries, index = self._sets[key]
+            old = index.pop(member, None)
+            if old is not None:
+                del entries[bisect.bisect_left(entries, (-old, member))]
+
+    def replace(self, key, scores):
+        entries = sorted((-score, member) for member, score in scores.items())
+        with self._lock:
+            self._sets[key] = (entries, dict(scores))
+
+    def rank(self, key, member):
+        entries, index = self._get(key)
+        score = index.get(member)
+        if score is None:
+            return None
+        return bisect.bisect_left(entries, (-score, member))
+
+    def score(self, key, member):
+        return self._get(key)[1].get(member)
+
+    def range(self, key, start, stop):
+        entries, _ = self._get(key)
+        return [(member, -neg_score) for neg_score, member in entries[start:stop + 1]]
+
+    def count(self, key):
+        return len(self._get(key)[0])
+
+
+class RedisBackend:
+    """Sorted sets de Redis (ZADD / ZREVRANK / ZREVRANGE)."""
+
+    def __init__(self, url):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def exists(self, key):
+        return bool(self._client.exists(key))
+
+    def add(self, key, scores):
+        if scores:
+            self._client.zadd(key, {str(member): score for member, score in scores.items()})
+
+    def remove(self, key, member):
+        self._client.zrem(key, str(member))
+
+    def replace(self, key, scores):
+        # Se construye aparte y se renombra, para no servir nunca un conjunto a medias
+        tmp_key = f'{key}:rebuild'
+        pipe = self._client.pipeline()
+        pipe.delete(tmp_key)
+        items = list(scores.items())
+        for i in range(0, len(items), REBUILD_CHUNK_SIZE):
+            pipe.zadd(tmp_key, {str(member): score for member, score in items[i:i + REBUILD_CHUNK_SIZE]})
+        if items:
+            pipe.rename(tmp_key, key)
+        else:
+            pipe.delete(key)
+        pipe.execute()
+
+    def rank(self, key, member):
+        return self._client.zrevrank(key, str(member))
+
+    def score(self, key, member):
+        score = self._client.zscore(key, str(member))
+        return None if score is None else int(score)
+
+    def range(self, key, start, stop):
+        return [
+            (int(member), int(score))
+            for member, score in self._client.zrevrange(key, start, stop, withscores=True)
+        ]
+
+    def count(self, key):
+        return self._client.zcard(key)
+
+
+class Leaderboard:
+    KEY = 'leaderboard:{category}'
+
+    _backend = None
+    _backend_lock = threading.Lock()
+
+    @classmethod
+    def backend(cls):
+        """Backend configurado: Redis si hay LEADERBOARD_REDIS_URL, si no memoria del proceso."""
+        if cls._backend is None:
+            with cls._backend_lock:
+                if cls._backend is None:
+                    url = getattr(settings, 'LEADERBOARD_REDIS_URL', None)
+                    cls._backend = RedisBackend(url) if url else MemoryBackend()
+        return cls._backend
+
+    @classmethod
+    def set_backend(cls, backend):
+        cls._backend = backend
+
+    @staticmethod
+    def _key(category):
+        if category not in CATEGORIES:
+            raise ValueError(f'Categoría de clasificación desconocida: {category}')
+        return Leaderboard.KEY.format(category=category)
+
+    @classmethod
+    def _ensure(cls, category):
+        """Construye la clasificación si aún no existe (arranque en frío)."""
+        key = cls._key(category)
+        if not cls.backend().exists(key):
+            cls.rebuild(category)
+        return key
+
+    @classmethod
+    def update_player(cls, player, changed_fields=None):
+        """
+        Actualiza las puntuaciones de un jugador.
+        Con `changed_fields` solo se tocan las categorías afectadas.
+        """
+        backend = cls.backend()
+        for category, (fields, score) in CATEGORIES.items():
+            if changed_fields is not None and not set(fields) & set(changed_fields):
+                continue
+            key = cls._key(category)
+            # Si la clasificación no existe se construirá completa en la próxima lectura
+            if backend.exists(key):
+                backend.add(key, {player.pk: score(player)})
+
+    @classmethod
+    def remove_player(cls, player_id):
+        backend = cls.backend()
+        for category in CATEGORIES:
+            backend.remove(cls._key(category), player_id)
+
+    @classmethod
+    def rebuild(cls, category=None):
+        """Reconstruye una categoría (o todas) desde la tabla de jugadores."""
+        categories = [category] if category else list(CATEGORIES)
+        fields = sorted({field for c in categories for field in CATEGORIES[c][0]})
+        scores = {c: {} for c in categories}
+        rows = Player.objects.order_by().values_list('pk', *fields)
+        for row in rows.iterator(chunk_size=REBUILD_CHUNK_SIZE):
+            player = _ScoreRow(dict(zip(fields, row[1:])))
+            for c in categories:
+                scores[c][row[0]] = CATEGORIES[c][1](player)
+        for c in categories:
+            cls.backend().replace(cls._key(c), scores[c])
+        return {c: len(scores[c]) for c in categories}
+
+    @classmethod
+    def top(cls, category, n=10, offset=0):
+        """Los `n` primeros a partir de `offset`: [(posición, player_id, puntuación)]."""
+        key = cls._ensure(category)
+        if n <= 0:
+            return []
+        return [
+            (offset + i + 1, member, score)
+            for i, (member, score) in enumerate(cls.backend().range(key, offset, offset + n - 1))
+        ]
+
+    @classmethod
+    def rank(cls, category, player):
+        """Posición (desde 1) y puntuación del jugador, o None si no está clasificado."""
+        key = cls._ensure(category)
+        player_id = getattr(player, 'pk', player)
+        position = cls.backend().rank(key, player_id)
+        if position is None:
+            return None
+        return {
+            'rank': position + 1,
+            'score': cls.backend().score(key, player_id),
+            'total': cls.backend().count(key),
+        }
+
+    @classmethod
+    def around(cls, category, player, radius=5, page=0):
+        """
+        Ventana de 2 * radius + 1 jugadores centrada en el jugador.
+        `page` desplaza la ventana completa hacia arriba (negativa) o hacia abajo.
+        """
+        key = cls._ensure(category)
+        player_id = getattr(player, 'pk', player)
+        position = cls.backend().rank(key, player_id)
+        if position is None:
+            return []
+        size = 2 * radius + 1
+        start = max(0, position - radius + page * size)
+        return cls.top(category, size, start)
+
+    @staticmethod
+    def display_score(category, score):
+        """Puntuación legible (nivel y experiencia por separado en 'level')."""
+        if category == 'level':
+            return {'level': score // _LEVEL_WEIGHT, 'experience': score % _LEVEL_WEIGHT}
+        return score
+
+
+class _ScoreRow:
+    """Fila de values_list con acceso por atributo para las funciones de puntuación."""
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
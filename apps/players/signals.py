@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Player
+from .services.leaderboard import Leaderboard, SCORE_FIELDS
+
+
+@receiver(post_save, sender=Player)
+def update_leaderboards(sender, instance, update_fields=None, **kwargs):
+    # Con update_fields solo se actualizan las clasificaciones afectadas
+    if update_fields is not None and not SCORE_FIELDS & set(update_fields):
+        return
+    Leaderboard.update_player(instance, update_fields)
+
+
+@receiver(post_delete, sender=Player)
+def remove_from_leaderboards(sender, instance, **kwargs):
+    Leaderboard.remove_player(instance.pk)
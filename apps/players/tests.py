@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.players.models import GoldTransaction, Player
+from apps.players.services.gold_ledger import GoldLedger
+
+
+class GoldLedgerDebitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('ledger', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Tesorera', gold=100)
+
+    def test_debit_with_enough_gold(self):
+        player = Player.objects.get(pk=self.player.pk)
+
+        self.assertTrue(GoldLedger.debit(player, 60, 'ship_repair'))
+
+        self.assertEqual(player.gold, 40)
+        self.assertEqual(GoldLedger.balance(player), 40)
+        self.assertEqual(list(GoldTransaction.objects.values_list('amount', flat=True)), [-60])
+
+    def test_debit_with_insufficient_funds_changes_nothing(self):
+        player = Player.objects.get(pk=self.player.pk)
+
+        self.assertFalse(GoldLedger.debit(player, 150, 'ship_purchase'))
+
+        self.assertEqual(player.gold, 100)
+        self.assertEqual(GoldLedger.balance(player), 100)
+        self.assertFalse(GoldTransaction.objects.exists())
@@ -20,6 +20,9 @@ urlpatterns = [
     
     # Funcionalidades sociales
     path('leaderboard/', views.leaderboard, name='leaderboard'),
+    path('leaderboard/api/<str:category>/top/', views.leaderboard_top_api, name='leaderboard_top_api'),
+    path('leaderboard/api/<str:category>/me/', views.leaderboard_rank_api, name='leaderboard_rank_api'),
+    path('leaderboard/api/<str:category>/around/', views.leaderboard_around_api, name='leaderboard_around_api'),
     path('search/', views.search_players, name='search'),
     path('settings/', views.player_settings, name='settings'),
 ]
@@ -7,7 +7,10 @@ from django.http import JsonResponse
 from django.db.models import Q
 from .models import Player, PlayerAchievement
 from apps.ships.models import Ship
+from apps.ships.services.fleet_summary import FleetSummary
+from .services.leaderboard import CATEGORIES as LEADERBOARD_CATEGORIES, Leaderboard
 from apps.exploration.models import Region
+from apps.core.instrumentation import query_budget
 
 
 def home(request):
@@ -24,6 +27,7 @@ def home(request):
 
 
 @login_required
+@query_budget(6)
 def player_dashboard(request):
     """Dashboard principal del jugador"""
     player = get_object_or_404(Player, user=request.user)
@@ -31,12 +35,14 @@ def player_dashboard(request):
     # Obtener estadísticas del jugador
     player_ships = Ship.objects.filter(owner=player)
     recent_achievements = PlayerAchievement.objects.filter(player=player).order_by('-earned_at')[:5]
+    fleet = FleetSummary.for_player(player)
     
     context = {
         'player': player,
         'player_ships': player_ships,
         'recent_achievements': recent_achievements,
-        'ship_count': player_ships.count(),
+        'fleet': fleet,
+        'ship_count': fleet['ship_count'],
     }
     return render(request, 'players/dashboard.html', context)
 
@@ -62,25 +68,93 @@ def player_profile(request, player_id=None):
 
 
 @login_required
+@query_budget(6)
 def leaderboard(request):
     """Tabla de clasificaciones"""
-    # Top jugadores por nivel y experiencia
-    top_players = Player.objects.order_by('-level', '-experience')[:50]
-    
-    # Top por diferentes categorías
-    top_combat = Player.objects.order_by('-total_battles_won')[:10]
-    top_trade = Player.objects.order_by('-total_trade_profit')[:10]
-    top_exploration = Player.objects.order_by('-regions_discovered')[:10]
+    # Rankings materializados; los jugadores se cargan con una sola consulta
+    rankings = {
+        'top_players': Leaderboard.top('level', 50),
+        'top_combat': Leaderboard.top('combat', 10),
+        'top_trade': Leaderboard.top('trade', 10),
+        'top_exploration': Leaderboard.top('exploration', 10),
+    }
+    players = Player.objects.in_bulk({player_id for entries in rankings.values() for _, player_id, _ in entries})
     
     context = {
-        'top_players': top_players,
-        'top_combat': top_combat,
-        'top_trade': top_trade,
-        'top_exploration': top_exploration,
+        name: [players[player_id] for _, player_id, _ in entries if player_id in players]
+        for name, entries in rankings.items()
     }
     return render(request, 'players/leaderboard.html', context)
 
 
+def _leaderboard_entries(category, entries):
+    """Serializa entradas (posición, player_id, puntuación) con el nombre del capitán."""
+    names = dict(
+        Player.objects.filter(pk__in=[player_id for _, player_id, _ in entries]).values_list('pk', 'captain_name')
+    )
+    return [{
+        'rank': rank,
+        'player_id': player_id,
+        'captain_name': names.get(player_id),
+        'score': Leaderboard.display_score(category, score),
+    } for rank, player_id, score in entries]
+
+
+def _int_param(request, name, default, minimum=None, maximum=None):
+    try:
+        value = int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    if minimum is not None:
+        value = max(minimum, value)
+    if maximum is not None:
+        value = min(maximum, value)
+    return value
+
+
+@login_required
+@query_budget(3)
+def leaderboard_top_api(request, category):
+    """API: top-N de una clasificación"""
+    if category not in LEADERBOARD_CATEGORIES:
+        return JsonResponse({'error': 'Categoría desconocida'}, status=404)
+    n = _int_param(request, 'n', 10, 1, 100)
+    offset = _int_param(request, 'offset', 0, 0)
+    entries = Leaderboard.top(category, n, offset)
+    return JsonResponse({'category': category, 'entries': _leaderboard_entries(category, entries)})
+
+
+@login_required
+@query_budget(3)
+def leaderboard_rank_api(request, category):
+    """API: posición del jugador actual en una clasificación"""
+    if category not in LEADERBOARD_CATEGORIES:
+        return JsonResponse({'error': 'Categoría desconocida'}, status=404)
+    player = get_object_or_404(Player, user=request.user)
+    rank = Leaderboard.rank(category, player)
+    if rank is None:
+        return JsonResponse({'category': category, 'rank': None})
+    rank['score'] = Leaderboard.display_score(category, rank['score'])
+    return JsonResponse({'category': category, **rank})
+
+
+@login_required
+@query_budget(3)
+def leaderboard_around_api(request, category):
+    """API: jugadores alrededor del jugador actual (paginado)"""
+    if category not in LEADERBOARD_CATEGORIES:
+        return JsonResponse({'error': 'Categoría desconocida'}, status=404)
+    player = get_object_or_404(Player, user=request.user)
+    radius = _int_param(request, 'radius', 5, 1, 50)
+    page = _int_param(request, 'page', 0)
+    entries = Leaderboard.around(category, player, radius, page)
+    return JsonResponse({
+        'category': category,
+        'page': page,
+        'entries': _leaderboard_entries(category, entries),
+    })
+
+
 def register_player(request):
     """Registro de nuevo jugador"""
     if request.method == 'POST':
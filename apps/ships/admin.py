@@ -12,6 +12,7 @@ class ShipTypeAdmin(admin.ModelAdmin):
 @admin.register(Ship)
 class ShipAdmin(admin.ModelAdmin):
     list_display = ['name', 'owner', 'ship_type', 'status', 'hull_health', 'crew_count']
+    list_select_related = ['owner', 'ship_type']
     list_filter = ['ship_type', 'status', 'created_at']
     search_fields = ['name', 'owner__captain_name']
     readonly_fields = ['created_at']
@@ -26,11 +27,13 @@ class ShipUpgradeAdmin(admin.ModelAdmin):
 @admin.register(ShipCargo)
 class ShipCargoAdmin(admin.ModelAdmin):
     list_display = ['ship', 'resource', 'quantity']
+    list_select_related = ['ship__owner', 'ship__ship_type', 'resource']
     list_filter = ['resource']
 
 
 @admin.register(CrewMember)
 class CrewMemberAdmin(admin.ModelAdmin):
     list_display = ['name', 'ship', 'crew_type', 'skill_level', 'salary_per_day']
+    list_select_related = ['ship__owner', 'ship__ship_type']
     list_filter = ['crew_type', 'skill_level']
     search_fields = ['name', 'ship__name']
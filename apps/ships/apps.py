@@ -5,3 +5,6 @@ class ShipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ships'
     verbose_name = 'Barcos - Age of Voyage'
+
+    def ready(self):
+        import apps.ships.signals
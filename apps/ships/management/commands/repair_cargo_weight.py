@@ -0,0 +1,33 @@
+"""
+Comando para recalcular el peso de carga almacenado en cada barco
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ships.services.cargo_service import CargoService
+
+
+class Command(BaseCommand):
+    help = 'Recalcular Ship.cargo_weight a partir de la carga real con una sola consulta'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo informar de los barcos desincronizados',
+        )
+
+    def handle(self, *args, **options):
+        drift = CargoService.find_drift()
+        for ship_id, stored, actual in drift[:20]:
+            self.stdout.write(f'  Barco #{ship_id}: guardado {stored}, real {actual}')
+        if len(drift) > 20:
+            self.stdout.write(f'  ... y {len(drift) - 20} más')
+
+        if options['dry_run']:
+            self.stdout.write(f'🔍 {len(drift)} barcos desincronizados')
+            return
+
+        updated = CargoService.recompute_weights()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Peso de carga recalculado en {updated} barcos ({len(drift)} corregidos)')
+        )
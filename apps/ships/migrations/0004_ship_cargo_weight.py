@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:56
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_cargo_weight(apps, schema_editor):
+    Ship = apps.get_model('ships', 'Ship')
+    ShipCargo = apps.get_model('ships', 'ShipCargo')
+    totals = (
+        ShipCargo.objects.filter(ship=OuterRef('pk'))
+        .order_by()
+        .values('ship')
+        .annotate(total=Sum(F('quantity') * F('resource__weight')))
+        .values('total')[:1]
+    )
+    Ship.objects.update(cargo_weight=Coalesce(Subquery(totals), Value(0)))
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ships', '0003_populate_shiptypes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ship',
+            name='cargo_weight',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_cargo_weight, migrations.RunPython.noop),
+    ]
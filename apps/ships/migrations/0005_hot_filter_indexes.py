@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exploration', '0003_hot_filter_indexes'),
+        ('players', '0001_initial'),
+        ('ships', '0004_ship_cargo_weight'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ship',
+            index=models.Index(fields=['owner', 'status'], name='ships_ship_owner_status_idx'),
+        ),
+    ]
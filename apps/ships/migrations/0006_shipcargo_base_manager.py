@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:16
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ships', '0005_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='shipcargo',
+            options={'base_manager_name': 'with_resource', 'verbose_name': 'Carga de Barco', 'verbose_name_plural': 'Cargas de Barcos'},
+        ),
+        migrations.AlterModelManagers(
+            name='shipcargo',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('with_resource', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -1,6 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.core.dirty_fields import DirtyFieldsMixin
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
+from apps.trade.services.voyage_planner import VoyagePlanner
 
 
 class ShipType(models.Model):
@@ -32,7 +36,7 @@ class ShipType(models.Model):
         return self.name
 
 
-class Ship(models.Model):
+class Ship(DirtyFieldsMixin, models.Model):
     """Barcos individuales de los jugadores"""
     
     STATUS_CHOICES = [
@@ -63,6 +67,9 @@ class Ship(models.Model):
     hull_health = models.IntegerField(default=100, validators=[MinValueValidator(0), MaxValueValidator(100)])
     crew_count = models.IntegerField(default=0)
     
+    # Peso total de la carga, mantenido por ShipCargo (ver CargoService)
+    cargo_weight = models.IntegerField(default=0)
+    
     # Fechas
     created_at = models.DateTimeField(auto_now_add=True)
     last_maintenance = models.DateTimeField(auto_now_add=True)
@@ -71,6 +78,9 @@ class Ship(models.Model):
         verbose_name = "Barco"
         verbose_name_plural = "Barcos"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'status'], name='ships_ship_owner_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.ship_type.name}) - {self.owner.captain_name}"
@@ -88,7 +98,7 @@ class Ship(models.Model):
     @property
     def current_cargo_weight(self):
         """Peso actual de la carga"""
-        return sum(item.quantity * item.resource.weight for item in self.cargo_items.all())
+        return self.cargo_weight
     
     @property
     def available_cargo_space(self):
@@ -102,13 +112,12 @@ class Ship(models.Model):
         
         repair_cost = amount * 10  # 10 oro por punto de daño
         
-        if self.owner.can_afford(repair_cost):
-            self.owner.spend_gold(repair_cost)
+        with transaction.atomic():
+            if not GoldLedger.debit(self.owner, repair_cost, 'ship_repair', f'ship:{self.pk}'):
+                return False
             self.hull_health = min(100, self.hull_health + amount)
-            self.save()
-            self.owner.save()
-            return True
-        return False
+            self.save(update_fields=['hull_health'])
+        return True
     
     def can_sail_to(self, destination):
         """Verificar si puede navegar a un destino"""
@@ -118,8 +127,18 @@ class Ship(models.Model):
         if self.status != 'docked':
             return False, "El barco no está atracado"
         
-        # Aquí se podría agregar lógica de distancia, etc.
+        if self.current_location_id and self.current_location_id != destination.pk:
+            plan = VoyagePlanner.plan(self.current_location_id, destination, self.speed)
+            if plan is None:
+                return False, "No hay ruta marítima hacia el destino"
+        
         return True, "Puede navegar"
+    
+    def plan_voyage(self, destination):
+        """Planificar el viaje desde la ubicación actual hasta un destino"""
+        if not self.current_location_id:
+            return None
+        return VoyagePlanner.plan(self.current_location_id, destination, self.speed)
 
 
 class ShipUpgrade(models.Model):
@@ -148,6 +167,13 @@ class ShipUpgrade(models.Model):
         return f"{self.name} (+{self.bonus_amount} {self.get_upgrade_type_display()})"
 
 
+class ShipCargoManager(models.Manager):
+    """Carga con su recurso: el peso por unidad hace falta al borrar cada línea"""
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('resource')
+
+
 class ShipCargo(models.Model):
     """Carga de los barcos"""
     
@@ -155,13 +181,58 @@ class ShipCargo(models.Model):
     resource = models.ForeignKey('trade.Resource', on_delete=models.CASCADE)
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
     
+    objects = models.Manager()
+    # Gestor base: los borrados en cascada (al borrar un barco o un recurso) cargan
+    # las líneas con él, así que post_delete no consulta el recurso línea a línea
+    with_resource = ShipCargoManager()
+    
     class Meta:
         verbose_name = "Carga de Barco"
         verbose_name_plural = "Cargas de Barcos"
         unique_together = ['ship', 'resource']
+        base_manager_name = 'with_resource'
     
     def __str__(self):
         return f"{self.ship.name} - {self.quantity} {self.resource.name}"
+    
+    @property
+    def weight(self):
+        """Peso de esta línea de carga"""
+        return self.quantity * self.resource.weight
+    
+    def save(self, *args, **kwargs):
+        """Guarda la línea y aplica la diferencia de peso al barco en la misma transacción"""
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = (
+                    ShipCargo.objects.filter(pk=self.pk)
+                    .values_list('ship_id', 'quantity', 'resource__weight')
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            
+            new_weight = self.weight
+            if previous is None:
+                self._apply_weight(self.ship_id, new_weight)
+            else:
+                old_ship_id, old_quantity, old_unit_weight = previous
+                old_weight = old_quantity * old_unit_weight
+                if old_ship_id == self.ship_id:
+                    self._apply_weight(self.ship_id, new_weight - old_weight)
+                else:
+                    self._apply_weight(old_ship_id, -old_weight)
+                    self._apply_weight(self.ship_id, new_weight)
+    
+    def _apply_weight(self, ship_id, delta):
+        if not delta:
+            return
+        Ship.objects.filter(pk=ship_id).update(cargo_weight=F('cargo_weight') + delta)
+        # Mantener coherente la instancia de barco ya cargada; el valor ya está
+        # escrito, así que un save() posterior no debe reescribirlo
+        if ShipCargo.ship.is_cached(self) and self.ship.pk == ship_id:
+            self.ship.cargo_weight += delta
+            self.ship.mark_clean(['cargo_weight'])
 
 
 class CrewMember(models.Model):
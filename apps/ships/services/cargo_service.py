@@ -0,0 +1,46 @@
+"""
+CargoService: Mantenimiento del peso de carga desnormalizado en Ship.cargo_weight.
+Cada cambio en ShipCargo aplica un delta con F() dentro de la misma transacción;
+recompute_weights reconstruye el valor desde cero con una sola sentencia UPDATE.
+"""
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.ships.models import Ship, ShipCargo
+
+
+class CargoService:
+    @staticmethod
+    def cargo_weight_subquery():
+        """Subconsulta con el peso total de la carga de cada barco (OuterRef('pk'))."""
+        return Coalesce(
+            Subquery(
+                ShipCargo.objects.filter(ship=OuterRef('pk'))
+                .order_by()
+                .values('ship')
+                .annotate(total=Sum(F('quantity') * F('resource__weight')))
+                .values('total')[:1]
+            ),
+            Value(0),
+        )
+
+    @staticmethod
+    def recompute_weights(ships=None):
+        """
+        Recalcula cargo_weight con un único UPDATE sobre una subconsulta agregada.
+        `ships` puede ser un queryset o una lista de ids; por defecto, toda la flota.
+        Devuelve el número de barcos actualizados.
+        """
+        queryset = Ship.objects.all()
+        if ships is not None:
+            queryset = queryset.filter(pk__in=ships)
+        return queryset.update(cargo_weight=CargoService.cargo_weight_subquery())
+
+    @staticmethod
+    def find_drift():
+        """Barcos cuyo cargo_weight no coincide con su carga real: [(id, guardado, real)]."""
+        return list(
+            Ship.objects.annotate(actual=CargoService.cargo_weight_subquery())
+            .exclude(cargo_weight=F('actual'))
+            .values_list('id', 'cargo_weight', 'actual')
+        )
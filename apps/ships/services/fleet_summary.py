@@ -0,0 +1,76 @@
+"""
+FleetSummary: Estadísticas agregadas de la flota de un jugador.
+Calcula todos los totales con una única consulta agregada y los guarda en caché
+por jugador bajo la versión de su flota (DataVersion). Las señales de Ship y
+CrewMember incrementan la versión del dueño en la caché compartida 'versions', de
+modo que la entrada queda obsoleta en todos los procesos, no solo en el que guarda.
+"""
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.core.data_versions import DataVersion
+from apps.ships.models import CrewMember, Ship
+
+# Red de seguridad para cambios hechos con update() que no disparan señales
+SUMMARY_TIMEOUT = 300
+
+
+class FleetSummary:
+    CACHE_KEY = 'ships:fleet_summary:{player_id}:{version}'
+    VERSION_KEY = 'ships:fleet_summary:version:{player_id}'
+
+    @staticmethod
+    def for_player(player):
+        """Resumen de la flota (desde caché si está disponible)."""
+        player_id = getattr(player, 'pk', player)
+        version = DataVersion.get(FleetSummary.VERSION_KEY.format(player_id=player_id))
+        key = FleetSummary.CACHE_KEY.format(player_id=player_id, version=version)
+        summary = cache.get(key)
+        if summary is None:
+            summary = FleetSummary.compute(player_id)
+            cache.set(key, summary, SUMMARY_TIMEOUT)
+        return summary
+
+    @staticmethod
+    def compute(player_id):
+        """Calcula el resumen con una sola consulta agregada."""
+        crew = (
+            CrewMember.objects.filter(ship=OuterRef('pk'))
+            .order_by()
+            .values('ship')
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        )
+        totals = (
+            Ship.objects.filter(owner_id=player_id)
+            .annotate(crew_members_count=Coalesce(Subquery(crew, output_field=IntegerField()), Value(0)))
+            .aggregate(
+                ship_count=Count('pk'),
+                total_crew=Sum('crew_members_count'),
+                total_combat_power=Sum(F('ship_type__base_firepower') + F('ship_type__base_defense')),
+                total_cargo_capacity=Sum('ship_type__base_cargo_capacity'),
+                average_speed=Avg('speed'),
+                operational_count=Count('pk', filter=Q(hull_health__gt=10, crew_count__gt=0)),
+                needs_repair_count=Count('pk', filter=Q(hull_health__lt=80)),
+                repair_points=Sum(100 - F('hull_health'), filter=Q(hull_health__lt=80)),
+            )
+        )
+        repair_points = totals['repair_points'] or 0
+        return {
+            'ship_count': totals['ship_count'],
+            'total_crew': totals['total_crew'] or 0,
+            'total_combat_power': totals['total_combat_power'] or 0,
+            'total_cargo_capacity': totals['total_cargo_capacity'] or 0,
+            'average_speed': round(totals['average_speed'] or 0, 1),
+            'operational_count': totals['operational_count'],
+            'needs_repair_count': totals['needs_repair_count'],
+            'repair_points': repair_points,
+            # Mismo coste que Ship.repair: 10 oro por punto de daño
+            'repair_cost': repair_points * 10,
+        }
+
+    @staticmethod
+    def invalidate(player_id):
+        """Invalida el resumen del jugador en todos los procesos al confirmarse la transacción."""
+        DataVersion.bump(FleetSummary.VERSION_KEY.format(player_id=player_id))
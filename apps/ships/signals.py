@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.trade.models import Resource
+from .models import Ship, ShipCargo, CrewMember
+from .services.cargo_service import CargoService
+from .services.fleet_summary import FleetSummary
+
+
+@receiver(post_delete, sender=ShipCargo)
+def release_cargo_weight(sender, instance, **kwargs):
+    # post_delete también cubre los borrados en bloque y en cascada
+    instance._apply_weight(instance.ship_id, -instance.quantity * instance.resource.weight)
+
+
+@receiver(post_save, sender=Resource)
+def refresh_cargo_weight(sender, instance, created, **kwargs):
+    # Un cambio de peso por unidad afecta a todos los barcos que llevan el recurso
+    if not created:
+        CargoService.recompute_weights(
+            ShipCargo.objects.filter(resource=instance).values('ship_id')
+        )
+
+
+@receiver(post_save, sender=Ship)
+@receiver(post_delete, sender=Ship)
+def invalidate_fleet_summary(sender, instance, **kwargs):
+    FleetSummary.invalidate(instance.owner_id)
+
+
+@receiver(post_save, sender=CrewMember)
+@receiver(post_delete, sender=CrewMember)
+def invalidate_fleet_summary_for_crew(sender, instance, **kwargs):
+    owner_id = Ship.objects.filter(pk=instance.ship_id).values_list('owner_id', flat=True).first()
+    if owner_id is not None:
+        FleetSummary.invalidate(owner_id)
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.players.models import Player
+from apps.ships.models import CrewMember, Ship, ShipCargo, ShipType
+from apps.ships.services.fleet_summary import FleetSummary
+from apps.trade.models import Resource
+
+
+class CargoWeightTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('cargo', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Estibadora')
+        cls.ship_type = ShipType.objects.create(
+            name='Galeón de pruebas', description='', base_speed=5, base_cargo_capacity=1000, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.resources = [
+            Resource.objects.create(
+                name=f'Fardo de pruebas {i}', description='', category='textiles', weight=i + 2, base_price=10,
+            )
+            for i in range(3)
+        ]
+
+    def _ship(self):
+        return Ship.objects.create(
+            owner=self.player, ship_type=self.ship_type, name='Galeón', speed=5, cargo_capacity=1000,
+            firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+
+    def test_save_after_loading_cargo_keeps_concurrent_deltas(self):
+        ship = Ship.objects.get(pk=self._ship().pk)
+
+        ShipCargo(ship=ship, resource=self.resources[0], quantity=10).save()
+        self.assertEqual(ship.cargo_weight, 20)
+        # Otra petición carga el mismo barco mientras tanto
+        Ship.objects.filter(pk=ship.pk).update(cargo_weight=F('cargo_weight') + 30)
+        ship.name = 'Galeón renombrado'
+        ship.save()
+
+        self.assertEqual(Ship.objects.get(pk=ship.pk).cargo_weight, 50)
+
+    def test_deleting_a_ship_does_not_query_each_resource(self):
+        ship = self._ship()
+        for resource in self.resources:
+            ShipCargo.objects.create(ship=ship, resource=resource, quantity=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            ship.delete()
+
+        self.assertFalse(ShipCargo.objects.exists())
+        self.assertEqual(
+            [query['sql'] for query in queries if 'FROM "trade_resource"' in query['sql']], [],
+        )
+
+
+class FleetSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('fleet', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Almiranta')
+        cls.ship_type = ShipType.objects.create(
+            name='Fragata de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=cls.ship_type, name='Fragata', speed=5, cargo_capacity=100,
+            firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+
+    def setUp(self):
+        for alias in ('default', 'versions'):
+            caches[alias].clear()
+
+    def test_saving_a_ship_invalidates_the_summary_on_commit(self):
+        self.assertEqual(FleetSummary.for_player(self.player)['needs_repair_count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ship.hull_health = 50
+            self.ship.save()
+            # Hasta confirmar la transacción se sigue sirviendo la entrada anterior
+            self.assertEqual(FleetSummary.for_player(self.player)['needs_repair_count'], 0)
+
+        summary = FleetSummary.for_player(self.player)
+        self.assertEqual((summary['needs_repair_count'], summary['repair_points']), (1, 50))
+
+    def test_crew_changes_invalidate_the_owner_summary(self):
+        self.assertEqual(FleetSummary.for_player(self.player)['total_crew'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CrewMember.objects.create(ship=self.ship, name='Grumete', crew_type='sailor', salary_per_day=1)
+
+        self.assertEqual(FleetSummary.for_player(self.player)['total_crew'], 1)
+
+    def test_a_bump_from_another_process_reaches_this_process_cache(self):
+        FleetSummary.for_player(self.player)
+        Ship.objects.filter(pk=self.ship.pk).update(hull_health=50)
+
+        # Otro proceso guardó el barco: solo comparte con este la caché 'versions'
+        caches['versions'].incr(FleetSummary.VERSION_KEY.format(player_id=self.player.pk))
+
+        self.assertEqual(FleetSummary.for_player(self.player)['needs_repair_count'], 1)
@@ -2,31 +2,34 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db import models
+from django.db import transaction
 from .models import Ship, ShipType, ShipUpgrade, CrewMember
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
+from apps.ships.services.fleet_summary import FleetSummary
+from apps.core.instrumentation import query_budget
 
 
 @login_required
+@query_budget(8)
 def ship_list(request):
     """Lista de barcos del jugador"""
     player = get_object_or_404(Player, user=request.user)
-    ships = Ship.objects.filter(owner=player).order_by('-created_at')
+    ships = Ship.objects.filter(owner=player).select_related('ship_type').order_by('-created_at')
     
-    # Estadísticas de la flota
-    total_crew = sum(ship.crew_members.count() for ship in ships)
-    total_combat_power = sum(ship.ship_type.base_firepower + ship.ship_type.base_defense for ship in ships)
-    total_cargo_capacity = sum(ship.ship_type.base_cargo_capacity for ship in ships)
-    average_speed = ships.aggregate(models.Avg('speed'))['speed__avg'] or 0
+    # Estadísticas de la flota (una consulta agregada, en caché por jugador)
+    fleet = FleetSummary.for_player(player)
     
     context = {
         'ships': ships,
         'player': player,
         'max_ships': 10,  # Límite de barcos
-        'total_crew': total_crew,
-        'total_combat_power': total_combat_power,
-        'total_cargo_capacity': total_cargo_capacity,
-        'average_speed': round(average_speed, 1),
+        'fleet': fleet,
+        'ship_count': fleet['ship_count'],
+        'total_crew': fleet['total_crew'],
+        'total_combat_power': fleet['total_combat_power'],
+        'total_cargo_capacity': fleet['total_cargo_capacity'],
+        'average_speed': fleet['average_speed'],
     }
     return render(request, 'ships/fleet.html', context)
 
@@ -37,7 +40,7 @@ def ship_detail(request, ship_id):
     player = get_object_or_404(Player, user=request.user)
     ship = get_object_or_404(Ship, id=ship_id, owner=player)
     
-    cargo_items = ship.cargo_items.all()
+    cargo_items = ship.cargo_items.select_related('resource')
     crew_members = ship.crew_members.all()
     
     context = {
@@ -49,6 +52,7 @@ def ship_detail(request, ship_id):
 
 
 @login_required
+@query_budget(6)
 def shipyard(request):
     """Astillero - Comprar nuevos barcos"""
     player = get_object_or_404(Player, user=request.user)
@@ -94,10 +98,6 @@ def build_ship(request):
         messages.error(request, f'Necesitas nivel {ship_type.required_level} para construir este barco.')
         return redirect('ships:shipyard')
 
-    if player.gold < ship_type.purchase_cost:
-        messages.error(request, 'No tienes suficiente oro para construir este barco.')
-        return redirect('ships:shipyard')
-
     # Nombre automático: "{player.captain_name} - {ship_type.name}"
     ship_name = f"{player.captain_name} - {ship_type.name}"
     # Verificar que el nombre no esté en uso
@@ -105,23 +105,26 @@ def build_ship(request):
         messages.error(request, 'Ya tienes un barco de este tipo.')
         return redirect('ships:shipyard')
 
-    # Crear el barco
-    ship = Ship.objects.create(
-        owner=player,
-        ship_type=ship_type,
-        name=ship_name,
-        speed=ship_type.base_speed,
-        cargo_capacity=ship_type.base_cargo_capacity,
-        firepower=ship_type.base_firepower,
-        defense=ship_type.base_defense,
-        crew_capacity=ship_type.base_crew_capacity,
-        crew_count=ship_type.base_crew_capacity // 2,  # Empezar con media tripulación
-        hull_health=100,
-        status='docked'
-    )
-    # Descontar oro
-    player.gold -= ship_type.purchase_cost
-    player.save()
+    with transaction.atomic():
+        # Descontar oro (cobro condicional: falla si el saldo no alcanza)
+        if not GoldLedger.debit(player, ship_type.purchase_cost, 'ship_purchase', f'ship_type:{ship_type.pk}'):
+            messages.error(request, 'No tienes suficiente oro para construir este barco.')
+            return redirect('ships:shipyard')
+
+        # Crear el barco
+        Ship.objects.create(
+            owner=player,
+            ship_type=ship_type,
+            name=ship_name,
+            speed=ship_type.base_speed,
+            cargo_capacity=ship_type.base_cargo_capacity,
+            firepower=ship_type.base_firepower,
+            defense=ship_type.base_defense,
+            crew_capacity=ship_type.base_crew_capacity,
+            crew_count=ship_type.base_crew_capacity // 2,  # Empezar con media tripulación
+            hull_health=100,
+            status='docked'
+        )
     messages.success(request, f'¡Barco "{ship_name}" construido exitosamente!')
     return redirect('ships:fleet')
 
@@ -142,12 +145,11 @@ def repair_ship(request, ship_id):
     damage = 100 - ship.hull_health
     repair_cost = damage * 10
     
-    if not player.can_afford(repair_cost):
+    # Reparar (el cobro y la reparación van en la misma transacción)
+    ship.owner = player
+    if not ship.repair():
         messages.error(request, f'Necesitas {repair_cost} oro para reparar completamente el barco.')
         return redirect('ships:ship_detail', ship_id=ship_id)
-    
-    # Reparar
-    ship.repair()
     messages.success(request, f'El {ship.name} ha sido reparado completamente por {repair_cost} oro.')
     
     return redirect('ships:ship_detail', ship_id=ship_id)
@@ -194,24 +196,22 @@ def hire_crew(request, ship_id):
         
         cost = crew_costs.get(crew_type, 50)
         
-        if not player.can_afford(cost):
-            messages.error(request, f'No tienes suficiente oro para contratar este tripulante ({cost} oro).')
-            return redirect('ships:ship_detail', ship_id=ship_id)
-        
-        # Contratar tripulante
-        CrewMember.objects.create(
-            ship=ship,
-            name=crew_name,
-            crew_type=crew_type,
-            skill_level=1,
-            salary_per_day=cost // 10,
-        )
-        
-        ship.crew_count += 1
-        ship.save()
-        
-        player.spend_gold(cost)
-        player.save()
+        with transaction.atomic():
+            if not player.spend_gold(cost, 'crew_hire', f'ship:{ship.pk}'):
+                messages.error(request, f'No tienes suficiente oro para contratar este tripulante ({cost} oro).')
+                return redirect('ships:ship_detail', ship_id=ship_id)
+            
+            # Contratar tripulante
+            CrewMember.objects.create(
+                ship=ship,
+                name=crew_name,
+                crew_type=crew_type,
+                skill_level=1,
+                salary_per_day=cost // 10,
+            )
+            
+            ship.crew_count += 1
+            ship.save(update_fields=['crew_count'])
         
         messages.success(request, f'Has contratado a {crew_name} como {dict(CrewMember.CREW_TYPES)[crew_type]}.')
         return redirect('ships:ship_detail', ship_id=ship_id)
@@ -225,6 +225,7 @@ def hire_crew(request, ship_id):
 
 
 @login_required
+@query_budget(4)
 def ship_status_api(request, ship_id):
     """API para obtener estado del barco"""
     player = get_object_or_404(Player, user=request.user)
@@ -239,6 +240,7 @@ def ship_status_api(request, ship_id):
         'cargo_weight': ship.current_cargo_weight,
         'available_cargo': ship.available_cargo_space,
         'is_operational': ship.is_operational,
+        'fleet': FleetSummary.for_player(player),
     }
     
     return JsonResponse(data)
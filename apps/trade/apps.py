@@ -5,3 +5,6 @@ class TradeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.trade'
     verbose_name = 'Comercio - Age of Voyage'
+
+    def ready(self):
+        import apps.trade.signals
@@ -0,0 +1,35 @@
+"""
+Comando para registrar el historial de precios del tick actual y compactar el historial antiguo
+"""
+from django.core.management.base import BaseCommand
+
+from apps.trade.services.price_history_service import PriceHistoryService
+
+
+class Command(BaseCommand):
+    help = 'Registrar los precios del tick de mercado actual y compactar el historial antiguo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rollup',
+            action='store_true',
+            help='Compactar también el historial antiguo en agregados por hora y por día',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Registrar aunque el tick actual ya esté registrado',
+        )
+
+    def handle(self, *args, **options):
+        written = PriceHistoryService.record_snapshot(force=options['force'])
+        if written:
+            self.stdout.write(self.style.SUCCESS(f'📈 Registrados {written} precios del tick actual'))
+        else:
+            self.stdout.write('⏭️ El tick actual ya estaba registrado.')
+
+        if options['rollup']:
+            result = PriceHistoryService.rollup()
+            self.stdout.write(self.style.SUCCESS(
+                f"🗜️ Compactación: {result['hourly_created']} buckets horarios, {result['daily_created']} diarios"
+            ))
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exploration', '0002_initial'),
+        ('trade', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistoryDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('open_price', models.IntegerField()),
+                ('high_price', models.IntegerField()),
+                ('low_price', models.IntegerField()),
+                ('close_price', models.IntegerField()),
+                ('average_price', models.FloatField()),
+                ('samples', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Historial de Precios Diario',
+                'verbose_name_plural': 'Historiales de Precios Diarios',
+                'ordering': ['-bucket_start'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceHistoryHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('open_price', models.IntegerField()),
+                ('high_price', models.IntegerField()),
+                ('low_price', models.IntegerField()),
+                ('close_price', models.IntegerField()),
+                ('average_price', models.FloatField()),
+                ('samples', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Historial de Precios por Hora',
+                'verbose_name_plural': 'Historiales de Precios por Hora',
+                'ordering': ['-bucket_start'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['resource', 'region', 'recorded_at'], name='trade_price_res_reg_rec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['recorded_at'], name='trade_price_recorded_idx'),
+        ),
+        migrations.AddField(
+            model_name='pricehistorydaily',
+            name='region',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exploration.region'),
+        ),
+        migrations.AddField(
+            model_name='pricehistorydaily',
+            name='resource',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trade.resource'),
+        ),
+        migrations.AddField(
+            model_name='pricehistoryhourly',
+            name='region',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exploration.region'),
+        ),
+        migrations.AddField(
+            model_name='pricehistoryhourly',
+            name='resource',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trade.resource'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='pricehistorydaily',
+            unique_together={('resource', 'region', 'bucket_start')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='pricehistoryhourly',
+            unique_together={('resource', 'region', 'bucket_start')},
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+        ('ships', '0005_hot_filter_indexes'),
+        ('trade', '0002_price_history_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trademission',
+            index=models.Index(fields=['player', '-started_at'], name='trade_mission_player_start_idx'),
+        ),
+    ]
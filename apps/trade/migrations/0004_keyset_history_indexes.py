@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0002_gold_transaction'),
+        ('ships', '0005_hot_filter_indexes'),
+        ('trade', '0003_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='trademission',
+            name='trade_mission_player_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='trademission',
+            index=models.Index(fields=['player', '-started_at', '-id'], name='trade_mission_player_start_idx'),
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from apps.core.dirty_fields import DirtyFieldsMixin
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
 from apps.exploration.models import Region
-import random
+from apps.trade.services.market_snapshot import MarketSnapshot
 from datetime import datetime, timedelta
 
 
@@ -46,26 +49,7 @@ class Resource(models.Model):
     
     def get_current_price(self, region=None):
         """Obtener precio actual del recurso, opcionalmente en una región específica"""
-        base = self.base_price
-        
-        # Fluctuación temporal (basada en la hora actual)
-        time_factor = random.uniform(0.8, 1.2)
-        
-        # Factor de región si se especifica
-        region_factor = 1.0
-        if region:
-            # Buscar si hay modificador específico para esta región
-            try:
-                region_resource = region.resources.get(resource=self)
-                region_factor = region_resource.base_price_modifier
-            except:
-                region_factor = random.uniform(0.7, 1.3)
-        
-        # Aplicar volatilidad
-        volatility_factor = random.uniform(1 - self.price_volatility, 1 + self.price_volatility)
-        
-        final_price = int(base * time_factor * region_factor * volatility_factor)
-        return max(1, final_price)
+        return MarketSnapshot.price(self, region)
 
 
 class TradeRoute(models.Model):
@@ -104,8 +88,9 @@ class TradeRoute(models.Model):
     
     def calculate_profit_potential(self, resource, quantity):
         """Calcular potencial de ganancia para un recurso"""
-        origin_price = resource.get_current_price(self.origin)
-        destination_price = resource.get_current_price(self.destination)
+        prices = MarketSnapshot.prices_for([resource], [self.origin, self.destination])
+        origin_price = prices.price(resource, self.origin)
+        destination_price = prices.price(resource, self.destination)
         
         profit_per_unit = destination_price - origin_price
         total_profit = profit_per_unit * quantity
@@ -124,7 +109,7 @@ class TradeRoute(models.Model):
         }
 
 
-class TradeMission(models.Model):
+class TradeMission(DirtyFieldsMixin, models.Model):
     """Misión comercial de un jugador"""
     
     STATUS_CHOICES = [
@@ -163,6 +148,9 @@ class TradeMission(models.Model):
         verbose_name = "Misión Comercial"
         verbose_name_plural = "Misiones Comerciales"
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['player', '-started_at', '-id'], name='trade_mission_player_start_idx'),
+        ]
     
     def __str__(self):
         return f"{self.player.captain_name} - {self.trade_route} ({self.get_status_display()})"
@@ -190,7 +178,7 @@ class TradeMission(models.Model):
             return False
         
         self.status = 'traveling'
-        self.departure_time = datetime.now()
+        self.departure_time = timezone.now()
         
         # Calcular tiempo estimado de llegada
         travel_time = self.trade_route.calculate_travel_time(self.ship.speed)
@@ -208,16 +196,19 @@ class TradeMission(models.Model):
         if self.status != 'traveling':
             return
         
-        if datetime.now() < self.estimated_arrival:
+        if timezone.now() < self.estimated_arrival:
             return  # Aún no ha llegado
         
         self.status = 'selling'
         
         # Procesar venta de cada item de carga
         total_revenue = 0
+        destination = self.trade_route.destination
+        cargo_items = list(self.cargo_items.select_related('resource'))
+        prices = MarketSnapshot.prices_for([item.resource for item in cargo_items], [destination])
         
-        for cargo_item in self.cargo_items.all():
-            current_price = cargo_item.resource.get_current_price(self.trade_route.destination)
+        for cargo_item in cargo_items:
+            current_price = prices.price(cargo_item.resource, destination)
             revenue = current_price * cargo_item.quantity
             total_revenue += revenue
             
@@ -230,7 +221,7 @@ class TradeMission(models.Model):
         self.final_profit = total_revenue - self.initial_investment - self.total_expenses
         
         # Agregar ganancia al jugador
-        self.player.gold += total_revenue
+        GoldLedger.credit(self.player, total_revenue, 'trade_revenue', f'trade_mission:{self.pk}')
         
         # Experiencia por comercio exitoso
         base_exp = 50
@@ -246,13 +237,13 @@ class TradeMission(models.Model):
         
         # Marcar como completada
         self.status = 'completed'
-        self.completed_at = datetime.now()
+        self.completed_at = timezone.now()
         
         # Liberar el barco
         self.ship.status = 'docked'
         self.ship.save()
         
-        self.player.save()
+        self.player.save(update_fields=['level', 'experience', 'total_trade_profit'])
         self.save()
 
 
@@ -317,6 +308,10 @@ class Market(models.Model):
     def __str__(self):
         return f"Mercado de {self.region.name}"
     
+    def get_price(self, resource):
+        """Precio actual de un recurso en este mercado"""
+        return resource.get_current_price(self.region)
+    
     def get_demand_modifier(self, resource):
         """Obtener modificador de demanda para un recurso específico"""
         base_modifier = 1.0
@@ -351,6 +346,49 @@ class PriceHistory(models.Model):
         verbose_name = "Historial de Precios"
         verbose_name_plural = "Historiales de Precios"
         ordering = ['-recorded_at']
+        indexes = [
+            models.Index(fields=['resource', 'region', 'recorded_at'], name='trade_price_res_reg_rec_idx'),
+            models.Index(fields=['recorded_at'], name='trade_price_recorded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.resource.name} en {self.region.name}: {self.price} oro"
+
+
+class PriceAggregate(models.Model):
+    """Agregado OHLC de precios para un intervalo de tiempo"""
+    
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE)
+    region = models.ForeignKey(Region, on_delete=models.CASCADE)
+    bucket_start = models.DateTimeField()
+    
+    open_price = models.IntegerField()
+    high_price = models.IntegerField()
+    low_price = models.IntegerField()
+    close_price = models.IntegerField()
+    average_price = models.FloatField()
+    samples = models.IntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+        ordering = ['-bucket_start']
+        unique_together = ['resource', 'region', 'bucket_start']
+    
+    def __str__(self):
+        return f"{self.resource.name} en {self.region.name} ({self.bucket_start:%Y-%m-%d %H:%M}): {self.close_price} oro"
+
+
+class PriceHistoryHourly(PriceAggregate):
+    """Historial de precios agregado por hora"""
+    
+    class Meta(PriceAggregate.Meta):
+        verbose_name = "Historial de Precios por Hora"
+        verbose_name_plural = "Historiales de Precios por Hora"
+
+
+class PriceHistoryDaily(PriceAggregate):
+    """Historial de precios agregado por día"""
+    
+    class Meta(PriceAggregate.Meta):
+        verbose_name = "Historial de Precios Diario"
+        verbose_name_plural = "Historiales de Precios Diarios"
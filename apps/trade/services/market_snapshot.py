@@ -0,0 +1,107 @@
+"""
+MarketSnapshot: Precios de mercado estables por tick.
+La tabla completa (recurso × región) se calcula una vez por tick, se guarda de forma
+compacta en la caché de Django y se sirve desde ahí hasta el siguiente tick, de modo
+que todos los workers ven los mismos precios.
+"""
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from apps.exploration.models import Region
+from apps.trade.services.pricing_engine import PriceMatrix, PricingEngine, current_tick, tick_bounds
+
+# Margen extra de vida en caché tras el fin del tick
+CACHE_GRACE_SECONDS = 30
+
+
+class MarketSnapshot:
+    CACHE_KEY = 'trade:market_snapshot:{tick}'
+
+    # Copia en memoria del snapshot del tick actual (por proceso)
+    _local = {}
+
+    @classmethod
+    def current(cls):
+        """Tabla de precios del tick actual."""
+        return cls.for_tick(current_tick())
+
+    @classmethod
+    def for_tick(cls, tick):
+        """Tabla de precios de un tick: memoria del proceso, caché compartida o cálculo."""
+        matrix = cls._local.get(tick)
+        if matrix is not None:
+            return matrix
+
+        key = cls.CACHE_KEY.format(tick=tick)
+        packed = cache.get(key)
+        if packed is None:
+            packed = cls._pack(cls.build(tick))
+            # El primer worker en escribir gana; el resto usa su copia
+            cache.add(key, packed, timeout=cls._timeout(tick))
+            packed = cache.get(key, packed)
+
+        matrix = cls._unpack(packed)
+        cls._local.clear()
+        cls._local[tick] = matrix
+        return matrix
+
+    @staticmethod
+    def build(tick):
+        """Calcula la tabla completa, incluyendo la columna sin región."""
+        from apps.trade.models import Resource
+
+        resources = Resource.objects.only('id', 'base_price', 'price_volatility')
+        region_ids = list(Region.objects.values_list('id', flat=True))
+        return PricingEngine.price_matrix(resources, region_ids + [None], tick=tick)
+
+    @classmethod
+    def prices_for(cls, resources, regions):
+        """Submatriz del snapshot; calcula al vuelo los pares creados después del tick."""
+        resources = list(resources)
+        regions = list(regions)
+        snapshot = cls.current()
+        if snapshot.covers(resources, regions):
+            return snapshot.subset(resources, regions)
+        return PricingEngine.price_matrix(resources, regions, tick=snapshot.tick)
+
+    @classmethod
+    def price(cls, resource, region=None):
+        """Precio de un recurso en una región según el snapshot actual."""
+        snapshot = cls.current()
+        if (resource, region) in snapshot:
+            return snapshot.price(resource, region)
+        return PricingEngine.price_matrix([resource], [region], tick=snapshot.tick).price(resource, region)
+
+    @classmethod
+    def invalidate(cls, tick=None):
+        """Descarta el snapshot de un tick (por defecto, el actual)."""
+        if tick is None:
+            tick = current_tick()
+        cls._local.pop(tick, None)
+        cache.delete(cls.CACHE_KEY.format(tick=tick))
+
+    @staticmethod
+    def _timeout(tick):
+        _, end = tick_bounds(tick)
+        return max(1, int(end - time.time()) + CACHE_GRACE_SECONDS)
+
+    @staticmethod
+    def _pack(matrix):
+        """Formato compacto: ids y precios como bytes de arrays de enteros."""
+        region_ids = [gid if gid is not None else 0 for gid in matrix.region_ids]
+        return (
+            matrix.tick,
+            np.asarray(matrix.resource_ids, dtype=np.int64).tobytes(),
+            np.asarray(region_ids, dtype=np.int64).tobytes(),
+            matrix.prices.astype(np.int32).tobytes(),
+        )
+
+    @staticmethod
+    def _unpack(packed):
+        tick, resource_bytes, region_bytes, price_bytes = packed
+        resource_ids = np.frombuffer(resource_bytes, dtype=np.int64).tolist()
+        region_ids = [gid or None for gid in np.frombuffer(region_bytes, dtype=np.int64).tolist()]
+        prices = np.frombuffer(price_bytes, dtype=np.int32).reshape(len(resource_ids), len(region_ids))
+        return PriceMatrix(tick, resource_ids, region_ids, prices)
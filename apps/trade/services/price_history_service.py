@@ -0,0 +1,264 @@
+"""
+PriceHistoryService: Registro y compactación del historial de precios.
+Cada tick de mercado se guarda con un único bulk_create; con muchas regiones solo
+se registra una muestra rotatoria de ellas, de modo que cada tick escribe como
+mucho PRICE_HISTORY_MAX_ROWS_PER_TICK filas. Las filas antiguas se agregan en
+tablas OHLC por hora y por día para mantener acotada la tabla cruda.
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.trade.models import PriceHistory, PriceHistoryHourly, PriceHistoryDaily
+from apps.trade.services.market_snapshot import MarketSnapshot
+
+BATCH_SIZE = 1000
+
+# Filas de historial por tick si GAME_SETTINGS no indica otra cosa
+DEFAULT_MAX_ROWS_PER_TICK = 100_000
+
+AGGREGATE_FIELDS = ['open_price', 'high_price', 'low_price', 'close_price', 'average_price', 'samples']
+
+
+def _hour_bucket(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _day_bucket(dt):
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class _Bucket:
+    """Acumulador OHLC de un intervalo."""
+
+    __slots__ = ('open', 'high', 'low', 'close', 'total', 'samples')
+
+    def __init__(self, open_price, high, low, close, total, samples):
+        self.open = open_price
+        self.high = high
+        self.low = low
+        self.close = close
+        self.total = total
+        self.samples = samples
+
+    def merge(self, high, low, close, total, samples):
+        self.high = max(self.high, high)
+        self.low = min(self.low, low)
+        self.close = close
+        self.total += total
+        self.samples += samples
+
+
+class PriceHistoryService:
+    RECORDED_KEY = 'trade:price_history:recorded:{tick}'
+
+    @staticmethod
+    def record_snapshot(force=False):
+        """
+        Guarda la tabla de precios del tick actual con un único bulk_create.
+        Si la tabla completa supera el máximo de filas por tick, se guardan solo
+        las regiones de la muestra que le toca al tick (ver sample_stride).
+        Devuelve el número de filas escritas (0 si el tick ya estaba registrado).
+        """
+        snapshot = MarketSnapshot.current()
+        key = PriceHistoryService.RECORDED_KEY.format(tick=snapshot.tick)
+        if not cache.add(key, True, timeout=24 * 3600) and not force:
+            return 0
+
+        regions = [(j, region_id) for j, region_id in enumerate(snapshot.region_ids) if region_id is not None]
+        stride = PriceHistoryService.sample_stride(len(snapshot.resource_ids) * len(regions))
+        if stride > 1:
+            regions = [(j, region_id) for j, region_id in regions if region_id % stride == snapshot.tick % stride]
+        rows = [
+            PriceHistory(resource_id=resource_id, region_id=region_id, price=int(snapshot.prices[i, j]))
+            for i, resource_id in enumerate(snapshot.resource_ids)
+            for j, region_id in regions
+        ]
+        PriceHistory.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        return len(rows)
+
+    @staticmethod
+    def sample_stride(pairs):
+        """
+        Cada cuántos ticks se registra una región para no pasar del máximo de filas
+        por tick: con un paso N, cada tick guarda las regiones con id % N == tick % N.
+        """
+        max_rows = settings.GAME_SETTINGS.get('PRICE_HISTORY_MAX_ROWS_PER_TICK', DEFAULT_MAX_ROWS_PER_TICK)
+        return max(1, math.ceil(pairs / max_rows))
+
+    @staticmethod
+    def rollup(now=None):
+        """Compacta crudo → horario y horario → diario según la retención configurada."""
+        now = now or timezone.now()
+        game_settings = settings.GAME_SETTINGS
+        raw_cutoff = _hour_bucket(now - timedelta(hours=game_settings.get('PRICE_HISTORY_RAW_RETENTION_HOURS', 48)))
+        hourly_cutoff = _day_bucket(now - timedelta(days=game_settings.get('PRICE_HISTORY_HOURLY_RETENTION_DAYS', 90)))
+
+        hourly = PriceHistoryService._rollup_raw(raw_cutoff)
+        daily = PriceHistoryService._rollup_hourly(hourly_cutoff)
+        return {'hourly_created': hourly, 'daily_created': daily}
+
+    @staticmethod
+    def _rollup_raw(cutoff):
+        """Agrega las filas crudas anteriores a `cutoff` en buckets horarios, un día por transacción."""
+        oldest = PriceHistory.objects.filter(recorded_at__lt=cutoff).order_by('recorded_at').values_list('recorded_at', flat=True).first()
+        if oldest is None:
+            return 0
+
+        created = 0
+        window_start = _hour_bucket(oldest)
+        while window_start < cutoff:
+            window_end = min(window_start + timedelta(days=1), cutoff)
+            with transaction.atomic():
+                window = PriceHistory.objects.filter(recorded_at__gte=window_start, recorded_at__lt=window_end)
+                buckets = {}
+                rows = window.order_by('resource_id', 'region_id', 'recorded_at').values_list(
+                    'resource_id', 'region_id', 'recorded_at', 'price'
+                )
+                for resource_id, region_id, recorded_at, price in rows.iterator(chunk_size=5000):
+                    key = (resource_id, region_id, _hour_bucket(recorded_at))
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        buckets[key] = _Bucket(price, price, price, price, price, 1)
+                    else:
+                        bucket.merge(price, price, price, price, 1)
+                created += PriceHistoryService._write_buckets(PriceHistoryHourly, buckets, window_start, window_end)
+                window.delete()
+            window_start = window_end
+        return created
+
+    @staticmethod
+    def _rollup_hourly(cutoff):
+        """Agrega los buckets horarios anteriores a `cutoff` en buckets diarios, un mes por transacción."""
+        oldest = PriceHistoryHourly.objects.filter(bucket_start__lt=cutoff).order_by('bucket_start').values_list('bucket_start', flat=True).first()
+        if oldest is None:
+            return 0
+
+        created = 0
+        window_start = _day_bucket(oldest)
+        while window_start < cutoff:
+            window_end = min(window_start + timedelta(days=30), cutoff)
+            with transaction.atomic():
+                window = PriceHistoryHourly.objects.filter(bucket_start__gte=window_start, bucket_start__lt=window_end)
+                buckets = {}
+                rows = window.order_by('resource_id', 'region_id', 'bucket_start').values_list(
+                    'resource_id', 'region_id', 'bucket_start',
+                    'open_price', 'high_price', 'low_price', 'close_price', 'average_price', 'samples',
+                )
+                for resource_id, region_id, bucket_start, open_price, high, low, close, average, samples in rows.iterator(chunk_size=5000):
+                    key = (resource_id, region_id, _day_bucket(bucket_start))
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        buckets[key] = _Bucket(open_price, high, low, close, average * samples, samples)
+                    else:
+                        bucket.merge(high, low, close, average * samples, samples)
+                created += PriceHistoryService._write_buckets(PriceHistoryDaily, buckets, window_start, window_end)
+                window.delete()
+            window_start = window_end
+        return created
+
+    @staticmethod
+    def _write_buckets(model, buckets, window_start, window_end):
+        """
+        Escribe los buckets de la ventana. Si alguno ya existe (una compactación
+        repetida o a medias) se combina con él en lugar de descartar las filas
+        nuevas: los datos guardados se toman como anteriores a los nuevos.
+        Devuelve el número de buckets nuevos.
+        """
+        existing = model.objects.filter(bucket_start__gte=window_start, bucket_start__lt=window_end).values_list(
+            'resource_id', 'region_id', 'bucket_start', *AGGREGATE_FIELDS
+        )
+        merged = 0
+        for resource_id, region_id, bucket_start, open_price, high, low, close, average, samples in existing.iterator(chunk_size=5000):
+            bucket = buckets.get((resource_id, region_id, bucket_start))
+            if bucket is None:
+                continue
+            combined = _Bucket(open_price, high, low, close, average * samples, samples)
+            combined.merge(bucket.high, bucket.low, bucket.close, bucket.total, bucket.samples)
+            buckets[(resource_id, region_id, bucket_start)] = combined
+            merged += 1
+
+        objs = [
+            model(
+                resource_id=resource_id,
+                region_id=region_id,
+                bucket_start=bucket_start,
+                open_price=bucket.open,
+                high_price=bucket.high,
+                low_price=bucket.low,
+                close_price=bucket.close,
+                average_price=bucket.total / bucket.samples if bucket.samples else 0,
+                samples=bucket.samples,
+            )
+            for (resource_id, region_id, bucket_start), bucket in buckets.items()
+        ]
+        model.objects.bulk_create(
+            objs,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['resource', 'region', 'bucket_start'],
+            update_fields=AGGREGATE_FIELDS,
+        )
+        return len(objs) - merged
+
+    @staticmethod
+    def get_price_series(resource, region, resolution='hourly', since=None):
+        """Serie OHLC de un recurso en una región, leída de las tablas agregadas."""
+        model = PriceHistoryDaily if resolution == 'daily' else PriceHistoryHourly
+        qs = model.objects.filter(resource=resource, region=region)
+        if since:
+            qs = qs.filter(bucket_start__gte=since)
+        series = list(qs.order_by('bucket_start').values(
+            'bucket_start', 'open_price', 'high_price', 'low_price', 'close_price', 'average_price', 'samples'
+        ))
+        if resolution == 'daily':
+            return series
+
+        # Las horas aún no compactadas se agregan desde la tabla cruda (rango acotado por índice)
+        raw = PriceHistory.objects.filter(resource=resource, region=region)
+        if series:
+            raw = raw.filter(recorded_at__gte=series[-1]['bucket_start'] + timedelta(hours=1))
+        elif since:
+            raw = raw.filter(recorded_at__gte=since)
+        buckets = {}
+        for recorded_at, price in raw.order_by('recorded_at').values_list('recorded_at', 'price').iterator():
+            key = _hour_bucket(recorded_at)
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = _Bucket(price, price, price, price, price, 1)
+            else:
+                bucket.merge(price, price, price, price, 1)
+        series.extend(
+            {
+                'bucket_start': bucket_start,
+                'open_price': bucket.open,
+                'high_price': bucket.high,
+                'low_price': bucket.low,
+                'close_price': bucket.close,
+                'average_price': bucket.total / bucket.samples,
+                'samples': bucket.samples,
+            }
+            for bucket_start, bucket in buckets.items()
+        )
+        return series
+
+    @staticmethod
+    def get_price_trend(resource, region, days=7):
+        """Variación porcentual del precio de cierre diario en los últimos `days` días."""
+        since = _day_bucket(timezone.now() - timedelta(days=days))
+        closes = list(
+            PriceHistoryDaily.objects.filter(resource=resource, region=region, bucket_start__gte=since)
+            .order_by('bucket_start').values_list('close_price', flat=True)
+        )
+        if len(closes) < 2:
+            closes = list(
+                PriceHistoryHourly.objects.filter(resource=resource, region=region, bucket_start__gte=since)
+                .order_by('bucket_start').values_list('close_price', flat=True)
+            )
+        if len(closes) < 2 or not closes[0]:
+            return 0.0
+        return round((closes[-1] - closes[0]) / closes[0] * 100, 2)
@@ -0,0 +1,204 @@
+"""
+PricingEngine: Cálculo vectorizado de precios de mercado.
+Calcula la tabla completa de precios (recurso × región) con NumPy en una sola pasada,
+cargando todos los modificadores regionales con una única consulta.
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+
+from apps.exploration.models import RegionResource
+
+# Duración por defecto de un tick de mercado en segundos
+DEFAULT_TICK_SECONDS = 300
+
+# Semilla base del generador de precios
+PRICE_SEED = 0x41_67_65_4F_66_56
+
+# Flujos de ruido independientes dentro de un mismo tick
+_TIME_STREAM = 1
+_REGION_STREAM = 2
+_VOLATILITY_STREAM = 3
+
+# Identificador usado para la columna "sin región"
+_NO_REGION_ID = 0
+
+_UINT64_MASK = (1 << 64) - 1
+
+
+def tick_seconds():
+    """Duración configurada de un tick de mercado (GAME_SETTINGS['MARKET_TICK_SECONDS'])."""
+    return settings.GAME_SETTINGS.get('MARKET_TICK_SECONDS', DEFAULT_TICK_SECONDS)
+
+
+def current_tick(now=None):
+    """Número de tick de mercado para un instante dado (epoch en segundos)."""
+    if now is None:
+        now = time.time()
+    return int(now // tick_seconds())
+
+
+def tick_bounds(tick):
+    """Inicio y fin (epoch en segundos) de un tick."""
+    length = tick_seconds()
+    return tick * length, (tick + 1) * length
+
+
+def _uniform_noise(tick, resource_ids, region_ids, stream):
+    """
+    Ruido uniforme en [0, 1) determinista por (tick, recurso, región, flujo).
+    Usa el finalizador splitmix64 sobre arrays uint64, de modo que un mismo par
+    obtiene el mismo valor sin importar qué subconjunto de la tabla se calcule.
+    """
+    key = np.uint64(
+        (PRICE_SEED ^ (tick * 0x9E3779B97F4A7C15) ^ (stream * 0xD1B54A32D192ED03)) & _UINT64_MASK
+    )
+    z = (
+        key
+        ^ (resource_ids.astype(np.uint64) * np.uint64(0xBF58476D1CE4E5B9))
+        ^ (region_ids.astype(np.uint64) * np.uint64(0x94D049BB133111EB))
+    )
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+class PriceMatrix:
+    """Tabla de precios recurso × región calculada para un tick."""
+
+    __slots__ = ('tick', 'resource_ids', 'region_ids', 'prices', '_resource_index', '_region_index', '_lookups')
+
+    def __init__(self, tick, resource_ids, region_ids, prices):
+        self.tick = tick
+        self.resource_ids = resource_ids
+        self.region_ids = region_ids
+        self.prices = prices
+        self._resource_index = {rid: i for i, rid in enumerate(resource_ids)}
+        self._region_index = {gid: j for j, gid in enumerate(region_ids)}
+        self._lookups = {}
+
+    def __contains__(self, key):
+        resource, region = key
+        return (
+            _pk(resource) in self._resource_index
+            and _pk(region) in self._region_index
+        )
+
+    def covers(self, resources, regions):
+        """Indica si la tabla contiene todos los pares (recurso, región) pedidos."""
+        return (
+            all(_pk(r) in self._resource_index for r in resources)
+            and all(_pk(g) in self._region_index for g in regions)
+        )
+
+    def price(self, resource, region=None):
+        """Precio de un recurso en una región (o sin región si es None)."""
+        i = self._resource_index[_pk(resource)]
+        j = self._region_index[_pk(region)]
+        return int(self.prices[i, j])
+
+    def prices_for_region(self, region):
+        """Diccionario {resource_id: precio} para una región."""
+        j = self._region_index[_pk(region)]
+        return dict(zip(self.resource_ids, self.prices[:, j].tolist()))
+
+    def subset(self, resources, regions):
+        """Submatriz para los recursos y regiones indicados (en ese orden)."""
+        resource_ids = [_pk(r) for r in resources]
+        region_ids = [_pk(g) for g in regions]
+        rows = [self._resource_index[rid] for rid in resource_ids]
+        cols = [self._region_index[gid] for gid in region_ids]
+        return PriceMatrix(self.tick, resource_ids, region_ids, self.prices[np.ix_(rows, cols)])
+
+    def resource_rows(self, resource_ids):
+        """Fila de cada id de recurso (array NumPy); -1 si no está en la tabla."""
+        return self._positions('resource', self._resource_index, resource_ids)
+
+    def region_columns(self, region_ids):
+        """Columna de cada id de región (array NumPy); -1 si no está en la tabla."""
+        return self._positions('region', self._region_index, region_ids)
+
+    def _positions(self, name, index, ids):
+        lookup = self._lookups.get(name)
+        if lookup is None:
+            known = [key for key in index if key is not None]
+            lookup = np.full(max(known, default=0) + 1, -1, dtype=np.int64)
+            for key in known:
+                lookup[key] = index[key]
+            self._lookups[name] = lookup
+        ids = np.asarray(ids, dtype=np.int64)
+        positions = np.full(ids.shape, -1, dtype=np.int64)
+        in_range = (ids >= 0) & (ids < len(lookup))
+        positions[in_range] = lookup[ids[in_range]]
+        return positions
+
+    def as_dict(self):
+        """Tabla completa como {(resource_id, region_id): precio}."""
+        return {
+            (rid, gid): int(self.prices[i, j])
+            for i, rid in enumerate(self.resource_ids)
+            for j, gid in enumerate(self.region_ids)
+        }
+
+
+def _pk(obj):
+    """Admite instancias de modelo, ids o None."""
+    if obj is None or isinstance(obj, int):
+        return obj
+    return obj.pk
+
+
+class PricingEngine:
+    @staticmethod
+    def price_matrix(resources, regions, tick=None):
+        """
+        Calcula los precios de todos los pares (recurso, región).
+        `regions` puede incluir None para el precio sin modificador regional.
+        """
+        if tick is None:
+            tick = current_tick()
+
+        resources = list(resources)
+        regions = list(regions)
+        resource_ids = [r.pk for r in resources]
+        region_ids = [_pk(g) for g in regions]
+
+        if not resources or not regions:
+            return PriceMatrix(tick, resource_ids, region_ids, np.zeros((len(resources), len(regions)), dtype=np.int64))
+
+        base = np.array([r.base_price for r in resources], dtype=np.float64)[:, None]
+        volatility = np.array([r.price_volatility for r in resources], dtype=np.float64)[:, None]
+        res_col = np.array(resource_ids, dtype=np.int64)[:, None]
+        reg_row = np.array([gid if gid is not None else _NO_REGION_ID for gid in region_ids], dtype=np.int64)[None, :]
+
+        # Fluctuación temporal del recurso, común a todas las regiones
+        time_factor = 0.8 + 0.4 * _uniform_noise(tick, res_col, np.zeros_like(res_col), _TIME_STREAM)
+
+        # Modificador regional: RegionResource si existe, si no uno implícito en [0.7, 1.3)
+        region_factor = 0.7 + 0.6 * _uniform_noise(tick, res_col, reg_row, _REGION_STREAM)
+        real_region_ids = [gid for gid in region_ids if gid is not None]
+        if real_region_ids:
+            resource_index = {rid: i for i, rid in enumerate(resource_ids)}
+            region_index = {gid: j for j, gid in enumerate(region_ids)}
+            modifiers = RegionResource.objects.filter(
+                resource_id__in=resource_ids,
+                region_id__in=real_region_ids,
+            ).values_list('resource_id', 'region_id', 'base_price_modifier')
+            rows, cols, values = [], [], []
+            for resource_id, region_id, modifier in modifiers:
+                rows.append(resource_index[resource_id])
+                cols.append(region_index[region_id])
+                values.append(modifier)
+            if rows:
+                region_factor[rows, cols] = values
+        no_region = reg_row[0] == _NO_REGION_ID
+        region_factor[:, no_region] = 1.0
+
+        # Volatilidad propia del recurso en cada mercado
+        volatility_factor = 1 - volatility + 2 * volatility * _uniform_noise(tick, res_col, reg_row, _VOLATILITY_STREAM)
+
+        prices = np.floor(base * time_factor * region_factor * volatility_factor)
+        prices = np.maximum(1, prices).astype(np.int64)
+        return PriceMatrix(tick, resource_ids, region_ids, prices)
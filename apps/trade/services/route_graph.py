@@ -0,0 +1,67 @@
+"""
+RouteGraph: Grafo en memoria de las rutas comerciales activas.
+Se carga una sola vez por proceso y se reutiliza mientras no cambie la versión
+de la tabla de rutas (DataVersion; se incrementa al guardar o borrar un TradeRoute).
+"""
+import numpy as np
+
+from apps.core.data_versions import DataVersion
+
+
+class RouteGraph:
+    """Arrays paralelos con los datos de cada ruta activa."""
+
+    VERSION_KEY = 'trade:route_graph:version'
+
+    # Grafo cargado en este proceso
+    _local = {}
+
+    __slots__ = (
+        'version', 'route_ids', 'origin_ids', 'destination_ids', 'distances',
+        'danger_levels', 'base_seconds', 'required_speeds', 'required_levels',
+    )
+
+    def __init__(self, version, rows):
+        self.version = version
+        columns = list(zip(*rows)) if rows else [()] * 8
+        self.route_ids = np.array(columns[0], dtype=np.int64)
+        self.origin_ids = np.array(columns[1], dtype=np.int64)
+        self.destination_ids = np.array(columns[2], dtype=np.int64)
+        self.distances = np.array(columns[3], dtype=np.int64)
+        self.danger_levels = np.array(columns[4], dtype=np.int64)
+        self.base_seconds = np.array([d.total_seconds() for d in columns[5]], dtype=np.float64)
+        self.required_speeds = np.array(columns[6], dtype=np.int64)
+        self.required_levels = np.array(columns[7], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.route_ids)
+
+    @classmethod
+    def load(cls, version=None):
+        """Carga todas las rutas activas con una única consulta."""
+        from apps.trade.models import TradeRoute
+
+        rows = list(TradeRoute.objects.filter(is_active=True).order_by('id').values_list(
+            'id', 'origin_id', 'destination_id', 'distance', 'danger_level',
+            'base_travel_time', 'required_ship_speed', 'required_level',
+        ))
+        return cls(version, rows)
+
+    @classmethod
+    def current(cls):
+        """Grafo de la versión vigente de la tabla de rutas."""
+        version = cls.get_version()
+        graph = cls._local.get('graph')
+        if graph is None or graph.version != version:
+            graph = cls.load(version)
+            cls._local['graph'] = graph
+        return graph
+
+    @classmethod
+    def get_version(cls):
+        return DataVersion.get(cls.VERSION_KEY)
+
+    @classmethod
+    def bump_version(cls):
+        """Invalida el grafo en los procesos que comparten la caché de versiones."""
+        DataVersion.bump(cls.VERSION_KEY)
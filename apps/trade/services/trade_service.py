@@ -5,7 +5,12 @@ Reutilizable y desacoplada de las vistas.
 from apps.trade.models import Resource, TradeRoute, TradeMission, TradeMissionCargo, Market
 from apps.players.models import Player
 from apps.ships.models import Ship
+from apps.trade.services.market_snapshot import MarketSnapshot
+from apps.trade.services.route_graph import RouteGraph
+from apps.trade.services.voyage_planner import VoyagePlanner
 from django.utils import timezone
+from datetime import timedelta
+import numpy as np
 import random
 
 class TradeService:
@@ -47,7 +52,12 @@ class TradeService:
     @staticmethod
     def get_resource_price(resource: Resource, region=None):
         """Obtiene el precio actual de un recurso en una región."""
-        return resource.get_current_price(region)
+        return MarketSnapshot.price(resource, region)
+
+    @staticmethod
+    def get_price_matrix(resources, regions):
+        """Obtiene la tabla de precios del tick actual para todos los pares (recurso, región)."""
+        return MarketSnapshot.prices_for(resources, regions)
 
     @staticmethod
     def get_trade_routes(origin=None, destination=None):
@@ -58,3 +68,87 @@ class TradeService:
         if destination:
             qs = qs.filter(destination=destination)
         return qs
+
+    @staticmethod
+    def plan_voyage(origin, destination, ship: Ship):
+        """Planifica un viaje de varias escalas entre dos regiones para un barco."""
+        return VoyagePlanner.plan(origin, destination, ship.speed)
+
+    @staticmethod
+    def find_best_routes(player: Player, ship: Ship, top_k: int = 5):
+        """
+        Devuelve las `top_k` mejores combinaciones (ruta, recurso, cantidad) por
+        ganancia esperada por hora, usando el grafo de rutas en memoria y el
+        snapshot de precios del tick actual.
+        """
+        graph = RouteGraph.current()
+        resources = list(Resource.objects.filter(required_level__lte=player.level).values_list('id', 'weight'))
+        if not len(graph) or not resources or top_k <= 0:
+            return []
+
+        snapshot = MarketSnapshot.current()
+        resource_ids = np.array([rid for rid, _ in resources], dtype=np.int64)
+        weights = np.maximum(1, np.array([weight for _, weight in resources], dtype=np.int64))
+
+        rows = snapshot.resource_rows(resource_ids)
+        origin_cols = snapshot.region_columns(graph.origin_ids)
+        destination_cols = snapshot.region_columns(graph.destination_ids)
+
+        # Rutas navegables por este barco y jugador, con precios conocidos
+        route_ok = (
+            (graph.required_levels <= player.level)
+            & (graph.required_speeds <= ship.speed)
+            & (origin_cols >= 0)
+            & (destination_cols >= 0)
+        )
+        resource_ok = rows >= 0
+        if not route_ok.any() or not resource_ok.any():
+            return []
+
+        prices = np.asarray(snapshot.prices, dtype=np.int64)
+        safe_rows = np.where(resource_ok, rows, 0)[:, None]
+        origin_prices = prices[safe_rows, np.where(route_ok, origin_cols, 0)[None, :]]
+        destination_prices = prices[safe_rows, np.where(route_ok, destination_cols, 0)[None, :]]
+
+        # Cantidad limitada por bodega y por el oro disponible
+        capacity_qty = (ship.cargo_capacity // weights)[:, None]
+        affordable_qty = player.gold // np.maximum(1, origin_prices)
+        quantity = np.minimum(capacity_qty, affordable_qty)
+
+        # Misma fórmula que TradeRoute.calculate_profit_potential / calculate_travel_time
+        risk_factor = 1 - graph.danger_levels * 0.05
+        expected_profit = (destination_prices - origin_prices) * quantity * risk_factor[None, :]
+        travel_seconds = graph.base_seconds / max(0.1, ship.speed / 10.0)
+        profit_per_hour = expected_profit / np.maximum(travel_seconds, 1.0)[None, :] * 3600
+
+        valid = resource_ok[:, None] & route_ok[None, :] & (quantity > 0) & (expected_profit > 0)
+        scores = np.where(valid, profit_per_hour, -np.inf).ravel()
+        candidates = int(np.count_nonzero(valid))
+        if not candidates:
+            return []
+
+        k = min(top_k, candidates)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        resource_pos, route_pos = np.unravel_index(best, valid.shape)
+
+        routes = TradeRoute.objects.select_related('origin', 'destination').in_bulk(graph.route_ids[route_pos].tolist())
+        resources_by_id = Resource.objects.in_bulk(resource_ids[resource_pos].tolist())
+
+        results = []
+        for i, j in zip(resource_pos.tolist(), route_pos.tolist()):
+            route = routes.get(int(graph.route_ids[j]))
+            resource = resources_by_id.get(int(resource_ids[i]))
+            if route is None or resource is None:
+                continue
+            results.append({
+                'route': route,
+                'resource': resource,
+                'quantity': int(quantity[i, j]),
+                'origin_price': int(origin_prices[i, j]),
+                'destination_price': int(destination_prices[i, j]),
+                'expected_profit': float(expected_profit[i, j]),
+                'profit_per_hour': float(profit_per_hour[i, j]),
+                'travel_time': timedelta(seconds=float(travel_seconds[j])),
+            })
+        return results
@@ -0,0 +1,151 @@
+"""
+VoyagePlanner: Planificación de viajes de varias escalas sobre las rutas comerciales.
+Ejecuta A* sobre el grafo de rutas con una heurística euclidiana basada en las
+coordenadas de las regiones y memoriza los resultados en una LRU.
+"""
+import heapq
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+
+from apps.trade.services.route_graph import RouteGraph
+
+
+@dataclass(frozen=True)
+class VoyagePlan:
+    """Ruta de varias escalas entre dos regiones."""
+
+    region_ids: tuple
+    route_ids: tuple
+    distance: int
+    base_seconds: float
+    travel_time: timedelta
+
+    @property
+    def legs(self):
+        return len(self.route_ids)
+
+
+class _Network:
+    """Lista de adyacencia y coordenadas derivadas de un RouteGraph."""
+
+    __slots__ = ('version', 'adjacency', 'coordinates', 'seconds_per_unit', 'max_required_speed')
+
+    def __init__(self, graph):
+        from apps.exploration.models import Region
+
+        self.version = graph.version
+        self.coordinates = {
+            region_id: (x, y)
+            for region_id, x, y in Region.objects.values_list('id', 'x_coordinate', 'y_coordinate')
+        }
+        self.adjacency = {}
+        self.seconds_per_unit = math.inf
+        self.max_required_speed = 0
+        for route_id, origin, destination, distance, seconds, required_speed in zip(
+            graph.route_ids.tolist(), graph.origin_ids.tolist(), graph.destination_ids.tolist(),
+            graph.distances.tolist(), graph.base_seconds.tolist(), graph.required_speeds.tolist(),
+        ):
+            self.adjacency.setdefault(origin, []).append((destination, seconds, required_speed, route_id, distance))
+            self.max_required_speed = max(self.max_required_speed, required_speed)
+            # Cota inferior de segundos por unidad de mapa para que la heurística sea admisible
+            span = self._euclidean(origin, destination)
+            if span > 0:
+                self.seconds_per_unit = min(self.seconds_per_unit, seconds / span)
+        if self.seconds_per_unit is math.inf:
+            self.seconds_per_unit = 0.0
+
+    def _euclidean(self, a, b):
+        ax, ay = self.coordinates.get(a, (0, 0))
+        bx, by = self.coordinates.get(b, (0, 0))
+        return math.hypot(ax - bx, ay - by)
+
+    def a_star(self, origin, destination, speed):
+        """Camino de menor tiempo base usando solo rutas navegables a esta velocidad."""
+        if origin == destination:
+            return (origin,), (), 0, 0.0
+
+        goal_x, goal_y = self.coordinates.get(destination, (0, 0))
+
+        def heuristic(node):
+            x, y = self.coordinates.get(node, (goal_x, goal_y))
+            return math.hypot(x - goal_x, y - goal_y) * self.seconds_per_unit
+
+        best = {origin: 0.0}
+        came_from = {}
+        frontier = [(heuristic(origin), 0.0, origin)]
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node == destination:
+                break
+            if cost > best.get(node, math.inf):
+                continue
+            for neighbor, seconds, required_speed, route_id, distance in self.adjacency.get(node, ()):
+                if required_speed > speed:
+                    continue
+                new_cost = cost + seconds
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = (node, route_id, distance)
+                    heapq.heappush(frontier, (new_cost + heuristic(neighbor), new_cost, neighbor))
+        else:
+            return None
+
+        regions, routes, total_distance = [destination], [], 0
+        node = destination
+        while node != origin:
+            node, route_id, distance = came_from[node]
+            regions.append(node)
+            routes.append(route_id)
+            total_distance += distance
+        return tuple(reversed(regions)), tuple(reversed(routes)), total_distance, best[destination]
+
+
+_networks = {}
+
+
+def _network(version):
+    network = _networks.get('current')
+    if network is None or network.version != version:
+        network = _Network(RouteGraph.current())
+        _networks['current'] = network
+    return network
+
+
+@lru_cache(maxsize=4096)
+def _cached_path(version, origin_id, destination_id, speed_bucket):
+    return _network(version).a_star(origin_id, destination_id, speed_bucket)
+
+
+class VoyagePlanner:
+    @staticmethod
+    def plan(origin, destination, ship_speed):
+        """
+        Planifica el viaje más rápido entre dos regiones para una velocidad de barco.
+        Devuelve un VoyagePlan o None si no existe ruta navegable.
+        """
+        origin_id = getattr(origin, 'pk', origin)
+        destination_id = getattr(destination, 'pk', destination)
+        version = RouteGraph.get_version()
+
+        # Por encima de la máxima velocidad exigida, todas las velocidades comparten camino
+        speed_bucket = min(int(ship_speed), _network(version).max_required_speed)
+        path = _cached_path(version, origin_id, destination_id, speed_bucket)
+        if path is None:
+            return None
+
+        region_ids, route_ids, distance, base_seconds = path
+        speed_factor = max(0.1, ship_speed / 10.0)
+        return VoyagePlan(
+            region_ids=region_ids,
+            route_ids=route_ids,
+            distance=distance,
+            base_seconds=base_seconds,
+            travel_time=timedelta(seconds=base_seconds / speed_factor),
+        )
+
+    @staticmethod
+    def clear_cache():
+        _cached_path.cache_clear()
+        _networks.clear()
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import TradeRoute
+from .services.route_graph import RouteGraph
+
+@receiver(post_save, sender=TradeRoute)
+@receiver(post_delete, sender=TradeRoute)
+def invalidate_route_graph(sender, instance, **kwargs):
+    RouteGraph.bump_version()
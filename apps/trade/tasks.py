@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from .services.price_history_service import PriceHistoryService
+
+
+@shared_task
+def record_market_prices():
+    """Registra la tabla de precios del tick de mercado actual."""
+    return PriceHistoryService.record_snapshot()
+
+
+@shared_task
+def rollup_price_history():
+    """Compacta el historial de precios antiguo en agregados OHLC."""
+    return PriceHistoryService.rollup()
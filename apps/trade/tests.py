@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from apps.exploration.models import Region, RegionResource
+from apps.players.models import Player
+from apps.ships.models import Ship, ShipType
+from apps.trade.models import (
+    Market, PriceHistory, PriceHistoryDaily, PriceHistoryHourly, Resource, TradeMission, TradeRoute,
+)
+from apps.trade.services.market_snapshot import MarketSnapshot
+from apps.trade.services.price_history_service import PriceHistoryService
+from apps.trade.services.route_graph import RouteGraph
+
+
+class BestRoutesApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('trader', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Mercader')
+        ship_type = ShipType.objects.create(
+            name='Carraca de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        cls.ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Carraca', speed=5, cargo_capacity=100,
+            firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.player.user)
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'ship_id': 'abc'}, {'ship_id': self.ship.pk, 'top': 'abc'}, {}):
+            with self.subTest(params=params):
+                response = self.client.get('/trade/api/best-routes/', params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_valid_parameters(self):
+        response = self.client.get('/trade/api/best-routes/', {'ship_id': self.ship.pk, 'top': 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'routes': []})
+
+
+class TradePostsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('merchant', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Tendera')
+        cls.resource = Resource.objects.create(
+            name='Especias de pruebas', description='', category='luxury', weight=1, base_price=100,
+        )
+        cls.markets = []
+        for i, modifier in enumerate((0.5, 2.0)):
+            region = Region.objects.create(
+                name=f'Puerto de mercado {i}', description='', region_type='port', climate='temperate',
+                difficulty='easy', x_coordinate=i * 10, y_coordinate=0,
+            )
+            RegionResource.objects.create(
+                region=region, resource=cls.resource, abundance='common', base_price_modifier=modifier,
+            )
+            cls.markets.append(Market.objects.create(region=region))
+
+    def setUp(self):
+        caches['default'].clear()
+        MarketSnapshot._local.clear()
+        self.client.force_login(self.player.user)
+        # Mismo tick para la vista y para las comprobaciones
+        for target in ('apps.trade.services.pricing_engine.current_tick', 'apps.trade.services.market_snapshot.current_tick'):
+            patcher = mock.patch(target, return_value=1000)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_prices_match_each_market(self):
+        response = self.client.get('/trade/posts/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'trade/trade_posts.html')
+        markets = {market.pk: market for market in response.context['markets']}
+        self.assertEqual(set(markets), {market.pk for market in self.markets})
+        for market in self.markets:
+            prices = dict(markets[market.pk].resource_prices)
+            self.assertEqual(
+                {resource.pk: price for resource, price in prices.items()},
+                {resource.pk: market.get_price(resource) for resource in Resource.objects.all()},
+            )
+            self.assertContains(response, f'{market.get_price(self.resource)} oro')
+        # El modificador regional se refleja en el precio
+        cheap, dear = (market.get_price(self.resource) for market in self.markets)
+        self.assertLess(cheap, dear)
+
+
+class TradeHistoryViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('historian', password='x')
+        cls.player = Player.objects.create(user=user, captain_name='Cronista')
+        ship_type = ShipType.objects.create(
+            name='Urca de pruebas', description='', base_speed=5, base_cargo_capacity=100, base_firepower=10,
+            base_defense=10, base_crew_capacity=10, purchase_cost=100, maintenance_cost_per_day=1,
+        )
+        ship = Ship.objects.create(
+            owner=cls.player, ship_type=ship_type, name='Urca', speed=5, cargo_capacity=100,
+            firepower=10, defense=10, crew_capacity=10, crew_count=10,
+        )
+        regions = [
+            Region.objects.create(
+                name=f'Puerto de historial {i}', description='', region_type='port', climate='temperate',
+                difficulty='easy', x_coordinate=i * 10, y_coordinate=0,
+            )
+            for i in range(2)
+        ]
+        route = TradeRoute.objects.create(
+            origin=regions[0], destination=regions[1], distance=10, base_travel_time=timedelta(hours=1),
+        )
+        cls.missions = [
+            TradeMission.objects.create(player=cls.player, ship=ship, trade_route=route, status='completed')
+            for _ in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.player.user)
+
+    @mock.patch('apps.trade.views.TRADE_HISTORY_PER_PAGE', 2)
+    def test_cursor_navigation(self):
+        response = self.client.get('/trade/history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'trade/history.html')
+        self.assertEqual([mission.pk for mission in response.context['missions']],
+                         [mission.pk for mission in self.missions[:0:-1]])
+        next_cursor = response.context['next_cursor']
+        self.assertContains(response, 'Siguiente')
+        self.assertNotContains(response, 'Más recientes')
+
+        response = self.client.get('/trade/history/', {'cursor': next_cursor})
+
+        self.assertEqual([mission.pk for mission in response.context['missions']], [self.missions[0].pk])
+        self.assertIsNone(response.context['next_cursor'])
+        self.assertContains(response, 'Más recientes')
+        self.assertNotContains(response, 'Siguiente')
+
+
+class RouteGraphTests(TestCase):
+    def setUp(self):
+        caches['versions'].clear()
+        self.regions = [
+            Region.objects.create(
+                name=f'Región de rutas {i}', description='', region_type='port', climate='temperate',
+                difficulty='easy', x_coordinate=i * 10, y_coordinate=0,
+            )
+            for i in range(3)
+        ]
+
+    def _route(self, origin, destination):
+        return TradeRoute.objects.create(
+            origin=origin, destination=destination, distance=10, base_travel_time=timedelta(hours=1),
+        )
+
+    def test_saving_a_route_invalidates_the_graph_on_commit(self):
+        first = self._route(self.regions[0], self.regions[1])
+        self.assertEqual(RouteGraph.current().route_ids.tolist(), [first.pk])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = self._route(self.regions[1], self.regions[2])
+        # Hasta que se confirma la transacción los demás procesos siguen con la versión anterior
+        self.assertEqual(RouteGraph.current().route_ids.tolist(), [first.pk])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(RouteGraph.current().route_ids.tolist(), [first.pk, second.pk])
+
+
+class PriceHistoryServiceTests(TestCase):
+    HOUR = datetime(2026, 1, 5, 10, tzinfo=dt_timezone.utc)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.resource = Resource.objects.create(
+            name='Seda de pruebas', description='', category='textiles', weight=1, base_price=50,
+        )
+        cls.regions = [
+            Region.objects.create(
+                name=f'Puerto de precios {i}', description='', region_type='port', climate='temperate',
+                difficulty='easy', x_coordinate=i, y_coordinate=0,
+            )
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        caches['default'].clear()
+        MarketSnapshot._local.clear()
+
+    def _raw(self, minutes, price):
+        row = PriceHistory.objects.create(resource=self.resource, region=self.regions[0], price=price)
+        PriceHistory.objects.filter(pk=row.pk).update(recorded_at=self.HOUR + timedelta(minutes=minutes))
+
+    def test_record_snapshot_writes_each_pair_once_per_tick(self):
+        pairs = Resource.objects.count() * Region.objects.count()
+
+        self.assertEqual(PriceHistoryService.record_snapshot(), pairs)
+        self.assertEqual(PriceHistoryService.record_snapshot(), 0)
+        self.assertEqual(PriceHistory.objects.count(), pairs)
+
+    def test_record_snapshot_samples_regions_above_the_row_limit(self):
+        pairs = Resource.objects.count() * Region.objects.count()
+        game_settings = {**settings.GAME_SETTINGS, 'PRICE_HISTORY_MAX_ROWS_PER_TICK': -(-pairs // 2)}
+
+        with override_settings(GAME_SETTINGS=game_settings):
+            written = PriceHistoryService.record_snapshot()
+
+        tick = MarketSnapshot.current().tick
+        region_ids = set(PriceHistory.objects.values_list('region_id', flat=True))
+        self.assertEqual(written, PriceHistory.objects.count())
+        self.assertLessEqual(written, game_settings['PRICE_HISTORY_MAX_ROWS_PER_TICK'])
+        self.assertTrue(region_ids)
+        self.assertTrue(all(region_id % 2 == tick % 2 for region_id in region_ids))
+
+    def test_rollup_builds_hourly_and_daily_buckets(self):
+        for minutes, price in ((5, 10), (20, 14), (40, 8), (50, 12)):
+            self._raw(minutes, price)
+
+        result = PriceHistoryService.rollup(now=self.HOUR + timedelta(days=3))
+
+        self.assertEqual(result, {'hourly_created': 1, 'daily_created': 0})
+        self.assertFalse(PriceHistory.objects.exists())
+        bucket = PriceHistoryHourly.objects.get()
+        self.assertEqual(
+            (bucket.bucket_start, bucket.open_price, bucket.high_price, bucket.low_price, bucket.close_price),
+            (self.HOUR, 10, 14, 8, 12),
+        )
+        self.assertEqual((bucket.average_price, bucket.samples), (11, 4))
+
+        result = PriceHistoryService.rollup(now=self.HOUR + timedelta(days=100))
+
+        self.assertEqual(result, {'hourly_created': 0, 'daily_created': 1})
+        self.assertFalse(PriceHistoryHourly.objects.exists())
+        daily = PriceHistoryDaily.objects.get()
+        self.assertEqual((daily.open_price, daily.close_price, daily.samples), (10, 12, 4))
+
+    def test_rollup_merges_rows_into_an_existing_bucket(self):
+        PriceHistoryHourly.objects.create(
+            resource=self.resource, region=self.regions[0], bucket_start=self.HOUR,
+            open_price=10, high_price=12, low_price=9, close_price=11, average_price=10.5, samples=2,
+        )
+        self._raw(30, 20)
+        self._raw(45, 8)
+
+        result = PriceHistoryService.rollup(now=self.HOUR + timedelta(days=3))
+
+        self.assertEqual(result['hourly_created'], 0)
+        self.assertFalse(PriceHistory.objects.exists())
+        bucket = PriceHistoryHourly.objects.get()
+        self.assertEqual(
+            (bucket.open_price, bucket.high_price, bucket.low_price, bucket.close_price, bucket.samples),
+            (10, 20, 8, 8, 4),
+        )
+        self.assertEqual(bucket.average_price, (21 + 28) / 4)
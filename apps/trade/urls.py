@@ -10,4 +10,6 @@ urlpatterns = [
     path('routes/<int:route_id>/', views.trade_route_detail, name='trade_route_detail'),
     path('routes/<int:route_id>/complete/', views.complete_trade, name='complete_trade'),
     path('history/', views.trade_history, name='trade_history'),
+    path('api/best-routes/', views.best_routes_api, name='best_routes_api'),
+    path('api/prices/<int:resource_id>/<int:region_id>/', views.price_history_api, name='price_history_api'),
 ]
@@ -4,11 +4,19 @@ from django.contrib import messages
 from django.http import JsonResponse
 from .models import TradeRoute, Market, TradeMission, Resource, TradeMissionCargo, PriceHistory
 from .services.trade_service import TradeService
+from .services.price_history_service import PriceHistoryService
+from apps.exploration.models import Region
 from apps.players.models import Player
+from apps.players.services.gold_ledger import GoldLedger
 from apps.ships.models import Ship
+from apps.core.instrumentation import query_budget
+from apps.core.keyset import KeysetPaginator
+
+TRADE_HISTORY_PER_PAGE = 20
 
 
 @login_required
+@query_budget(6)
 def trade_dashboard(request):
     player = get_object_or_404(Player, user=request.user)
     active_routes = TradeRoute.objects.filter(discovered_by=player, is_active=True)
@@ -23,13 +31,22 @@ def trade_dashboard(request):
 
 
 @login_required
+@query_budget(8)
 def trade_posts(request):
     player = get_object_or_404(Player, user=request.user)
-    markets = Market.objects.filter(is_active=True)
+    markets = list(Market.objects.select_related('region').order_by('region__name'))
+    resources = list(Resource.objects.order_by('name'))
+    
+    # Tabla de precios de todos los mercados en una sola pasada
+    price_matrix = TradeService.get_price_matrix(resources, [market.region for market in markets])
+    for market in markets:
+        prices = price_matrix.prices_for_region(market.region)
+        market.resource_prices = [(resource, prices[resource.id]) for resource in resources]
     
     context = {
         'player': player,
         'markets': markets,
+        'resources': resources,
     }
     return render(request, 'trade/trade_posts.html', context)
 
@@ -50,6 +67,10 @@ def create_trade_route(request):
             if ship.status != 'docked':
                 messages.error(request, 'El barco no está disponible.')
                 return redirect('trade:trade_dashboard')
+            can_sail, reason = ship.can_sail_to(origin.region)
+            if not can_sail:
+                messages.error(request, reason)
+                return redirect('trade:trade_dashboard')
             # Crear misión comercial usando TradeService
             cargo_items = [{
                 'resource': Resource.objects.filter(category=cargo_type).first(),
@@ -107,8 +128,7 @@ def complete_trade(request, route_id):
         
         profit = trade_route.cargo_quantity * 10
         
-        player.gold += profit
-        player.save()
+        GoldLedger.credit(player, profit, 'trade_revenue', f'trade_route:{trade_route.pk}')
         
         trade_route.is_active = False
         trade_route.save()
@@ -124,12 +144,73 @@ def complete_trade(request, route_id):
 
 
 @login_required
+@query_budget(3)
 def trade_history(request):
     player = get_object_or_404(Player, user=request.user)
-    missions = TradeMission.objects.filter(player=player).order_by('-started_at')
+    missions = TradeMission.objects.filter(player=player).select_related(
+        'ship', 'trade_route__origin', 'trade_route__destination'
+    )
+    
+    # Paginación por clave (started_at, id) sobre trade_mission_player_start_idx
+    cursor = request.GET.get('cursor')
+    page = KeysetPaginator(missions, TRADE_HISTORY_PER_PAGE, ordering=('-started_at', '-id')).page(cursor)
     
     context = {
         'player': player,
-        'missions': missions,
+        'missions': page,
+        'next_cursor': page.next_cursor,
+        'cursor': cursor,
     }
     return render(request, 'trade/history.html', context)
+
+
+@login_required
+@query_budget(6)
+def price_history_api(request, resource_id, region_id):
+    """Serie de precios OHLC de un recurso en una región (para gráficos)."""
+    resource = get_object_or_404(Resource, id=resource_id)
+    region = get_object_or_404(Region, id=region_id)
+    resolution = 'daily' if request.GET.get('resolution') == 'daily' else 'hourly'
+    
+    series = PriceHistoryService.get_price_series(resource, region, resolution=resolution)
+    for point in series:
+        point['bucket_start'] = point['bucket_start'].isoformat()
+    
+    return JsonResponse({
+        'resource': resource.name,
+        'region': region.name,
+        'resolution': resolution,
+        'current_price': TradeService.get_resource_price(resource, region),
+        'trend': PriceHistoryService.get_price_trend(resource, region),
+        'series': series,
+    })
+
+
+@login_required
+@query_budget(8)
+def best_routes_api(request):
+    """Sugerencias de rutas comerciales más rentables para un barco del jugador."""
+    try:
+        ship_id = int(request.GET['ship_id'])
+        top_k = min(20, max(1, int(request.GET.get('top', 5))))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+    
+    player = get_object_or_404(Player, user=request.user)
+    ship = get_object_or_404(Ship, id=ship_id, owner=player)
+    
+    suggestions = TradeService.find_best_routes(player, ship, top_k)
+    data = [{
+        'route_id': item['route'].id,
+        'origin': item['route'].origin.name,
+        'destination': item['route'].destination.name,
+        'resource': item['resource'].name,
+        'quantity': item['quantity'],
+        'origin_price': item['origin_price'],
+        'destination_price': item['destination_price'],
+        'expected_profit': round(item['expected_profit'], 2),
+        'profit_per_hour': round(item['profit_per_hour'], 2),
+        'travel_hours': round(item['travel_time'].total_seconds() / 3600, 2),
+    } for item in suggestions]
+    
+    return JsonResponse({'routes': data})
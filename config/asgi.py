@@ -0,0 +1,12 @@
+"""
+ASGI config for Age of Voyage project.
+Sirve las conexiones de larga duración (flujo SSE de notificaciones) con asyncio.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+application = get_asgi_application()
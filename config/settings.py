@@ -3,6 +3,7 @@ Django settings for Age of Voyage project.
 """
 
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     
     # Age of Voyage Apps
+    'apps.core',
     'apps.players',
     'apps.ships',
     'apps.exploration',
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,7 +54,7 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'apps.core.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -66,6 +69,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 # Database
 # import dj_database_url
@@ -131,12 +135,93 @@ GAME_SETTINGS = {
     'TRADE_ROUTE_COOLDOWN_HOURS': 4,
     'GUILD_MAX_MEMBERS': 50,
     'MAX_LEVEL': 100,
+    'MARKET_TICK_SECONDS': 300,
+    'PRICE_HISTORY_RAW_RETENTION_HOURS': 48,
+    'PRICE_HISTORY_HOURLY_RETENTION_DAYS': 90,
+    # Máximo de filas de historial por tick; por encima se registra una muestra rotatoria de regiones
+    'PRICE_HISTORY_MAX_ROWS_PER_TICK': 100_000,
+    'GAME_TICK_SECONDS': 30,
+    'GAME_TICK_CHUNK_SIZE': 100,
+    # Días que se conservan las notificaciones leídas antes de archivarlas, por tipo
+    'NOTIFICATION_RETENTION_DAYS': {
+        'battle': 30,
+        'trade': 30,
+        'mission': 30,
+        'guild': 90,
+        'system': 90,
+        'achievement': 365,
+    },
 }
 
 # Cache settings for game data
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'apps.core.instrumentation.InstrumentedLocMemCache',
         'LOCATION': 'age-of-voyage-cache',
     }
 }
+
+# Versiones de los datos cargados en memoria por cada proceso (ver apps.core.data_versions).
+# Con varios procesos debe ser Redis; sin URL solo se invalidan en el proceso que guarda
+VERSIONS_REDIS_URL = os.environ.get('VERSIONS_REDIS_URL')
+CACHES['versions'] = {
+    'BACKEND': 'apps.core.instrumentation.InstrumentedRedisCache',
+    'LOCATION': VERSIONS_REDIS_URL,
+} if VERSIONS_REDIS_URL else {
+    'BACKEND': 'apps.core.instrumentation.InstrumentedLocMemCache',
+    'LOCATION': 'age-of-voyage-versions',
+}
+
+# Clasificaciones en sorted sets de Redis (sin URL se usan en memoria del proceso)
+LEADERBOARD_REDIS_URL = os.environ.get('LEADERBOARD_REDIS_URL')
+
+# Canal pub/sub de Redis para la entrega push de notificaciones (sin URL, en memoria del proceso)
+NOTIFICATIONS_REDIS_URL = os.environ.get('NOTIFICATIONS_REDIS_URL')
+
+# Presupuestos de consultas por vista (apps.core.instrumentation.query_budget): con True
+# se lanza QueryBudgetExceeded al excederlos; con False solo se registra un warning.
+# No depende de DEBUG, que está activo también en docker-compose: por defecto solo se
+# activa con `manage.py test`; en pruebas de carga, con QUERY_BUDGET_STRICT=1
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '1' if sys.argv[1:2] == ['test'] else '0') == '1'
+
+# Líneas JSON de instrumentación por petición
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps.core.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Celery (tareas asíncronas y tick del juego)
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'game-tick': {
+        'task': 'apps.missions.tasks.run_game_tick',
+        'schedule': GAME_SETTINGS['GAME_TICK_SECONDS'],
+    },
+    'record-market-prices': {
+        'task': 'apps.trade.tasks.record_market_prices',
+        'schedule': GAME_SETTINGS['MARKET_TICK_SECONDS'],
+    },
+    'rollup-price-history': {
+        'task': 'apps.trade.tasks.rollup_price_history',
+        'schedule': 3600,
+    },
+    'reconcile-notification-counters': {
+        'task': 'apps.notifications.tasks.reconcile_notification_counters',
+        'schedule': 3600,
+    },
+    'apply-notification-retention': {
+        'task': 'apps.notifications.tasks.apply_notification_retention',
+        'schedule': 3600,
+    },
+}